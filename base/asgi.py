@@ -5,6 +5,15 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+Запуск под ASGI-сервером (так собирается Docker-образ):
+
+    uvicorn base.asgi:application --host 0.0.0.0 --port 8000 --workers 4
+
+Асинхронные эндпоинты чтения (/async/employees/, /async/employees/<id>/,
+/async/skills/, /async/certifications/, /async/languages/) работают на
+цикле событий и не занимают поток на время запроса к базе; остальные
+представления Django выполняет в пуле потоков.
 """
 
 import os
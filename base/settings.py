@@ -46,6 +46,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'hr_app.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -78,6 +79,79 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:3000",
 ]
 
+# Кэш справочников: по умолчанию память процесса; при заданном REDIS_URL —
+# общий для всех процессов (нужен пакет redis).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Профили сотрудников — отдельный кэш своего размера: при общем с версиями справочников
+    # и счётчиков (MAX_ENTRIES=300) каждая страница списка вытесняла бы их ключи.
+    'documents': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'employee-documents',
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('EMPLOYEE_DOCUMENT_CACHE_MAX_ENTRIES', 20000))},
+    },
+}
+if os.environ.get('REDIS_URL'):
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+    CACHES['documents'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+        'KEY_PREFIX': 'documents',
+    }
+
+CATALOG_CACHE_ALIAS = 'shared' if 'shared' in CACHES else 'default'
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 24
+# Без общего кэша каждый процесс хранит свою версию справочника и не видит записи других
+# процессов; короткий срок жизни версии ограничивает это отставание.
+CATALOG_VERSION_TIMEOUT = None if 'shared' in CACHES else int(os.environ.get('CATALOG_VERSION_TIMEOUT', 30))
+
+# Кэш сериализованных профилей сотрудников, ключ — (id, date_updated).
+EMPLOYEE_DOCUMENT_CACHE_ALIAS = 'documents'
+EMPLOYEE_DOCUMENT_CACHE_TIMEOUT = int(os.environ.get('EMPLOYEE_DOCUMENT_CACHE_TIMEOUT', 60 * 60))
+
+# Счётчики по навыкам, языкам, образованию и т. п.; сбрасываются при любой записи сотрудников.
+FACETS_CACHE_ALIAS = CATALOG_CACHE_ALIAS
+FACETS_CACHE_TIMEOUT = int(os.environ.get('FACETS_CACHE_TIMEOUT', 10 * 60))
+# Как и у справочников: без общего кэша версию счётчиков сбрасывает только процесс, принявший запись.
+FACETS_VERSION_TIMEOUT = None if 'shared' in CACHES else int(os.environ.get('FACETS_VERSION_TIMEOUT', 30))
+
+# Запрос дольше SLOW_REQUEST_MS или с запросом к базе, повторённым REPEATED_QUERY_THRESHOLD раз
+# и более (признак N+1), пишется в лог hr_app.performance вместе с самыми долгими SQL.
+SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', 500))
+REPEATED_QUERY_THRESHOLD = int(os.environ.get('REPEATED_QUERY_THRESHOLD', 10))
+SLOW_REQUEST_WORST_QUERIES = 5
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'hr_app.performance': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+        'hr_app.jobs': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+EMPLOYEE_PAGE_SIZE = int(os.environ.get('EMPLOYEE_PAGE_SIZE', 50))
+EMPLOYEE_MAX_PAGE_SIZE = int(os.environ.get('EMPLOYEE_MAX_PAGE_SIZE', 500))
+EMPLOYEE_BATCH_MAX_IDS = int(os.environ.get('EMPLOYEE_BATCH_MAX_IDS', 100))
+
+# Фоновые задачи (manage.py worker): файлы импорта и экспорта, повторы с задержкой
+# JOB_RETRY_DELAY × 2^(попытка − 1) секунд; задача, обработчик которой не отмечался
+# JOB_LEASE_SECONDS, возвращается в очередь.
+JOB_STORAGE_DIR = os.environ.get('JOB_STORAGE_DIR', BASE_DIR / 'var' / 'jobs')
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+JOB_RETRY_DELAY = int(os.environ.get('JOB_RETRY_DELAY', 30))
+JOB_LEASE_SECONDS = int(os.environ.get('JOB_LEASE_SECONDS', 600))
+JOB_PROGRESS_INTERVAL = 1.0
+JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', 1.0))
+
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
@@ -89,15 +163,30 @@ WSGI_APPLICATION = 'base.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        # Бэкенд PostgreSQL с замером времени получения соединения (hr_app/db/base.py).
+        'ENGINE': 'hr_app.db',
         'NAME': os.environ.get('DATABASE_NAME'),
         'USER': os.environ.get('DATABASE_USER'),
         'PASSWORD': os.environ.get('DATABASE_PASSWORD'),
         'HOST': os.environ.get('DATABASE_HOST'),
         'PORT': os.environ.get('DATABASE_PORT', '5432'),
+        # Соединение проверяется перед выдачей из пула (или перед повторным использованием без пула).
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
     }
 }
 
+# Пул соединений psycopg (на каждый процесс); DATABASE_POOL=0 отключает его,
+# и тогда соединения переиспользуются в пределах потока DATABASE_CONN_MAX_AGE секунд.
+if os.environ.get('DATABASE_POOL', '1').lower() not in ('0', 'false', 'no'):
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', 2)),
+        'max_size': int(os.environ.get('DATABASE_POOL_MAX_SIZE', 10)),
+        'timeout': float(os.environ.get('DATABASE_POOL_TIMEOUT', 10)),
+    }
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DATABASE_CONN_MAX_AGE', 60))
+
 """
 'default': {
         'ENGINE': 'django.db.backends.sqlite3',
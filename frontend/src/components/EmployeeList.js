@@ -1,15 +1,24 @@
 import React, { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
 import axios from '../services/api';
-import { Container, Typography, Card, CardContent, Box } from '@mui/material';
+import { Container, Typography, Card, CardContent, Box, Button } from '@mui/material';
 
 function EmployeeList() {
   const [employees, setEmployees] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
 
-  useEffect(() => {
-    axios.get('/employees/')
-      .then(response => setEmployees(response.data))
+  const loadPage = (url, append = false) => {
+    axios.get(url)
+      .then(response => {
+        // Первая страница заменяет список: в StrictMode эффект выполняется дважды.
+        setEmployees(prev => (append ? [...prev, ...response.data.results] : response.data.results));
+        setNextPage(response.data.next);
+      })
       .catch(error => console.error(error));
+  };
+
+  useEffect(() => {
+    loadPage('/employees/?fields=id,first_name,last_name');
   }, []);
 
   return (
@@ -30,6 +39,11 @@ function EmployeeList() {
             </CardContent>
           </Card>
         ))}
+        {nextPage && (
+          <Button variant="outlined" onClick={() => loadPage(nextPage, true)}>
+            Показать ещё
+          </Button>
+        )}
       </Box>
     </Container>
   );
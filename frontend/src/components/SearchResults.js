@@ -15,9 +15,9 @@ function SearchResults() {
   useEffect(() => {
     if (searchQuery) {
       axios
-        .get(`/employees/?search=${encodeURIComponent(searchQuery)}`)
+        .get(`/employees/?fields=id,first_name,last_name&search=${encodeURIComponent(searchQuery)}`)
         .then((response) => {
-          setResults(response.data);
+          setResults(response.data.results);
         })
         .catch((error) => console.error(error));
     }
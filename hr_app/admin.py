@@ -1,21 +1,209 @@
 from django.contrib import admin
-
-# Register your models here.
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
 
 from .models import (
     Employee, Education, WorkExperience, Family, PassportInfo,
     Skill, EmployeeSkill, Certification, EmployeeCertification,
     Language, EmployeeLanguage
 )
+from .catalogs import CATALOG_MODELS, get_catalog
+from .search import build_search_query, search_employees
+
+# Ниже этого числа строк точный COUNT(*) дешевле, а оценка планировщика может быть неточной.
+ESTIMATED_COUNT_MIN_ROWS = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Для списка без фильтров берёт число строк из статистики планировщика (pg_class.reltuples)
+    вместо полного COUNT(*) по таблице. Отфильтрованные списки считаются точно.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            # До первого ANALYZE reltuples равен -1.
+            if row and row[0] >= ESTIMATED_COUNT_MIN_ROWS:
+                return row[0]
+        return super().count
+
+
+class HRModelAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    # Без второго COUNT(*) по всей таблице рядом с результатами поиска.
+    show_full_result_count = False
+    list_per_page = 50
+
+
+class EmployeeSearchMixin:
+    """
+    Поиск по поисковому документу сотрудника (GIN-индекс) вместо LIKE по полям:
+    каждое слово — префикс, все слова обязательны.
+    """
+    search_help_text = 'ФИО, email, телефон, номер паспорта, навыки и другие данные сотрудника.'
+    employee_path = 'employee__'
+
+    def get_search_results(self, request, queryset, search_term):
+        query = build_search_query(search_term)
+        if query is None:
+            return queryset, False
+        return queryset.filter(**{f'{self.employee_path}search_document': query}), False
+
+
+class EmployeeRecordAdmin(EmployeeSearchMixin, HRModelAdmin):
+    # Сотрудник выбирается через автодополнение, а не из списка всех сотрудников.
+    autocomplete_fields = ('employee',)
+    list_select_related = ('employee',)
+    search_fields = ('employee__last_name',)
+
+
+class CatalogAutocompleteSelect(AutocompleteSelect):
+    """
+    Автодополнение по справочнику, которое берёт подпись выбранного значения из кэша
+    справочников, а не отдельным запросом на каждую строку вложенной формы.
+    """
+
+    def __init__(self, field, *args, **kwargs):
+        super().__init__(field, *args, **kwargs)
+        self.catalog = next(name for name, model in CATALOG_MODELS.items() if model is field.remote_field.model)
+
+    def optgroups(self, name, value, attr=None):
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        labels = {str(row['id']): row['name'] for row in get_catalog(self.catalog).rows}
+        selected = [str(item) for item in value if str(item) not in self.choices.field.empty_values]
+        for pk in selected[:1]:
+            options.append(self.create_option(name, pk, labels.get(pk, pk), True, len(options)))
+        return [(None, options, 0)]
+
+
+class EmployeeInline:
+    """
+    Вложенная форма страницы сотрудника. __str__ строки обращается к сотруднику (и к записи
+    справочника), поэтому они загружаются тем же запросом, без широкого поискового документа.
+    """
+    catalog_field = None
+
+    def get_queryset(self, request):
+        related = ['employee'] + ([self.catalog_field] if self.catalog_field else [])
+        return super().get_queryset(request).select_related(*related).defer('employee__search_document')
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == self.catalog_field:
+            kwargs['widget'] = CatalogAutocompleteSelect(db_field, self.admin_site, using=kwargs.get('using'))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
+class FamilyInline(EmployeeInline, admin.StackedInline):
+    model = Family
+
+
+class PassportInfoInline(EmployeeInline, admin.StackedInline):
+    model = PassportInfo
+
+
+class EducationInline(EmployeeInline, admin.TabularInline):
+    model = Education
+    extra = 0
+
+
+class WorkExperienceInline(EmployeeInline, admin.StackedInline):
+    model = WorkExperience
+    extra = 0
+
+
+class EmployeeSkillInline(EmployeeInline, admin.TabularInline):
+    model = EmployeeSkill
+    catalog_field = 'skill'
+    extra = 0
+
+
+class EmployeeCertificationInline(EmployeeInline, admin.TabularInline):
+    model = EmployeeCertification
+    catalog_field = 'certification'
+    extra = 0
+
+
+class EmployeeLanguageInline(EmployeeInline, admin.TabularInline):
+    model = EmployeeLanguage
+    catalog_field = 'language'
+    extra = 0
+
+
+@admin.register(Employee)
+class EmployeeAdmin(EmployeeSearchMixin, HRModelAdmin):
+    list_display = ('last_name', 'first_name', 'patronymic', 'email', 'nationality', 'date_of_birth')
+    list_display_links = ('last_name', 'first_name')
+    # Совпадает с индексом employee_name_order_idx.
+    ordering = ('last_name', 'first_name', 'id')
+    search_fields = ('last_name', 'first_name', 'patronymic', 'email')
+    readonly_fields = ('date_created', 'date_updated')
+    inlines = (
+        FamilyInline, PassportInfoInline, EducationInline, WorkExperienceInline,
+        EmployeeSkillInline, EmployeeCertificationInline, EmployeeLanguageInline,
+    )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('search_document')
+
+    def get_search_results(self, request, queryset, search_term):
+        return search_employees(queryset, search_term), False
+
+
+@admin.register(Education)
+class EducationAdmin(EmployeeRecordAdmin):
+    list_display = ('employee', 'education_level', 'institution', 'specialty', 'graduation_year')
+
+
+@admin.register(WorkExperience)
+class WorkExperienceAdmin(EmployeeRecordAdmin):
+    list_display = ('employee', 'employer', 'position', 'start_date', 'end_date')
+
+
+@admin.register(Family)
+class FamilyAdmin(EmployeeRecordAdmin):
+    list_display = ('employee', 'marital_status', 'number_of_children')
+
+
+@admin.register(PassportInfo)
+class PassportInfoAdmin(EmployeeRecordAdmin):
+    list_display = ('employee', 'passport_number', 'date_issued', 'date_expiry')
+
+
+@admin.register(EmployeeSkill)
+class EmployeeSkillAdmin(EmployeeRecordAdmin):
+    list_display = ('employee', 'skill')
+    list_select_related = ('employee', 'skill')
+    autocomplete_fields = ('employee', 'skill')
+
+
+@admin.register(EmployeeCertification)
+class EmployeeCertificationAdmin(EmployeeRecordAdmin):
+    list_display = ('employee', 'certification', 'date_obtained')
+    list_select_related = ('employee', 'certification')
+    autocomplete_fields = ('employee', 'certification')
+
+
+@admin.register(EmployeeLanguage)
+class EmployeeLanguageAdmin(EmployeeRecordAdmin):
+    list_display = ('employee', 'language', 'proficiency_level')
+    list_select_related = ('employee', 'language')
+    autocomplete_fields = ('employee', 'language')
+
 
-admin.site.register(Employee)
-admin.site.register(Education)
-admin.site.register(WorkExperience)
-admin.site.register(Family)
-admin.site.register(PassportInfo)
-admin.site.register(Skill)
-admin.site.register(EmployeeSkill)
-admin.site.register(Certification)
-admin.site.register(EmployeeCertification)
-admin.site.register(Language)
-admin.site.register(EmployeeLanguage)
\ No newline at end of file
+@admin.register(Skill, Certification, Language)
+class CatalogAdmin(HRModelAdmin):
+    list_display = ('name',)
+    ordering = ('name',)
+    search_fields = ('name',)
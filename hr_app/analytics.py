@@ -0,0 +1,132 @@
+import datetime
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractYear
+from .models import Employee, Education, Family, HeadcountSummary, FamilySummary, EducationSummary
+
+# Возрастные группы: (нижняя граница включительно, верхняя не включительно, название).
+AGE_BANDS = (
+    (None, 25, 'до 25'),
+    (25, 35, '25–34'),
+    (35, 45, '35–44'),
+    (45, 55, '45–54'),
+    (55, None, '55 и старше'),
+)
+
+# Сводка: ключевые поля и поля-счётчики. Таблицы поддерживают триггеры из миграции 0007.
+SUMMARY_FIELDS = {
+    HeadcountSummary: (('nationality', 'birth_year'), ('employees',)),
+    FamilySummary: (('marital_status',), ('employees', 'children')),
+    EducationSummary: (('education_level',), ('records',)),
+}
+
+
+def age_band(birth_year, today):
+    # Возраст считается по году рождения: столько лет сотруднику исполняется в текущем году.
+    age = today.year - birth_year
+    for low, high, label in AGE_BANDS:
+        if (low is None or age >= low) and (high is None or age < high):
+            return label
+
+
+def compute_summaries():
+    """
+    Сводки, посчитанные с нуля по исходным таблицам, в виде {модель: {ключ: счётчики}}.
+    """
+    headcount = (
+        Employee.objects.order_by()
+        .values('nationality', birth_year=ExtractYear('date_of_birth'))
+        .annotate(employees=Count('id'))
+    )
+    family = Family.objects.order_by().values('marital_status').annotate(
+        employees=Count('id'), children=Sum('number_of_children')
+    )
+    education = Education.objects.order_by().values('education_level').annotate(records=Count('id'))
+    return {
+        model: {
+            tuple(row[field] for field in keys): tuple(row[field] for field in counters)
+            for row in rows
+        }
+        for (model, (keys, counters)), rows in zip(SUMMARY_FIELDS.items(), (headcount, family, education))
+    }
+
+
+def stored_summaries():
+    return {
+        model: {
+            tuple(row[:len(keys)]): tuple(row[len(keys):])
+            for row in model.objects.values_list(*keys, *counters)
+        }
+        for model, (keys, counters) in SUMMARY_FIELDS.items()
+    }
+
+
+def compare_summaries():
+    """
+    Расхождения сводок с пересчётом с нуля: [(модель, ключ, хранится, ожидается)].
+    """
+    expected, stored = compute_summaries(), stored_summaries()
+    differences = []
+    for model in SUMMARY_FIELDS:
+        for key in sorted(expected[model].keys() | stored[model].keys(), key=str):
+            if expected[model].get(key) != stored[model].get(key):
+                differences.append((model, key, stored[model].get(key), expected[model].get(key)))
+    return differences
+
+
+def rebuild_summaries():
+    with transaction.atomic():
+        # TRUNCATE блокирует сводки до фиксации: триггеры параллельных записей дождутся её
+        # и применят свои изменения уже к пересчитанным строкам.
+        with connection.cursor() as cursor:
+            cursor.execute('TRUNCATE {}'.format(', '.join(model._meta.db_table for model in SUMMARY_FIELDS)))
+        for model, rows in compute_summaries().items():
+            keys, counters = SUMMARY_FIELDS[model]
+            model.objects.bulk_create([
+                model(**dict(zip(keys, key)), **dict(zip(counters, values)))
+                for key, values in rows.items()
+            ])
+
+
+def workforce_report(today=None):
+    """
+    Отчёт по сводным таблицам: численность по гражданству и возрастной группе, среднее число
+    детей по семейному положению, распределение записей об образовании. Размер сводок не
+    зависит от числа сотрудников.
+    """
+    today = today or datetime.date.today()
+    headcount = {}
+    for nationality, birth_year, employees in HeadcountSummary.objects.values_list(
+        'nationality', 'birth_year', 'employees'
+    ):
+        key = (nationality, age_band(birth_year, today))
+        headcount[key] = headcount.get(key, 0) + employees
+    band_order = {label: index for index, (_, _, label) in enumerate(AGE_BANDS)}
+
+    family_labels = dict(Family.MARITAL_STATUS_CHOICES)
+    education_labels = dict(Education.EDUCATION_LEVEL_CHOICES)
+    return {
+        'headcount': [
+            {'nationality': nationality, 'age_band': band, 'employees': employees}
+            for (nationality, band), employees in sorted(
+                headcount.items(), key=lambda item: (item[0][0], band_order[item[0][1]])
+            )
+        ],
+        'children_by_marital_status': [
+            {
+                'marital_status': row.marital_status,
+                'label': family_labels.get(row.marital_status, row.marital_status),
+                'employees': row.employees,
+                'average_children': round(row.children / row.employees, 2) if row.employees else None,
+            }
+            for row in FamilySummary.objects.order_by('marital_status')
+        ],
+        'education_levels': [
+            {
+                'education_level': row.education_level,
+                'label': education_labels.get(row.education_level, row.education_level),
+                'records': row.records,
+            }
+            for row in EducationSummary.objects.order_by('education_level')
+        ],
+    }
@@ -0,0 +1,115 @@
+from django.http import HttpResponse
+from django.utils.http import parse_etags
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from .catalogs import aget_catalog
+from .documents import aget_documents, aset_documents
+from .instrumentation import measure
+from .serializers import EmployeeSerializer
+from .views import EmployeeReadMixin
+
+
+def render_json(data, status_code=status.HTTP_200_OK, headers=None):
+    return HttpResponse(
+        JSONRenderer().render(data), status=status_code, headers=headers, content_type='application/json'
+    )
+
+
+def render_error(error):
+    detail = error.detail if isinstance(error.detail, (list, dict)) else {'detail': error.detail}
+    return render_json(detail, status_code=error.status_code)
+
+
+class AsyncCatalogView(View):
+    """
+    Асинхронный список справочника: тот же ответ и ETag, что у CatalogViewSet.list.
+    """
+    http_method_names = ['get', 'head', 'options']
+    catalog = None
+
+    async def get(self, request):
+        snapshot = await aget_catalog(self.catalog)
+        headers = {'ETag': snapshot.etag, 'Cache-Control': 'no-cache'}
+        if snapshot.etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return render_json(snapshot.rows, headers=headers)
+
+
+class AsyncEmployeeView(EmployeeReadMixin, View):
+    """
+    Асинхронные список и карточка сотрудника для запуска под ASGI. Параметры и ответы
+    совпадают с EmployeeViewSet; запросы к базе выполняются через асинхронный ORM,
+    поэтому медленный запрос не занимает поток сервера.
+    """
+    http_method_names = ['get', 'head', 'options']
+
+    def get_representation(self):
+        return self.fields, 'json'
+
+    async def get(self, request, pk=None):
+        # Обёртка DRF нужна пагинации и фильтру поиска (query_params, build_absolute_uri).
+        self.api_request = Request(request)
+        try:
+            self.fields = self.select_requested_fields(self.api_request)
+            if pk is None:
+                return await self.list(request)
+            return await self.retrieve(request, pk)
+        except exceptions.APIException as error:
+            return render_error(error)
+
+    async def list(self, request):
+        paginator = self.pagination_class()
+        queryset = self.get_version_queryset()
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(self.api_request, queryset, self)
+        employees = await paginator.apaginate_queryset(queryset, self.api_request, view=self)
+        paginated = employees is not None
+        if not paginated:
+            ordering = paginator.get_ordering(self.api_request, queryset, self)
+            employees = [employee async for employee in queryset.order_by(*ordering)]
+            state = ''
+        else:
+            state = self.get_page_state(paginator)
+
+        headers, last_modified = self.get_validators(employees, state)
+        not_modified = self.check_not_modified(request, headers, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        data = await self.render_employees(employees)
+        if not paginated:
+            return render_json(data, headers=headers)
+        return render_json(paginator.get_paginated_response(data).data, headers=headers)
+
+    async def retrieve(self, request, pk):
+        employee = await self.get_version_queryset().filter(pk=pk).afirst()
+        if employee is None:
+            raise exceptions.NotFound()
+        headers, last_modified = self.get_validators([employee], collection=False)
+        not_modified = self.check_not_modified(request, headers, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        documents = await self.render_employees([employee])
+        if not documents:
+            raise exceptions.NotFound()
+        return render_json(documents[0], headers=headers)
+
+    async def render_employees(self, employees):
+        # Полные документы — через кэш, как в EmployeeViewSet; выборочные поля загружаются
+        # и сериализуются каждый раз. Сериализация не обращается к базе: всё подгружено заранее.
+        documents = await aget_documents(employees) if self.fields is None else {}
+        missing = [employee.pk for employee in employees if employee.pk not in documents]
+        if missing:
+            queryset = self.get_profile_queryset(self.fields).filter(pk__in=missing)
+            loaded = [employee async for employee in queryset]
+            with measure('serialize'):
+                rendered = [
+                    dict(document) for document in EmployeeSerializer(loaded, many=True, fields=self.fields).data
+                ]
+            if self.fields is None:
+                await aset_documents(zip(loaded, rendered))
+            documents.update((employee.pk, document) for employee, document in zip(loaded, rendered))
+        return [documents[employee.pk] for employee in employees if employee.pk in documents]
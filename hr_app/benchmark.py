@@ -0,0 +1,220 @@
+import datetime
+import json
+import math
+import random
+import statistics
+import subprocess
+import time
+from django.conf import settings
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from .models import (
+    Employee, Education, WorkExperience, Family, PassportInfo,
+    EmployeeSkill, EmployeeCertification, EmployeeLanguage
+)
+from .seed import EmployeeGenerator, ensure_catalogs
+from .views import EmployeeViewSet
+
+SCENARIOS = ('list', 'list_sparse', 'detail', 'search', 'lookup', 'create', 'update')
+
+
+def percentile(values, percent):
+    # Метод ближайшего ранга: значение, не меньше которого percent% замеров.
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def employee_payload(generator, index):
+    """
+    Профиль от генератора в виде тела запроса POST /employees/.
+    """
+    employee = generator.employee(index)
+    rows = generator.profile(employee)
+    family, passport = rows[Family][0], rows[PassportInfo][0]
+    return {
+        'first_name': employee.first_name,
+        'last_name': employee.last_name,
+        'patronymic': employee.patronymic,
+        'date_of_birth': employee.date_of_birth.isoformat(),
+        'gender': employee.gender,
+        'nationality': employee.nationality,
+        'email': employee.email,
+        'phone_number': employee.phone_number,
+        'address': employee.address,
+        'family': {'marital_status': family.marital_status, 'number_of_children': family.number_of_children},
+        'passport_info': {
+            'passport_number': passport.passport_number,
+            'issued_by': passport.issued_by,
+            'date_issued': passport.date_issued.isoformat(),
+            'date_expiry': passport.date_expiry.isoformat(),
+        },
+        'educations': [
+            {
+                'education_level': row.education_level, 'institution': row.institution,
+                'graduation_year': row.graduation_year, 'specialty': row.specialty,
+            }
+            for row in rows[Education]
+        ],
+        'work_experiences': [
+            {
+                'employer': row.employer, 'position': row.position, 'start_date': row.start_date.isoformat(),
+                'end_date': row.end_date.isoformat() if row.end_date else None,
+                'responsibilities': row.responsibilities,
+            }
+            for row in rows[WorkExperience]
+        ],
+        'skills': [{'skill_id': row.skill_id} for row in rows[EmployeeSkill]],
+        'certifications': [
+            {'certification_id': row.certification_id, 'date_obtained': row.date_obtained.isoformat()}
+            for row in rows[EmployeeCertification]
+        ],
+        'languages': [
+            {'language_id': row.language_id, 'proficiency_level': row.proficiency_level}
+            for row in rows[EmployeeLanguage]
+        ],
+    }
+
+
+class Benchmark:
+    """
+    Замеряет сценарии API через настоящие EmployeeViewSet и сериализаторы (без HTTP и middleware):
+    время вызова вместе с рендером ответа и число запросов к базе.
+    Записи (create, update) выполняются в транзакции, которая в конце откатывается; отложенные
+    до фиксации обработчики (пересчёт поискового документа и массивов профиля) выполняются
+    сразу после вызова и входят в замер.
+    """
+
+    def __init__(self, iterations=50, warmup=3, seed=None):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.random = random.Random(seed)
+        self.generator = EmployeeGenerator(ensure_catalogs(), seed=seed)
+        self.factory = APIRequestFactory(SERVER_NAME='localhost')
+        self.list_view = EmployeeViewSet.as_view({'get': 'list', 'post': 'create'})
+        self.detail_view = EmployeeViewSet.as_view({'get': 'retrieve', 'patch': 'partial_update'})
+        self.lookup_view = EmployeeViewSet.as_view({'get': 'lookup'})
+        self.employee_ids = list(Employee.objects.values_list('id', flat=True))
+        self.created = 0
+
+    def _call(self, view, request, **kwargs):
+        start = len(connection.run_on_commit)
+        response = view(request, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        if response.status_code >= 400:
+            raise RuntimeError(f'{request.method} {request.path}: {response.status_code} {response.content[:500]!r}')
+        self._run_on_commit(start)
+        return response
+
+    @staticmethod
+    def _run_on_commit(start):
+        # Во внешней транзакции фиксации нет, и on_commit сам не сработал бы до отката.
+        while len(connection.run_on_commit) > start:
+            callbacks = connection.run_on_commit[start:]
+            del connection.run_on_commit[start:]
+            for _, callback, _ in callbacks:
+                callback()
+
+    def scenario_list(self):
+        return self.list_view, self.factory.get('/employees/'), {}
+
+    def scenario_list_sparse(self):
+        return self.list_view, self.factory.get('/employees/', {'fields': 'id,first_name,last_name'}), {}
+
+    def scenario_detail(self):
+        return self.detail_view, self.factory.get('/employees/'), {'pk': self.random.choice(self.employee_ids)}
+
+    def scenario_search(self):
+        term = self.random.choice(['Иванов', 'Python', 'Москва', 'Аналитик', 'МГУ', 'Английский'])
+        return self.list_view, self.factory.get('/employees/', {'search': term}), {}
+
+    def scenario_lookup(self):
+        term = self.random.choice(['Иван', 'Смирн', 'Кузнец', 'Ольга', 'Петр'])
+        return self.lookup_view, self.factory.get('/employees/lookup/', {'q': term}), {}
+
+    def scenario_create(self):
+        self.created += 1
+        payload = employee_payload(self.generator, f'bench{self.created}')
+        return self.list_view, self.factory.post('/employees/', payload, format='json'), {}
+
+    def scenario_update(self):
+        payload = employee_payload(self.generator, 'update')
+        changes = {'address': payload['address'], 'skills': payload['skills'], 'languages': payload['languages']}
+        request = self.factory.patch('/employees/', changes, format='json')
+        return self.detail_view, request, {'pk': self.random.choice(self.employee_ids)}
+
+    def measure(self, name):
+        scenario = getattr(self, f'scenario_{name}')
+        for _ in range(self.warmup):
+            view, request, kwargs = scenario()
+            self._call(view, request, **kwargs)
+
+        timings, queries = [], []
+        for _ in range(self.iterations):
+            view, request, kwargs = scenario()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                self._call(view, request, **kwargs)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured))
+        return {
+            'calls': len(timings),
+            'mean_ms': round(statistics.mean(timings), 3),
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p99_ms': round(percentile(timings, 99), 3),
+            'queries_per_call': round(statistics.mean(queries), 2),
+        }
+
+    def run(self, scenarios=SCENARIOS):
+        if not self.employee_ids:
+            raise RuntimeError('В базе нет сотрудников: сначала выполните seed_employees.')
+        results = {}
+        with transaction.atomic():
+            for name in scenarios:
+                results[name] = self.measure(name)
+            transaction.set_rollback(True)
+        return {
+            'commit': current_commit(),
+            'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'employees': len(self.employee_ids),
+            'iterations': self.iterations,
+            'results': results,
+        }
+
+
+def compare(current, baseline):
+    """
+    Строки сравнения с сохранённым прогоном: (сценарий, метрика, было, стало, изменение в %).
+    """
+    rows = []
+    for name, result in current['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        for metric in ('p50_ms', 'p99_ms', 'queries_per_call'):
+            before, after = previous[metric], result[metric]
+            change = (after - before) / before * 100 if before else 0.0
+            rows.append((name, metric, before, after, round(change, 1)))
+    return rows
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_results(results, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
@@ -0,0 +1,112 @@
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+from .models import Skill, Certification, Language
+
+CATALOG_MODELS = {
+    'skills': Skill,
+    'certifications': Certification,
+    'languages': Language,
+}
+
+# Последний загруженный снимок каждого справочника в памяти процесса.
+_snapshots = {}
+
+
+class CatalogSnapshot:
+    def __init__(self, version, rows):
+        self.version = version
+        self.rows = rows
+        self.ids = frozenset(row['id'] for row in rows)
+
+    @property
+    def etag(self):
+        return f'"{self.version}"'
+
+
+def _cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def _version_key(name):
+    return f'catalog:{name}:version'
+
+
+def get_version(name):
+    """
+    Версия справочника хранится в кэше (общем для процессов, если он настроен);
+    новый случайный токен появляется при каждой записи или после вытеснения ключа.
+    В кэше одного процесса версия живёт CATALOG_VERSION_TIMEOUT секунд: записи других
+    процессов видны не позже, чем через этот срок.
+    """
+    cache = _cache()
+    version = cache.get(_version_key(name))
+    if version is None:
+        cache.add(_version_key(name), f'{name}-{uuid.uuid4().hex}', timeout=settings.CATALOG_VERSION_TIMEOUT)
+        version = cache.get(_version_key(name))
+    return version
+
+
+async def aget_version(name):
+    cache = _cache()
+    version = await cache.aget(_version_key(name))
+    if version is None:
+        await cache.aadd(_version_key(name), f'{name}-{uuid.uuid4().hex}', timeout=settings.CATALOG_VERSION_TIMEOUT)
+        version = await cache.aget(_version_key(name))
+    return version
+
+
+def invalidate(name):
+    _cache().set(_version_key(name), f'{name}-{uuid.uuid4().hex}', timeout=settings.CATALOG_VERSION_TIMEOUT)
+
+
+def get_catalog(name):
+    version = get_version(name)
+    snapshot = _snapshots.get(name)
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    cache = _cache()
+    rows = cache.get(f'catalog:{version}')
+    if rows is None:
+        rows = list(CATALOG_MODELS[name].objects.order_by('id').values('id', 'name'))
+        cache.set(f'catalog:{version}', rows, timeout=settings.CATALOG_CACHE_TIMEOUT)
+    snapshot = _snapshots[name] = CatalogSnapshot(version, rows)
+    return snapshot
+
+
+async def aget_catalog(name):
+    version = await aget_version(name)
+    snapshot = _snapshots.get(name)
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    cache = _cache()
+    rows = await cache.aget(f'catalog:{version}')
+    if rows is None:
+        rows = [row async for row in CATALOG_MODELS[name].objects.order_by('id').values('id', 'name')]
+        await cache.aset(f'catalog:{version}', rows, timeout=settings.CATALOG_CACHE_TIMEOUT)
+    snapshot = _snapshots[name] = CatalogSnapshot(version, rows)
+    return snapshot
+
+
+def existing_ids(name, ids):
+    """
+    Множество id справочника, в котором есть все существующие из ids. Снимок может отставать
+    от базы (запись сделана другим процессом); id, которых в нём нет, перед отказом
+    проверяются одним запросом, а найденные сбрасывают устаревший снимок.
+    """
+    snapshot = get_catalog(name)
+    unknown = {pk for pk in ids if pk is not None and pk not in snapshot.ids}
+    if not unknown:
+        return snapshot.ids
+    found = CATALOG_MODELS[name].objects.in_bulk(unknown).keys()
+    if found:
+        invalidate(name)
+    return snapshot.ids | found
+
+
+def clear():
+    _snapshots.clear()
+    for name in CATALOG_MODELS:
+        invalidate(name)
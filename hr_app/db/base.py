@@ -0,0 +1,61 @@
+import threading
+import time
+from django.db import connections
+from django.db.backends.postgresql import base
+from ..instrumentation import record_query
+
+# Счётчики выдачи соединений в этом процессе: сколько раз, сколько всего и максимум ждали.
+_checkouts = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+_lock = threading.Lock()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Бэкенд PostgreSQL, который замеряет время получения соединения: из пула
+    (вместе с проверкой соединения) или, без пула, время установки нового, — и передаёт
+    каждый запрос в замеры текущего HTTP-запроса, в каком бы потоке он ни выполнялся.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.execute_wrappers.append(record_query)
+
+    def get_new_connection(self, conn_params):
+        started = time.perf_counter()
+        try:
+            return super().get_new_connection(conn_params)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            with _lock:
+                _checkouts['count'] += 1
+                _checkouts['total_ms'] += elapsed
+                _checkouts['max_ms'] = max(_checkouts['max_ms'], elapsed)
+
+
+def pool_stats(alias='default'):
+    with _lock:
+        checkouts = dict(_checkouts)
+    stats = {
+        'checkouts': checkouts['count'],
+        'checkout_ms_avg': round(checkouts['total_ms'] / checkouts['count'], 3) if checkouts['count'] else None,
+        'checkout_ms_max': round(checkouts['max_ms'], 3),
+        'pool': None,
+    }
+    pool = getattr(connections[alias], 'pool', None)
+    if pool is not None:
+        # Счётчики psycopg_pool накапливаются с открытия пула.
+        pool_stats = pool.get_stats()
+        stats['pool'] = {
+            'size': pool_stats.get('pool_size', 0),
+            'available': pool_stats.get('pool_available', 0),
+            'min_size': pool_stats.get('pool_min', 0),
+            'max_size': pool_stats.get('pool_max', 0),
+            'waiting': pool_stats.get('requests_waiting', 0),
+            'requests': pool_stats.get('requests_num', 0),
+            'waits': pool_stats.get('requests_queued', 0),
+            'wait_ms_total': pool_stats.get('requests_wait_ms', 0),
+            'wait_errors': pool_stats.get('requests_errors', 0),
+            'connections_opened': pool_stats.get('connections_num', 0),
+            'connections_lost': pool_stats.get('connections_lost', 0),
+        }
+    return stats
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.cache import caches
+
+# Счётчики обращений к кэшу в этом процессе.
+_stats = {'hits': 0, 'misses': 0}
+
+
+def _cache():
+    return caches[settings.EMPLOYEE_DOCUMENT_CACHE_ALIAS]
+
+
+def _key(employee):
+    # Версия документа — date_updated: сигналы обновляют его при любом изменении профиля,
+    # поэтому устаревший документ просто перестаёт запрашиваться и вытесняется по таймауту.
+    return f'employee:{employee.pk}:{employee.date_updated.isoformat()}'
+
+
+def _found(keys, found):
+    _stats['hits'] += len(found)
+    _stats['misses'] += len(keys) - len(found)
+    return {keys[key]: document for key, document in found.items()}
+
+
+def get_documents(employees):
+    """
+    Возвращает словарь {id: документ} для сотрудников, чьи документы есть в кэше.
+    """
+    keys = {_key(employee): employee.pk for employee in employees}
+    return _found(keys, _cache().get_many(list(keys)))
+
+
+async def aget_documents(employees):
+    keys = {_key(employee): employee.pk for employee in employees}
+    return _found(keys, await _cache().aget_many(list(keys)))
+
+
+def set_documents(pairs):
+    _cache().set_many(
+        {_key(employee): document for employee, document in pairs},
+        timeout=settings.EMPLOYEE_DOCUMENT_CACHE_TIMEOUT,
+    )
+
+
+async def aset_documents(pairs):
+    await _cache().aset_many(
+        {_key(employee): document for employee, document in pairs},
+        timeout=settings.EMPLOYEE_DOCUMENT_CACHE_TIMEOUT,
+    )
+
+
+def stats():
+    total = _stats['hits'] + _stats['misses']
+    return {**_stats, 'hit_ratio': round(_stats['hits'] / total, 4) if total else None}
+
+
+def reset_stats():
+    _stats.update(hits=0, misses=0)
@@ -0,0 +1,104 @@
+import calendar
+import datetime
+from django.db.models import Q
+from .models import Employee, EmployeeCertification, PassportInfo, month_day
+from .search import NAME_FIELDS
+
+EVENT_TYPES = ('passport_expiry', 'birthday', 'certification_anniversary')
+MAX_WINDOW_DAYS = 365
+
+
+def _occurrence(date, start):
+    """
+    Ближайшая к start (не раньше неё) годовщина даты. 29 февраля в невисокосный год — 28 февраля.
+    """
+    for year in (start.year, start.year + 1):
+        day = date.day if calendar.isleap(year) or (date.month, date.day) != (2, 29) else 28
+        occurrence = datetime.date(year, date.month, day)
+        if occurrence >= start:
+            return occurrence
+
+
+def _month_day_condition(start, end):
+    """
+    Условие на аннотацию month_day для окна [start, end] без учёта года; окно через Новый год
+    разбивается на два диапазона. Каждый диапазон — поиск по индексу выражения ММДД.
+    """
+    if (end - start).days >= 365:
+        return Q()
+    low = start.month * 100 + start.day
+    high = end.month * 100 + end.day
+    # В невисокосный год родившиеся 29 февраля отмечают 28-го.
+    if (end.month, end.day) == (2, 28) and not calendar.isleap(end.year):
+        high = 229
+    if low <= high:
+        return Q(month_day__range=(low, high))
+    return Q(month_day__gte=low) | Q(month_day__lte=high)
+
+
+def _person(employee):
+    return {'employee_id': employee.pk, **{name: getattr(employee, name) for name in NAME_FIELDS}}
+
+
+def passport_expiries(start, end):
+    passports = (
+        PassportInfo.objects.filter(date_expiry__range=(start, end))
+        .select_related('employee')
+        .only('passport_number', 'date_expiry', *(f'employee__{name}' for name in NAME_FIELDS))
+    )
+    for passport in passports:
+        yield {
+            'type': 'passport_expiry', 'date': passport.date_expiry, **_person(passport.employee),
+            'passport_number': passport.passport_number,
+        }
+
+
+def birthdays(start, end):
+    employees = (
+        Employee.objects.annotate(month_day=month_day('date_of_birth'))
+        .filter(_month_day_condition(start, end))
+        .only(*NAME_FIELDS, 'date_of_birth')
+    )
+    for employee in employees:
+        date = _occurrence(employee.date_of_birth, start)
+        if date <= end:
+            yield {
+                'type': 'birthday', 'date': date, **_person(employee),
+                'age': date.year - employee.date_of_birth.year,
+            }
+
+
+def certification_anniversaries(start, end):
+    certifications = (
+        EmployeeCertification.objects.annotate(month_day=month_day('date_obtained'))
+        .filter(_month_day_condition(start, end), date_obtained__lt=start)
+        .select_related('employee', 'certification')
+        .only('date_obtained', 'certification__name', *(f'employee__{name}' for name in NAME_FIELDS))
+    )
+    for certification in certifications:
+        date = _occurrence(certification.date_obtained, start)
+        years = date.year - certification.date_obtained.year
+        if date <= end and years > 0:
+            yield {
+                'type': 'certification_anniversary', 'date': date, **_person(certification.employee),
+                'certification_id': certification.certification_id,
+                'certification': certification.certification.name,
+                'years': years,
+            }
+
+
+EVENT_SOURCES = {
+    'passport_expiry': passport_expiries,
+    'birthday': birthdays,
+    'certification_anniversary': certification_anniversaries,
+}
+
+
+def upcoming_events(start, days, types=EVENT_TYPES):
+    """
+    События в окне [start, start + days] по дате, затем по сотруднику: истечение паспортов,
+    дни рождения и годовщины получения сертификатов. По одному запросу на тип события.
+    """
+    end = start + datetime.timedelta(days=days)
+    events = [event for event_type in types for event in EVENT_SOURCES[event_type](start, end)]
+    return sorted(events, key=lambda event: (event['date'], event['employee_id'], event['type']))
@@ -0,0 +1,108 @@
+import csv
+import json
+from itertools import islice
+from asgiref.sync import sync_to_async
+from rest_framework import serializers
+from rest_framework.utils.encoders import JSONEncoder
+
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+
+# Связи со справочниками выгружаются в формате импорта: вместо блока ответа API
+# (skills_info и т. п.) — поле импорта со списком {id записи справочника, её поля}
+# и названием для читаемости; импорт название игнорирует.
+REFERENCE_COLUMNS = {
+    'skills_info': ('skills', 'skill', 'skill_id', ()),
+    'certifications_info': ('certifications', 'certification', 'certification_id', ('date_obtained',)),
+    'languages_info': ('languages', 'language', 'language_id', ('proficiency_level',)),
+}
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _columns(serializer):
+    # Вложенные объекты (family, passport_info) раскладываются в колонки через точку,
+    # списки выгружаются одной колонкой в виде JSON — так же, как их читает импорт.
+    columns = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if name in REFERENCE_COLUMNS:
+            columns.append((REFERENCE_COLUMNS[name][0], None))
+        elif isinstance(field, serializers.Serializer):
+            columns += [
+                (name, child) for child, child_field in field.fields.items() if not child_field.write_only
+            ]
+        else:
+            columns.append((name, None))
+    return columns
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, cls=JSONEncoder, ensure_ascii=False)
+    return value
+
+
+def _documents(queryset, serializer):
+    # iterator(chunk_size) читает серверным курсором и выполняет prefetch_related
+    # для каждой пачки отдельно, поэтому в памяти находится не больше одной пачки.
+    for employee in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield _importable(serializer.to_representation(employee))
+
+
+def _importable(document):
+    for name, (target, catalog, id_key, fields) in REFERENCE_COLUMNS.items():
+        if name in document:
+            document[target] = [
+                {id_key: item[catalog]['id'], 'name': item[catalog]['name'], **{field: item[field] for field in fields}}
+                for item in document.pop(name)
+            ]
+    return document
+
+
+def stream_jsonl(queryset, serializer):
+    for document in _documents(queryset, serializer):
+        yield json.dumps(document, cls=JSONEncoder, ensure_ascii=False) + '\n'
+
+
+def stream_csv(queryset, serializer):
+    columns = _columns(serializer)
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name if child is None else f'{name}.{child}' for name, child in columns])
+    for document in _documents(queryset, serializer):
+        row = []
+        for name, child in columns:
+            value = document.get(name)
+            if child is not None:
+                value = value.get(child) if value else None
+            row.append(_cell(value))
+        yield writer.writerow(row)
+
+
+def stream_export(queryset, serializer, export_format):
+    if export_format == 'csv':
+        return stream_csv(queryset, serializer)
+    return stream_jsonl(queryset, serializer)
+
+
+async def astream(lines, batch_size=EXPORT_CHUNK_SIZE):
+    """
+    Асинхронная обёртка над генератором выгрузки для ASGI. Синхронный генератор Django
+    под ASGI собирает в список целиком; здесь он продвигается пачками строк в потоке
+    sync_to_async (всегда в одном и том же, вместе с серверным курсором), и каждая пачка
+    отдаётся клиенту до чтения следующей.
+    """
+    next_batch = sync_to_async(lambda: list(islice(lines, batch_size)), thread_sensitive=True)
+    while batch := await next_batch():
+        for line in batch:
+            yield line
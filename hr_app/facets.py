@@ -0,0 +1,100 @@
+import hashlib
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count
+from .catalogs import get_catalog
+from .models import Employee, Education, Family, EmployeeSkill, EmployeeLanguage
+
+VERSION_KEY = 'facets:version'
+
+
+def _cache():
+    return caches[settings.FACETS_CACHE_ALIAS]
+
+
+def get_version():
+    # Без общего кэша версия живёт FACETS_VERSION_TIMEOUT секунд: сброс в другом процессе
+    # виден не позже, чем через этот срок.
+    cache = _cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, timeout=settings.FACETS_VERSION_TIMEOUT)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def invalidate():
+    _cache().set(VERSION_KEY, uuid.uuid4().hex, timeout=settings.FACETS_VERSION_TIMEOUT)
+
+
+def schedule_invalidation():
+    # Как у справочников: сразу, чтобы запись была видна в этой же транзакции, и после фиксации.
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def _choices(rows, field, choices):
+    labels = dict(choices)
+    return [{'value': row[field], 'label': labels.get(row[field], row[field]), 'count': row['count']} for row in rows]
+
+
+def _by_count(rows):
+    return sorted(rows, key=lambda row: (-row['count'], str(row.get('name') or row.get('value'))))
+
+
+def compute_facets(employees=None):
+    """
+    Счётчики сотрудников по навыкам, языкам с уровнем, уровню образования, семейному положению
+    и гражданству — по одному запросу с GROUP BY на таблицу. employees — queryset отобранных
+    сотрудников или None для всех; названия справочников берутся из их кэша.
+    """
+    employees = Employee.objects.all() if employees is None else employees.order_by()
+
+    def link_rows(model):
+        queryset = model.objects.all()
+        if employees.query.where:
+            queryset = queryset.filter(employee__in=employees.values('pk'))
+        return queryset.order_by()
+
+    skill_names = {row['id']: row['name'] for row in get_catalog('skills').rows}
+    language_names = {row['id']: row['name'] for row in get_catalog('languages').rows}
+    skills = link_rows(EmployeeSkill).values('skill_id').annotate(count=Count('id'))
+    languages = link_rows(EmployeeLanguage).values('language_id', 'proficiency_level').annotate(count=Count('id'))
+    # У сотрудника может быть несколько записей об образовании одного уровня.
+    education = link_rows(Education).values('education_level').annotate(count=Count('employee_id', distinct=True))
+    marital = link_rows(Family).values('marital_status').annotate(count=Count('id'))
+    nationality = employees.values('nationality').annotate(count=Count('id'))
+
+    return {
+        'total': employees.count(),
+        'skills': _by_count(
+            {'id': row['skill_id'], 'name': skill_names.get(row['skill_id']), 'count': row['count']}
+            for row in skills
+        ),
+        'languages': _by_count(
+            {
+                'id': row['language_id'], 'name': language_names.get(row['language_id']),
+                'proficiency_level': row['proficiency_level'], 'count': row['count'],
+            }
+            for row in languages
+        ),
+        'education_level': _by_count(_choices(education, 'education_level', Education.EDUCATION_LEVEL_CHOICES)),
+        'marital_status': _by_count(_choices(marital, 'marital_status', Family.MARITAL_STATUS_CHOICES)),
+        'nationality': _by_count({'value': row['nationality'], 'count': row['count']} for row in nationality),
+    }
+
+
+def get_facets(employees, params):
+    """
+    Счётчики из кэша. Ключ — версия (меняется при любой записи сотрудников) и параметры отбора.
+    """
+    digest = hashlib.md5('&'.join(f'{name}={value}' for name, value in sorted(params)).encode()).hexdigest()
+    key = f'facets:{get_version()}:{digest}'
+    cache = _cache()
+    data = cache.get(key)
+    if data is None:
+        data = compute_facets(employees)
+        cache.set(key, data, timeout=settings.FACETS_CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,94 @@
+import datetime
+from django.db.models import Exists, OuterRef
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+from .models import Education, EmployeeLanguage, EmployeeSkill, PassportInfo
+from .search import build_search_query, search_employees
+
+
+class EmployeeSearchFilter(BaseFilterBackend):
+    search_param = 'search'
+
+    def get_search_text(self, request):
+        return request.query_params.get(self.search_param, '')
+
+    def is_active(self, request):
+        return build_search_query(self.get_search_text(request)) is not None
+
+    def filter_queryset(self, request, queryset, view):
+        return search_employees(queryset, self.get_search_text(request))
+
+
+class EmployeeFilter(BaseFilterBackend):
+    """
+    Типизированные условия на вложенные записи. Каждое условие — отдельный EXISTS
+    по связанной таблице, поэтому строки сотрудников не размножаются:
+
+    - skills=1,2 — есть все перечисленные навыки;
+    - languages=3:advanced,4 — владеет каждым языком, при указании уровня — не ниже него;
+    - education_level=master — есть образование этого уровня или выше;
+    - passport_expiry_before=2025-12-31 — срок действия паспорта истекает раньше даты.
+    """
+    # Уровни по возрастанию, в порядке объявления choices: «не ниже» — срез списка от уровня.
+    proficiency_levels = [code for code, _ in EmployeeLanguage.proficiency_level_choices]
+    education_levels = [code for code, _ in Education.EDUCATION_LEVEL_CHOICES]
+
+    @staticmethod
+    def _ids(param, value):
+        try:
+            return [int(item) for item in value.split(',') if item.strip()]
+        except ValueError:
+            raise serializers.ValidationError({param: 'Ожидается список целых чисел через запятую.'})
+
+    def _languages(self, value):
+        languages = []
+        for item in value.split(','):
+            if not item.strip():
+                continue
+            language_id, _, level = item.strip().partition(':')
+            if level and level not in self.proficiency_levels:
+                raise serializers.ValidationError({
+                    'languages': f'Неизвестный уровень {level}; допустимы: {", ".join(self.proficiency_levels)}.'
+                })
+            try:
+                languages.append((int(language_id), level or None))
+            except ValueError:
+                raise serializers.ValidationError({'languages': 'Ожидается список id[:уровень] через запятую.'})
+        return languages
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        for skill_id in self._ids('skills', params.get('skills', '')):
+            queryset = queryset.filter(
+                Exists(EmployeeSkill.objects.filter(employee=OuterRef('pk'), skill_id=skill_id))
+            )
+
+        for language_id, level in self._languages(params.get('languages', '')):
+            languages = EmployeeLanguage.objects.filter(employee=OuterRef('pk'), language_id=language_id)
+            if level:
+                levels = self.proficiency_levels[self.proficiency_levels.index(level):]
+                languages = languages.filter(proficiency_level__in=levels)
+            queryset = queryset.filter(Exists(languages))
+
+        education_level = params.get('education_level')
+        if education_level:
+            if education_level not in self.education_levels:
+                raise serializers.ValidationError({
+                    'education_level': f'Допустимые уровни: {", ".join(self.education_levels)}.'
+                })
+            queryset = queryset.filter(Exists(Education.objects.filter(
+                employee=OuterRef('pk'),
+                education_level__in=self.education_levels[self.education_levels.index(education_level):],
+            )))
+
+        expiry_before = params.get('passport_expiry_before')
+        if expiry_before:
+            try:
+                date = datetime.date.fromisoformat(expiry_before)
+            except ValueError:
+                raise serializers.ValidationError({'passport_expiry_before': 'Ожидается дата в формате ГГГГ-ММ-ДД.'})
+            queryset = queryset.filter(
+                Exists(PassportInfo.objects.filter(employee=OuterRef('pk'), date_expiry__lt=date))
+            )
+        return queryset
@@ -167,11 +167,6 @@ class SkillCreationForm(forms.ModelForm):
             'name': 'Название навыка',
         }
 
-    def clean(self):
-        name = self.cleaned_data['name']
-        if Skill.objects.filter(name__iexact=name).exists():
-            raise ValidationError("Навык с таким названием уже существует.")
-
 class CertificationCreationForm(forms.ModelForm):
     class Meta:
         model = Certification
@@ -179,10 +174,6 @@ class CertificationCreationForm(forms.ModelForm):
         labels = {
             'name': 'Название сертификата',
         }
-    def clean(self):
-        name = self.cleaned_data['name']
-        if Certification.objects.filter(name__iexact=name).exists():
-            raise ValidationError("Такой сертификат уже существует.")  
 
 class LanguageCreationForm(forms.ModelForm):
     class Meta:
@@ -191,10 +182,6 @@ class LanguageCreationForm(forms.ModelForm):
         labels = {
             'name': 'Язык',
         }
-    def clean(self):
-        name = self.cleaned_data['name']
-        if Language.objects.filter(name__iexact=name).exists():
-            raise ValidationError("Такой язык уже существует.")
 
 EducationFormSet = inlineformset_factory(
     Employee, Education, form=EducationForm,
@@ -0,0 +1,308 @@
+import csv
+import io
+import json
+from itertools import islice
+from django.db import DatabaseError, connection, transaction
+from rest_framework import serializers
+from rest_framework.serializers import as_serializer_error
+from . import facets
+from .catalogs import existing_ids
+from .models import (
+    Employee, Education, WorkExperience, Family, PassportInfo,
+    EmployeeSkill, EmployeeCertification, EmployeeLanguage
+)
+from .search import update_search_documents
+from .serializers import EmployeeSerializer
+
+IMPORT_CHUNK_SIZE = 500
+IMPORT_FORMATS = ('csv', 'jsonl')
+
+NESTED_LISTS = ('educations', 'work_experiences', 'skills', 'certifications', 'languages')
+
+
+class EmployeeImportSerializer(EmployeeSerializer):
+    # Уникальность email и номера паспорта проверяется одним запросом на пачку строк.
+    class Meta(EmployeeSerializer.Meta):
+        extra_kwargs = {'email': {'validators': []}}
+
+
+class ImportReport:
+    def __init__(self, max_errors=1000):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        self.max_errors = max_errors
+
+    def add_error(self, row, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': row, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+
+def detect_format(filename, default='jsonl'):
+    extension = filename.rsplit('.', 1)[-1].lower() if filename and '.' in filename else ''
+    return extension if extension in IMPORT_FORMATS else default
+
+
+def _record_from_csv(row):
+    # Колонки вида family.marital_status собираются во вложенные объекты,
+    # а списки (educations, skills, ...) передаются в ячейке как JSON.
+    record = {}
+    for column, value in row.items():
+        if column in NESTED_LISTS:
+            record[column] = json.loads(value) if value else []
+        elif not column or value in (None, ''):
+            continue
+        elif '.' in column:
+            parent, child = column.split('.', 1)
+            record.setdefault(parent, {})[child] = value
+        else:
+            record[column] = value
+    return record
+
+
+def read_records(stream, file_format):
+    """
+    Построчно читает CSV или JSONL и отдаёт тройки (номер строки, запись, ошибка разбора).
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            try:
+                yield reader.line_num, _record_from_csv(row), None
+            except ValueError as error:
+                yield reader.line_num, None, {'non_field_errors': [f'Некорректный JSON: {error}']}
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            yield line_number, None, {'non_field_errors': [f'Некорректный JSON: {error}']}
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, {'non_field_errors': ['Ожидается JSON-объект.']}
+            continue
+        yield line_number, record, None
+
+
+def import_employees(records, chunk_size=IMPORT_CHUNK_SIZE, report=None, on_error=None):
+    report = report or ImportReport()
+    seen = {'email': set(), 'passport_number': set()}
+    # Один экземпляр сериализатора на весь импорт: построение его полей дороже самой проверки строки.
+    validator = EmployeeImportSerializer()
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return report
+        _import_chunk(chunk, report, seen, on_error, validator)
+
+
+def _reject(report, on_error, row, errors):
+    report.add_error(row, errors)
+    if on_error is not None:
+        on_error(row, errors)
+
+
+def _import_chunk(chunk, report, seen, on_error, validator):
+    valid = []
+    for row, record, parse_errors in chunk:
+        if parse_errors:
+            _reject(report, on_error, row, parse_errors)
+            continue
+        try:
+            data = validator.run_validation(record)
+        except serializers.ValidationError as error:
+            _reject(report, on_error, row, json.loads(json.dumps(as_serializer_error(error))))
+            continue
+        malformed = [
+            key for key, model, id_key, label in EmployeeSerializer.REFERENCES
+            if not all(isinstance(item, dict) for item in data.get(key, []))
+        ]
+        if malformed:
+            _reject(report, on_error, row, {key: ['Ожидается список объектов.'] for key in malformed})
+            continue
+        valid.append((row, data))
+
+    valid = _check_references(valid, report, on_error)
+    valid = _check_unique(valid, report, seen, on_error)
+    if not valid:
+        return
+
+    try:
+        with transaction.atomic():
+            _write_rows(valid)
+        report.created += len(valid)
+    except DatabaseError:
+        # Пачка откатилась целиком; строки пишутся по одной, чтобы найти виновные.
+        for row, data in valid:
+            try:
+                with transaction.atomic():
+                    _write_rows([(row, data)])
+                report.created += 1
+            except DatabaseError as error:
+                _reject(report, on_error, row, {'non_field_errors': [str(error).strip()]})
+
+
+def _check_references(valid, report, on_error):
+    # Id, которых нет в снимке справочника, проверяются одним запросом на справочник за пачку.
+    found = {
+        key: existing_ids(key, {
+            EmployeeSerializer._reference_id(item.get(id_key)) for _, data in valid for item in data.get(key, [])
+        })
+        for key, model, id_key, label in EmployeeSerializer.REFERENCES
+    }
+
+    date_field = serializers.DateField()
+    proficiency_levels = dict(EmployeeLanguage.proficiency_level_choices)
+    checked = []
+    for row, data in valid:
+        errors = {}
+        for key, model, id_key, label in EmployeeSerializer.REFERENCES:
+            missing = [
+                item.get(id_key) for item in data.get(key, [])
+                if EmployeeSerializer._reference_id(item.get(id_key)) not in found[key]
+            ]
+            if missing:
+                errors[key] = [f"{label} with id {value} does not exist." for value in missing]
+        # Поля связей приходят сырыми списками и при записи через COPY должны быть уже корректны.
+        for item in data.get('certifications', []):
+            try:
+                item['date_obtained'] = date_field.to_internal_value(item.get('date_obtained'))
+            except serializers.ValidationError as error:
+                errors.setdefault('certifications', []).extend(error.detail)
+        for item in data.get('languages', []):
+            if item.get('proficiency_level') not in proficiency_levels:
+                errors.setdefault('languages', []).append(
+                    f"Недопустимый уровень владения: {item.get('proficiency_level')}."
+                )
+        if errors:
+            _reject(report, on_error, row, errors)
+        else:
+            checked.append((row, data))
+    return checked
+
+
+def _check_unique(valid, report, seen, on_error):
+    emails = {data['email'] for _, data in valid}
+    passports = {data['passport_info']['passport_number'] for _, data in valid}
+    taken_emails = set(Employee.objects.filter(email__in=emails).values_list('email', flat=True))
+    taken_passports = set(
+        PassportInfo.objects.filter(passport_number__in=passports).values_list('passport_number', flat=True)
+    )
+
+    checked = []
+    for row, data in valid:
+        email = data['email']
+        passport_number = data['passport_info']['passport_number']
+        errors = {}
+        if email in taken_emails or email in seen['email']:
+            errors['email'] = ['Сотрудник с такой электронной почтой уже существует.']
+        if passport_number in taken_passports or passport_number in seen['passport_number']:
+            errors['passport_info'] = {'passport_number': ['Паспорт с таким номером уже существует.']}
+        if errors:
+            _reject(report, on_error, row, errors)
+            continue
+        seen['email'].add(email)
+        seen['passport_number'].add(passport_number)
+        checked.append((row, data))
+    return checked
+
+
+def _write_rows(valid):
+    employees = []
+    for _, data in valid:
+        fields = {
+            name: value for name, value in data.items()
+            if name not in EmployeeSerializer.NESTED_SOURCES and name not in NESTED_LISTS
+        }
+        employees.append(Employee(**fields))
+    Employee.objects.bulk_create(employees)
+
+    families, passports, educations, work_experiences = [], [], [], []
+    skills, certifications, languages = [], [], []
+    for employee, (_, data) in zip(employees, valid):
+        families.append(Family(employee=employee, **data['family']))
+        passports.append(PassportInfo(employee=employee, **data['passport_info']))
+        educations += [Education(employee=employee, **item) for item in data.get('educations', [])]
+        work_experiences += [WorkExperience(employee=employee, **item) for item in data.get('work_experiences', [])]
+        skills += [
+            EmployeeSkill(employee=employee, skill_id=skill_id)
+            for skill_id in {EmployeeSerializer._reference_id(item['skill_id']) for item in data.get('skills', [])}
+        ]
+        certifications += [
+            EmployeeCertification(
+                employee=employee,
+                certification_id=EmployeeSerializer._reference_id(item['certification_id']),
+                date_obtained=item.get('date_obtained')
+            )
+            for item in _unique_by(data.get('certifications', []), 'certification_id')
+        ]
+        languages += [
+            EmployeeLanguage(
+                employee=employee,
+                language_id=EmployeeSerializer._reference_id(item['language_id']),
+                proficiency_level=item.get('proficiency_level')
+            )
+            for item in _unique_by(data.get('languages', []), 'language_id')
+        ]
+
+    for model, objs in (
+        (Family, families), (PassportInfo, passports), (Education, educations),
+        (WorkExperience, work_experiences), (EmployeeSkill, skills),
+        (EmployeeCertification, certifications), (EmployeeLanguage, languages),
+    ):
+        copy_rows(model, objs)
+
+    # Сигналы при массовой записи не срабатывают, поэтому документы считаются одним UPDATE на пачку.
+    update_search_documents([employee.pk for employee in employees])
+    facets.schedule_invalidation()
+
+
+def _unique_by(items, id_key):
+    unique = {}
+    for item in items:
+        unique[EmployeeSerializer._reference_id(item[id_key])] = item
+    return unique.values()
+
+
+def copy_rows(model, objs):
+    """
+    Записывает строки через COPY FROM STDIN, если драйвер это умеет (psycopg 3 или psycopg2),
+    иначе через bulk_create. Первичные ключи у записанных объектов не заполняются.
+    """
+    if not objs:
+        return
+    with connection.cursor() as cursor:
+        if connection.vendor != 'postgresql' or not (hasattr(cursor, 'copy') or hasattr(cursor, 'copy_expert')):
+            model.objects.bulk_create(objs)
+            return
+
+        fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+        buffer = io.StringIO()
+        for obj in objs:
+            values = []
+            for field in fields:
+                value = field.get_db_prep_save(field.pre_save(obj, True), connection)
+                values.append('' if value is None else '"' + str(value).replace('"', '""') + '"')
+            buffer.write(','.join(values) + '\n')
+
+        columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+        sql = f'COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)'
+        if hasattr(cursor, 'copy'):
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+        else:
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
@@ -0,0 +1,124 @@
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar('request_metrics', default=None)
+
+# Значения в IN (...) и VALUES (...) и числовые литералы заменяются, чтобы запросы,
+# отличающиеся только параметрами, давали один отпечаток.
+_PLACEHOLDER_LISTS = re.compile(r'\(\s*(?:%s|\?|\d+)(?:\s*,\s*(?:%s|\?|\d+))*\s*\)')
+_NUMBERS = re.compile(r'\b\d+\b')
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_SPACES = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    sql = _STRINGS.sub('?', sql)
+    sql = _PLACEHOLDER_LISTS.sub('(...)', sql)
+    sql = _NUMBERS.sub('?', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+class RequestMetrics:
+    """
+    Запросы к базе и замеры участков одного HTTP-запроса. Время базы, потраченное внутри
+    участка (например, ленивые запросы во время сериализации), из участка вычитается.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = []
+        self.db_ms = 0.0
+        self.sections = {}
+        self._stack = []
+
+    def __call__(self, execute, sql, params, many, context):
+        # Обёртка для connection.execute_wrapper().
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            self.db_ms += duration
+            for section in self._stack:
+                section['db_ms'] += duration
+            self.queries.append((sql, duration))
+
+    @contextmanager
+    def section(self, name):
+        section = {'db_ms': 0.0}
+        self._stack.append(section)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._stack.remove(section)
+            elapsed = (time.perf_counter() - started) * 1000 - section['db_ms']
+            self.sections[name] = self.sections.get(name, 0.0) + max(elapsed, 0.0)
+
+    def begin_render(self):
+        self._render_started = (time.perf_counter(), self.db_ms)
+
+    def end_render(self):
+        started, db_ms = self._render_started
+        elapsed = (time.perf_counter() - started) * 1000 - (self.db_ms - db_ms)
+        self.sections['render'] = self.sections.get('render', 0.0) + max(elapsed, 0.0)
+
+    @property
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def worst_queries(self, limit):
+        worst = sorted(self.queries, key=lambda query: query[1], reverse=True)[:limit]
+        return [{'sql': sql[:2000], 'ms': round(duration, 2)} for sql, duration in worst]
+
+    def repeated_queries(self, threshold):
+        counts = {}
+        for sql, duration in self.queries:
+            key = fingerprint(sql)
+            count, total = counts.get(key, (0, 0.0))
+            counts[key] = (count + 1, total + duration)
+        repeated = [
+            {'fingerprint': key[:2000], 'count': count, 'ms': round(total, 2)}
+            for key, (count, total) in counts.items() if count >= threshold
+        ]
+        return sorted(repeated, key=lambda item: item['count'], reverse=True)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Обёртка выполнения запросов, постоянно установленная на соединениях (hr_app/db/base.py).
+    Запрос записывается в замеры текущего HTTP-запроса: ContextVar переходит и в потоки
+    sync_to_async, где под ASGI выполняются и асинхронный ORM, и синхронные представления.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def start_request():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def current_metrics():
+    return _current.get()
+
+
+@contextmanager
+def measure(name):
+    """
+    Замеряет участок текущего запроса (например, 'serialize'); вне запроса ничего не делает.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    with metrics.section(name):
+        yield
@@ -0,0 +1,246 @@
+import datetime
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from pathlib import Path
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from .analytics import compare_summaries, rebuild_summaries
+from .exporter import stream_export
+from .importer import detect_format, import_employees, read_records
+from .models import Employee, Job
+from .search import update_search_documents
+
+logger = logging.getLogger('hr_app.jobs')
+
+JOB_HANDLERS = {}
+REINDEX_CHUNK_SIZE = 1000
+
+_stop = threading.Event()
+
+
+def job_handler(kind):
+    def register(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return register
+
+
+def storage_path(name):
+    directory = Path(settings.JOB_STORAGE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / name
+
+
+def enqueue(kind, payload=None, max_attempts=None):
+    return Job.objects.create(
+        kind=kind, payload=payload or {}, max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+class Progress:
+    """
+    Запись прогресса задачи не чаще раза в JOB_PROGRESS_INTERVAL секунд; заодно служит
+    отметкой, что обработчик жив.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.done = 0
+        self.total = None
+        self.written = 0.0
+
+    def __call__(self, done, total=None):
+        self.done = done
+        if total is not None:
+            self.total = total
+        if time.monotonic() - self.written >= settings.JOB_PROGRESS_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        self.written = time.monotonic()
+        Job.objects.filter(pk=self.job.pk).update(
+            progress_done=self.done, progress_total=self.total, heartbeat_at=timezone.now()
+        )
+
+
+class Heartbeat(threading.Thread):
+    """
+    Отмечает выполняемую задачу живой из отдельного потока (со своим соединением), пока
+    обработчик работает: шаг без вызовов Progress дольше JOB_LEASE_SECONDS иначе вернул бы
+    задачу в очередь, и её выполнил бы второй обработчик.
+    """
+
+    def __init__(self, job):
+        super().__init__(name=f'job-{job.pk}-heartbeat', daemon=True)
+        self.job = job
+        self.finished = threading.Event()
+
+    def run(self):
+        try:
+            while not self.finished.wait(settings.JOB_LEASE_SECONDS / 3):
+                try:
+                    Job.objects.filter(pk=self.job.pk, status=Job.RUNNING).update(heartbeat_at=timezone.now())
+                except DatabaseError:
+                    logger.warning('Не удалось отметить задачу #%s', self.job.pk, exc_info=True)
+                    connection.close()
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.finished.set()
+        self.join()
+
+
+def requeue_stale():
+    """
+    Возвращает в очередь задачи, обработчик которых перестал отмечаться дольше JOB_LEASE_SECONDS
+    (процесс упал или был убит). Задачи без оставшихся попыток помечаются ошибкой.
+    """
+    deadline = timezone.now() - datetime.timedelta(seconds=settings.JOB_LEASE_SECONDS)
+    stale = Job.objects.filter(status=Job.RUNNING, heartbeat_at__lt=deadline)
+    message = 'Обработчик перестал отвечать.'
+    stale.filter(attempts__lt=F('max_attempts')).update(status=Job.QUEUED, worker='', error=message)
+    stale.update(status=Job.FAILED, error=message, finished_at=timezone.now())
+
+
+def claim(worker):
+    # SKIP LOCKED: параллельные обработчики не ждут друг друга и не берут одну задачу дважды.
+    with transaction.atomic():
+        job = Job.objects.due().select_for_update(skip_locked=True).order_by('run_after', 'id').first()
+        if job is None:
+            return None
+        now = timezone.now()
+        job.status = Job.RUNNING
+        job.attempts += 1
+        job.worker = worker
+        job.started_at = job.heartbeat_at = now
+        job.save(update_fields=['status', 'attempts', 'worker', 'started_at', 'heartbeat_at'])
+    return job
+
+
+def run_job(job):
+    progress = Progress(job)
+    heartbeat = Heartbeat(job)
+    heartbeat.start()
+    try:
+        result = JOB_HANDLERS[job.kind](job, progress)
+    except Exception as error:
+        logger.exception('Задача %s #%s завершилась ошибкой (попытка %s)', job.kind, job.pk, job.attempts)
+        message = ''.join(traceback.format_exception_only(error)).strip()
+        now = timezone.now()
+        if job.attempts < job.max_attempts:
+            # Повтор с экспоненциальной задержкой: 1, 2, 4… × JOB_RETRY_DELAY.
+            delay = settings.JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.QUEUED, worker='', error=message, run_after=now + datetime.timedelta(seconds=delay)
+            )
+        else:
+            Job.objects.filter(pk=job.pk).update(status=Job.FAILED, error=message, finished_at=now)
+        return False
+    finally:
+        heartbeat.stop()
+
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.SUCCEEDED, result=result, progress_done=progress.done, progress_total=progress.total,
+        finished_at=timezone.now(), heartbeat_at=timezone.now(),
+    )
+    return True
+
+
+def work(worker=None, burst=False, poll_interval=None):
+    """
+    Цикл обработчика: берёт задачи по одной, пока не получит сигнал остановки.
+    В режиме burst завершается, когда очередь опустела. Возвращает число выполненных задач.
+    Ошибки базы (перезапуск, переключение на реплику) не завершают цикл: оборванное соединение
+    заменяется перед следующей попыткой, а задача, чей итог не удалось записать, вернётся
+    в очередь по истечении аренды.
+    """
+    worker = worker or f'{socket.gethostname()}:{os.getpid()}'
+    poll_interval = settings.JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+    processed = 0
+    while not _stop.is_set():
+        close_old_connections()
+        try:
+            job = claim(worker)
+            if job is None:
+                requeue_stale()
+                if burst:
+                    break
+                _stop.wait(poll_interval)
+                continue
+            run_job(job)
+        except DatabaseError:
+            logger.exception('Ошибка базы данных в цикле обработчика; повтор через %s с', poll_interval)
+            _stop.wait(poll_interval)
+            continue
+        processed += 1
+    return processed
+
+
+def stop(*args):
+    # Текущая задача дорабатывает, новые не берутся.
+    _stop.set()
+
+
+def stopping():
+    return _stop.is_set()
+
+
+@job_handler('import')
+def run_import(job, progress):
+    path = Path(job.payload['path'])
+    file_format = job.payload.get('format') or detect_format(path.name)
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        # Оценка по числу строк файла (без заголовка CSV) — для отображения прогресса.
+        total = sum(1 for _ in stream) - (file_format == 'csv')
+        stream.seek(0)
+
+        def records():
+            for done, item in enumerate(read_records(stream, file_format), start=1):
+                progress(done, total)
+                yield item
+
+        # Повтор после сбоя не дублирует сотрудников: уже загруженные строки отклоняются
+        # проверкой уникальности email и номера паспорта.
+        report = import_employees(records())
+    path.unlink(missing_ok=True)
+    return report.as_dict()
+
+
+@job_handler('export')
+def run_export(job, progress):
+    # Запрос и сериализатор строятся так же, как в EmployeeViewSet.export, по сохранённым параметрам.
+    from .views import EmployeeViewSet
+    export_format = job.payload.get('file_format', 'jsonl')
+    queryset, serializer = EmployeeViewSet.export_source(job.payload.get('params', {}))
+    total = queryset.count()
+    path = storage_path(f'export-{job.pk}.{export_format}')
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        for done, line in enumerate(stream_export(queryset, serializer, export_format), start=1):
+            file.write(line)
+            progress(min(done, total), total)
+    return {'file': path.name, 'file_format': export_format, 'rows': total}
+
+
+@job_handler('reindex')
+def run_reindex(job, progress):
+    ids = list(Employee.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(ids), REINDEX_CHUNK_SIZE):
+        with transaction.atomic():
+            update_search_documents(ids[start:start + REINDEX_CHUNK_SIZE])
+        progress(min(start + REINDEX_CHUNK_SIZE, len(ids)), len(ids))
+    return {'employees': len(ids)}
+
+
+@job_handler('rebuild_analytics')
+def run_rebuild_analytics(job, progress):
+    differences = len(compare_summaries())
+    rebuild_summaries()
+    progress(1, 1)
+    return {'differences': differences}
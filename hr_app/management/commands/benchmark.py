@@ -0,0 +1,60 @@
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from hr_app.benchmark import SCENARIOS, Benchmark, compare, load_results, save_results
+from hr_app.models import Employee
+from hr_app.seed import seed_employees
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет список, карточку, поиск, создание и изменение сотрудников через EmployeeViewSet: '
+        'p50/p99 и число запросов на вызов. Результат сохраняется в JSON для сравнения между коммитами.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=0, help='Досоздать сотрудников до этого числа.')
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Сценарии через запятую.')
+        parser.add_argument('--seed', type=int)
+        parser.add_argument('--output', help='Файл результатов; по умолчанию benchmarks/<коммит>.json.')
+        parser.add_argument('--compare', help='Файл предыдущего прогона для сравнения.')
+
+    def handle(self, *args, **options):
+        scenarios = [name.strip() for name in options['scenarios'].split(',') if name.strip()]
+        unknown = [name for name in scenarios if name not in SCENARIOS]
+        if unknown:
+            raise CommandError(f"Неизвестные сценарии: {', '.join(unknown)}.")
+
+        missing = options['employees'] - Employee.objects.count()
+        if missing > 0:
+            self.stdout.write(f'Создаю {missing} сотрудников...')
+            seed_employees(missing, seed=options['seed'])
+
+        benchmark = Benchmark(iterations=options['iterations'], warmup=options['warmup'], seed=options['seed'])
+        try:
+            results = benchmark.run(scenarios)
+        except RuntimeError as error:
+            raise CommandError(error)
+
+        self.stdout.write(f"Коммит {results['commit']}, сотрудников: {results['employees']}")
+        self.stdout.write(f"{'сценарий':<12} {'p50, мс':>10} {'p99, мс':>10} {'среднее':>10} {'запросов':>9}")
+        for name, result in results['results'].items():
+            self.stdout.write(
+                f"{name:<12} {result['p50_ms']:>10.2f} {result['p99_ms']:>10.2f} "
+                f"{result['mean_ms']:>10.2f} {result['queries_per_call']:>9.2f}"
+            )
+
+        output = Path(options['output'] or Path(settings.BASE_DIR) / 'benchmarks' / f"{results['commit']}.json")
+        save_results(results, output)
+        self.stdout.write(self.style.SUCCESS(f'Результаты сохранены в {output}'))
+
+        if options['compare']:
+            try:
+                baseline = load_results(options['compare'])
+            except (OSError, ValueError) as error:
+                raise CommandError(error)
+            self.stdout.write(f"Сравнение с {baseline.get('commit', options['compare'])}:")
+            for name, metric, before, after, change in compare(results, baseline):
+                self.stdout.write(f'{name:<12} {metric:<17} {before:>10.2f} -> {after:>10.2f} ({change:+.1f}%)')
@@ -0,0 +1,40 @@
+import json
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from hr_app.importer import IMPORT_CHUNK_SIZE, IMPORT_FORMATS, detect_format, import_employees, read_records
+
+
+class Command(BaseCommand):
+    help = 'Импортирует профили сотрудников из файла CSV или JSONL пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу или "-" для чтения из stdin.')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='Формат файла; по умолчанию по расширению.')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE)
+        parser.add_argument('--errors', help='Файл для отчёта об ошибках в формате JSONL; по умолчанию stderr.')
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or detect_format(options['path'])
+        errors_file = open(options['errors'], 'w', encoding='utf-8') if options['errors'] else self.stderr
+
+        def on_error(row, errors):
+            errors_file.write(json.dumps({'row': row, 'errors': errors}, ensure_ascii=False) + '\n')
+
+        try:
+            stream = sys.stdin if options['path'] == '-' else open(options['path'], encoding='utf-8-sig', newline='')
+        except OSError as error:
+            raise CommandError(error)
+
+        try:
+            report = import_employees(
+                read_records(stream, file_format),
+                chunk_size=options['chunk_size'],
+                on_error=on_error,
+            )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            if options['errors']:
+                errors_file.close()
+
+        self.stdout.write(self.style.SUCCESS(f'Создано: {report.created}, с ошибками: {report.failed}.'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from hr_app.analytics import compare_summaries, rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сводные таблицы аналитики с нуля и сообщает, расходились ли они с данными.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только сравнить сводки с пересчётом, ничего не записывая; при расхождениях код возврата 1.',
+        )
+
+    def handle(self, *args, **options):
+        differences = compare_summaries()
+        for model, key, stored, expected in differences:
+            self.stdout.write(f'{model._meta.verbose_name}: {key}: хранится {stored}, ожидается {expected}')
+        if options['check']:
+            if differences:
+                raise CommandError(f'Расхождений: {len(differences)}.')
+            self.stdout.write(self.style.SUCCESS('Сводные таблицы совпадают с данными.'))
+            return
+        rebuild_summaries()
+        self.stdout.write(self.style.SUCCESS(f'Сводные таблицы пересчитаны, расхождений было: {len(differences)}.'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from hr_app.seed import SEED_CHUNK_SIZE, seed_employees
+
+
+class Command(BaseCommand):
+    help = 'Быстро заполняет базу синтетическими сотрудниками со всеми вложенными записями.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('count', type=int, help='Сколько сотрудников создать.')
+        parser.add_argument('--seed', type=int, help='Зерно генератора для воспроизводимых данных.')
+        parser.add_argument('--chunk-size', type=int, default=SEED_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        created = seed_employees(options['count'], seed=options['seed'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Создано сотрудников: {len(created)}.'))
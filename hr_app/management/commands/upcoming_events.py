@@ -0,0 +1,46 @@
+import datetime
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from hr_app.events import EVENT_TYPES, MAX_WINDOW_DAYS, upcoming_events
+
+EVENT_TITLES = {
+    'passport_expiry': 'истекает паспорт',
+    'birthday': 'день рождения',
+    'certification_anniversary': 'годовщина сертификата',
+}
+
+
+class Command(BaseCommand):
+    help = 'Выводит ближайшие события: истечение паспортов, дни рождения и годовщины сертификатов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help=f'Размер окна в днях, до {MAX_WINDOW_DAYS}.')
+        parser.add_argument(
+            '--start', type=datetime.date.fromisoformat, help='Начало окна, ГГГГ-ММ-ДД; по умолчанию сегодня.'
+        )
+        parser.add_argument('--types', default=','.join(EVENT_TYPES), help='Типы событий через запятую.')
+        parser.add_argument('--json', action='store_true', help='Вывести события в формате JSON Lines.')
+
+    def handle(self, *args, **options):
+        types = [name.strip() for name in options['types'].split(',') if name.strip()]
+        if not types or set(types) - set(EVENT_TYPES):
+            raise CommandError(f'Допустимые типы: {", ".join(EVENT_TYPES)}.')
+        if not 0 <= options['days'] <= MAX_WINDOW_DAYS:
+            raise CommandError(f'--days: от 0 до {MAX_WINDOW_DAYS}.')
+
+        events = upcoming_events(options['start'] or datetime.date.today(), options['days'], types)
+        for event in events:
+            if options['json']:
+                self.stdout.write(json.dumps(event, cls=DjangoJSONEncoder, ensure_ascii=False))
+                continue
+            name = ' '.join(filter(None, (event['last_name'], event['first_name'], event['patronymic'])))
+            if event['type'] == 'passport_expiry':
+                details = event['passport_number']
+            elif event['type'] == 'birthday':
+                details = f'исполняется {event["age"]}'
+            else:
+                details = f'{event["certification"]}, {event["years"]}-я годовщина'
+            self.stdout.write(f'{event["date"]:%d.%m.%Y}  {EVENT_TITLES[event["type"]]}: {name} ({details})')
+        if not options['json']:
+            self.stdout.write(self.style.SUCCESS(f'Событий: {len(events)}.'))
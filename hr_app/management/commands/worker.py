@@ -0,0 +1,64 @@
+import multiprocessing
+import signal
+from multiprocessing.connection import wait
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+def worker_process(index, burst, poll_interval):
+    # Точка входа дочернего процесса (spawn): модели импортируются только после django.setup().
+    import django
+    django.setup()
+    from hr_app.jobs import stop, work
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    work(burst=burst, poll_interval=poll_interval)
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди: импорт, экспорт, переиндексацию, пересчёт аналитики.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='Число процессов-обработчиков.')
+        parser.add_argument('--burst', action='store_true', help='Завершиться, когда очередь опустеет.')
+        parser.add_argument('--poll-interval', type=float, help='Пауза между опросами пустой очереди, секунд.')
+
+    def handle(self, *args, **options):
+        from hr_app.jobs import stop, stopping, work
+
+        # SIGTERM/SIGINT: текущие задачи дорабатывают, новые не берутся.
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        if options['processes'] <= 1:
+            processed = work(burst=options['burst'], poll_interval=options['poll_interval'])
+            self.stdout.write(self.style.SUCCESS(f'Выполнено задач: {processed}.'))
+            return
+
+        # Открытые соединения с базой не должны достаться дочерним процессам.
+        connections.close_all()
+        context = multiprocessing.get_context('spawn')
+
+        def start(index):
+            process = context.Process(target=worker_process, args=(index, options['burst'], options['poll_interval']))
+            process.start()
+            return process
+
+        processes = [start(index) for index in range(options['processes'])]
+        self.stdout.write(f'Запущено обработчиков: {len(processes)}.')
+        stopped = False
+        while True:
+            # Упавший обработчик (ошибка, OOM) заменяется новым; в режиме burst и при остановке — нет.
+            for index, process in enumerate(processes):
+                if process.exitcode not in (None, 0) and not (options['burst'] or stopping()):
+                    self.stderr.write(f'Обработчик {index} завершился с кодом {process.exitcode}; перезапуск.')
+                    processes[index] = start(index)
+            alive = [process for process in processes if process.is_alive()]
+            if not alive:
+                break
+            # Ожидание с таймаутом, чтобы главный процесс успевал обработать сигнал и передать его дальше.
+            wait([process.sentinel for process in alive], timeout=1)
+            if stopping() and not stopped:
+                stopped = True
+                for process in alive:
+                    process.terminate()
+        self.stdout.write(self.style.SUCCESS('Обработчики остановлены.'))
@@ -0,0 +1,51 @@
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+from .models import Employee
+from .search import LANGUAGE_LEVEL_CODES, language_level_code
+
+TABLE = Employee._meta.db_table
+
+
+def coverage_expression(skills, certifications, languages):
+    """
+    Доля покрытых требований от 0 до 1. Навык и сертификат дают по единице; язык — вес уровня:
+    без требования к уровню это уровень / 4 (родной — 1), с требованием — уровень / требуемый,
+    но не больше 1. Считается по массивам сотрудника, без соединений со связанными таблицами.
+    """
+    parts, params = [], []
+    for column, ids in (('skill_ids', skills), ('certification_ids', certifications)):
+        if ids:
+            parts.append(f'(SELECT count(*) FROM unnest("{TABLE}"."{column}") AS item WHERE item = ANY(%s))')
+            params.append(list(ids))
+    for language_id, level in languages:
+        parts.append(
+            f'LEAST((SELECT coalesce(max(code %% 10), 0) FROM unnest("{TABLE}"."language_levels") AS code '
+            f'WHERE code / 10 = %s)::float / %s, 1)'
+        )
+        params += [language_id, LANGUAGE_LEVEL_CODES[level] if level else len(LANGUAGE_LEVEL_CODES)]
+    total = len(skills) + len(certifications) + len(languages)
+    return RawSQL(f'({" + ".join(parts)})::float / {total}', params, output_field=FloatField())
+
+
+def match_employees(queryset, skills, certifications, languages, limit):
+    """
+    Сотрудники, покрывающие хотя бы одно требование, по убыванию покрытия. Кандидаты отбираются
+    пересечением массивов (&&) по GIN-индексам, оценка и сортировка — в том же запросе.
+    languages — пары (id языка, минимальный уровень или None).
+    """
+    condition = Q()
+    if skills:
+        condition |= Q(skill_ids__overlap=list(skills))
+    if certifications:
+        condition |= Q(certification_ids__overlap=list(certifications))
+    if languages:
+        condition |= Q(language_levels__overlap=[
+            language_level_code(language_id, rank)
+            for language_id, _ in languages for rank in LANGUAGE_LEVEL_CODES.values()
+        ])
+    return (
+        queryset.filter(condition)
+        .annotate(score=coverage_expression(skills, certifications, languages))
+        .only('id', 'last_name', 'first_name', 'patronymic', 'skill_ids', 'certification_ids', 'language_levels')
+        .order_by('-score', 'id')[:limit]
+    )
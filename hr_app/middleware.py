@@ -0,0 +1,74 @@
+import json
+import logging
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from .instrumentation import current_metrics, end_request, start_request
+
+logger = logging.getLogger('hr_app.performance')
+
+
+class RequestTimingMiddleware:
+    """
+    Считает запросы к базе и время по участкам (db, serialize, render, app) для каждого
+    HTTP-запроса, отдаёт их в заголовке Server-Timing и пишет структурированную запись
+    в лог hr_app.performance, если запрос медленный или в нём есть повторяющиеся запросы (N+1).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Запросы к базе попадают в metrics через обёртку соединений (hr_app/db/base.py).
+        metrics, token = start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self._finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics, token = start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        return self._finish(request, response, metrics)
+
+    def process_template_response(self, request, response):
+        # DRF-ответы рендерятся после представления; время рендера замеряется отдельно.
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.begin_render()
+            response.add_post_render_callback(lambda rendered: metrics.end_render())
+        return response
+
+    def _finish(self, request, response, metrics):
+        total_ms = metrics.total_ms
+        sections = dict(metrics.sections)
+        app_ms = max(total_ms - metrics.db_ms - sum(sections.values()), 0.0)
+        timings = [f'db;desc="{len(metrics.queries)} queries";dur={metrics.db_ms:.1f}']
+        timings += [f'{name};dur={duration:.1f}' for name, duration in sections.items()]
+        timings += [f'app;dur={app_ms:.1f}', f'total;dur={total_ms:.1f}']
+        response['Server-Timing'] = ', '.join(timings)
+
+        repeated = metrics.repeated_queries(settings.REPEATED_QUERY_THRESHOLD)
+        if total_ms >= settings.SLOW_REQUEST_MS or repeated:
+            logger.warning(json.dumps({
+                'event': 'slow_request' if total_ms >= settings.SLOW_REQUEST_MS else 'repeated_queries',
+                'method': request.method,
+                'path': request.get_full_path(),
+                'status': response.status_code,
+                'total_ms': round(total_ms, 2),
+                'db_ms': round(metrics.db_ms, 2),
+                'queries': len(metrics.queries),
+                'sections_ms': {name: round(duration, 2) for name, duration in sections.items()},
+                'worst_queries': metrics.worst_queries(settings.SLOW_REQUEST_WORST_QUERIES),
+                'repeated_queries': repeated,
+            }, ensure_ascii=False))
+        return response
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['last_name', 'first_name', 'id'], name='employee_name_order_idx'),
+        ),
+    ]
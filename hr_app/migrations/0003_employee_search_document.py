@@ -0,0 +1,59 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:21
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# Заполнение документа зафиксировано в SQL на момент миграции: выражение из hr_app.search
+# меняется вместе с моделями, а миграция должна давать тот же результат на любой версии кода.
+FILL_SEARCH_DOCUMENTS = """
+UPDATE hr_app_employee e SET search_document =
+    setweight(to_tsvector('russian', concat_ws(' ', e.last_name, e.first_name, e.patronymic)), 'A')
+    || setweight(to_tsvector('russian', concat_ws(' ',
+        e.email, e.phone_number,
+        (SELECT p.passport_number FROM hr_app_passportinfo p WHERE p.employee_id = e.id),
+        (SELECT string_agg(s.name, ' ') FROM hr_app_employeeskill es
+            JOIN hr_app_skill s ON s.id = es.skill_id WHERE es.employee_id = e.id),
+        (SELECT string_agg(c.name, ' ') FROM hr_app_employeecertification ec
+            JOIN hr_app_certification c ON c.id = ec.certification_id WHERE ec.employee_id = e.id),
+        (SELECT string_agg(l.name, ' ') FROM hr_app_employeelanguage el
+            JOIN hr_app_language l ON l.id = el.language_id WHERE el.employee_id = e.id)
+    )), 'B')
+    || setweight(to_tsvector('russian', concat_ws(' ',
+        e.nationality, e.address, e.gender,
+        CASE e.gender WHEN 'M' THEN 'Мужской' WHEN 'F' THEN 'Женский' END,
+        e.date_of_birth::text,
+        (SELECT concat_ws(' ', f.marital_status, CASE f.marital_status
+                WHEN 'single' THEN 'Не женат/не замужем' WHEN 'married' THEN 'Женат/Замужем'
+                WHEN 'divorced' THEN 'Разведён/Разведена' WHEN 'widowed' THEN 'Вдова/Вдовец' END,
+            f.number_of_children)
+            FROM hr_app_family f WHERE f.employee_id = e.id),
+        (SELECT concat_ws(' ', p.issued_by, p.date_issued, p.date_expiry)
+            FROM hr_app_passportinfo p WHERE p.employee_id = e.id),
+        (SELECT string_agg(concat_ws(' ', w.employer, w.position, w.responsibilities), ' ')
+            FROM hr_app_workexperience w WHERE w.employee_id = e.id),
+        (SELECT string_agg(concat_ws(' ', ed.institution, ed.specialty), ' ')
+            FROM hr_app_education ed WHERE ed.employee_id = e.id)
+    )), 'C')
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0002_employee_name_order_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='search_document',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый документ'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='employee_search_document_idx'),
+        ),
+        migrations.RunSQL(FILL_SEARCH_DOCUMENTS, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:22
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0003_employee_search_document'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='employee',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['last_name'], name='employee_last_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['first_name'], name='employee_first_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['patronymic'], name='employee_patronymic_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
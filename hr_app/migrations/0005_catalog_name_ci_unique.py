@@ -0,0 +1,41 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:29
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0004_employee_name_trigram'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='certification',
+            name='name',
+            field=models.CharField(max_length=100, verbose_name='Сертификат'),
+        ),
+        migrations.AlterField(
+            model_name='language',
+            name='name',
+            field=models.CharField(max_length=100, verbose_name='Язык'),
+        ),
+        migrations.AlterField(
+            model_name='skill',
+            name='name',
+            field=models.CharField(max_length=100, verbose_name='Навык'),
+        ),
+        migrations.AddConstraint(
+            model_name='certification',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='certification_name_ci_unique', violation_error_message='Такой сертификат уже существует.'),
+        ),
+        migrations.AddConstraint(
+            model_name='language',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='language_name_ci_unique', violation_error_message='Такой язык уже существует.'),
+        ),
+        migrations.AddConstraint(
+            model_name='skill',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='skill_name_ci_unique', violation_error_message='Навык с таким названием уже существует.'),
+        ),
+    ]
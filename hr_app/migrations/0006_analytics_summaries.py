@@ -0,0 +1,52 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0005_catalog_name_ci_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EducationSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('education_level', models.CharField(choices=[('secondary', 'Среднее'), ('bachelor', 'Бакалавр'), ('master', 'Магистр'), ('phd', 'Докторская степень')], max_length=20, unique=True, verbose_name='Уровень образования')),
+                ('records', models.IntegerField(default=0, verbose_name='Записей об образовании')),
+            ],
+            options={
+                'verbose_name': 'Сводка по образованию',
+                'verbose_name_plural': 'Сводка по образованию',
+            },
+        ),
+        migrations.CreateModel(
+            name='FamilySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('marital_status', models.CharField(choices=[('single', 'Не женат/не замужем'), ('married', 'Женат/Замужем'), ('divorced', 'Разведён/Разведена'), ('widowed', 'Вдова/Вдовец')], max_length=10, unique=True, verbose_name='Семейное положение')),
+                ('employees', models.IntegerField(default=0, verbose_name='Сотрудников')),
+                ('children', models.IntegerField(default=0, verbose_name='Детей всего')),
+            ],
+            options={
+                'verbose_name': 'Сводка по семейному положению',
+                'verbose_name_plural': 'Сводка по семейному положению',
+            },
+        ),
+        migrations.CreateModel(
+            name='HeadcountSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nationality', models.CharField(max_length=50, verbose_name='Гражданство')),
+                ('birth_year', models.PositiveIntegerField(verbose_name='Год рождения')),
+                ('employees', models.IntegerField(default=0, verbose_name='Сотрудников')),
+            ],
+            options={
+                'verbose_name': 'Численность по гражданству и году рождения',
+                'verbose_name_plural': 'Численность по гражданству и году рождения',
+                'unique_together': {('nationality', 'birth_year')},
+            },
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:58
+
+from django.db import migrations
+
+# Сводные таблицы поддерживаются триггерами уровня оператора с таблицами переходов: они срабатывают
+# и на bulk_create, bulk_update, COPY и QuerySet.update(), которые не отправляют сигналы Django.
+# Изменения оператора сворачиваются в одну дельту на ключ и применяются через INSERT ... ON CONFLICT.
+SUMMARIES = [
+    (
+        'hr_app_headcountsummary', 'hr_app_employee',
+        [('nationality', 'nationality'), ('birth_year', 'EXTRACT(YEAR FROM date_of_birth)::integer')],
+        [('employees', '1')],
+    ),
+    (
+        'hr_app_familysummary', 'hr_app_family',
+        [('marital_status', 'marital_status')],
+        [('employees', '1'), ('children', 'number_of_children')],
+    ),
+    (
+        'hr_app_educationsummary', 'hr_app_education',
+        [('education_level', 'education_level')],
+        [('records', '1')],
+    ),
+]
+
+
+def _rows(keys, values, table, sign=''):
+    columns = [f'{expression} AS {column}' for column, expression in keys]
+    columns += [f'{sign}({expression}) AS {column}' for column, expression in values]
+    return f'SELECT {", ".join(columns)} FROM {table}'
+
+
+def _apply(summary, keys, values, *sources):
+    key_columns = ', '.join(column for column, _ in keys)
+    value_columns = [column for column, _ in values]
+    return f"""
+        INSERT INTO {summary} ({key_columns}, {', '.join(value_columns)})
+        SELECT {key_columns}, {', '.join(f'SUM({column})' for column in value_columns)}
+        FROM ({' UNION ALL '.join(sources)}) AS changes
+        GROUP BY {key_columns}
+        HAVING {' OR '.join(f'SUM({column}) <> 0' for column in value_columns)}
+        ORDER BY {key_columns}
+        ON CONFLICT ({key_columns}) DO UPDATE
+        SET {', '.join(f'{column} = {summary}.{column} + EXCLUDED.{column}' for column in value_columns)};"""
+
+
+def create_triggers_sql(summary, source, keys, values):
+    # ORDER BY в дельте задаёт одинаковый порядок блокировок строк сводки в параллельных транзакциях.
+    return f"""
+        CREATE FUNCTION {summary}_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {_apply(summary, keys, values, _rows(keys, values, 'new_rows'))}
+            ELSIF TG_OP = 'DELETE' THEN
+                {_apply(summary, keys, values, _rows(keys, values, 'old_rows', '-'))}
+            ELSE
+                {_apply(summary, keys, values, _rows(keys, values, 'new_rows'), _rows(keys, values, 'old_rows', '-'))}
+            END IF;
+            DELETE FROM {summary} WHERE {values[0][0]} = 0;
+            RETURN NULL;
+        END
+        $$;
+        CREATE TRIGGER {summary}_insert AFTER INSERT ON {source}
+            REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION {summary}_apply();
+        CREATE TRIGGER {summary}_update AFTER UPDATE ON {source}
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION {summary}_apply();
+        CREATE TRIGGER {summary}_delete AFTER DELETE ON {source}
+            REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION {summary}_apply();
+        {_apply(summary, keys, values, _rows(keys, values, source))}
+    """
+
+
+def drop_triggers_sql(summary, source, keys, values):
+    return f"""
+        DROP TRIGGER {summary}_insert ON {source};
+        DROP TRIGGER {summary}_update ON {source};
+        DROP TRIGGER {summary}_delete ON {source};
+        DROP FUNCTION {summary}_apply();
+    """
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0006_analytics_summaries'),
+    ]
+
+    operations = [
+        migrations.RunSQL(create_triggers_sql(*summary), drop_triggers_sql(*summary))
+        for summary in SUMMARIES
+    ]
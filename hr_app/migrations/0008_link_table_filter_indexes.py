@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0007_analytics_triggers'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='education',
+            index=models.Index(fields=['education_level', 'employee'], name='education_level_employee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employeelanguage',
+            index=models.Index(fields=['language', 'proficiency_level', 'employee'], name='employee_language_level_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employeeskill',
+            index=models.Index(fields=['skill', 'employee'], name='employee_skill_skill_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='passportinfo',
+            index=models.Index(fields=['date_expiry', 'employee'], name='passport_expiry_employee_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:55
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+# Заполнение массивов зафиксировано в SQL, чтобы не зависеть от текущих моделей и hr_app.search.
+# Код языка: id * 10 + уровень владения (1 — начальный … 4 — родной).
+FILL_PROFILE_ARRAYS = """
+UPDATE hr_app_employee e SET
+    skill_ids = ARRAY(
+        SELECT skill_id FROM hr_app_employeeskill WHERE employee_id = e.id ORDER BY skill_id
+    ),
+    certification_ids = ARRAY(
+        SELECT certification_id FROM hr_app_employeecertification WHERE employee_id = e.id ORDER BY certification_id
+    ),
+    language_levels = ARRAY(
+        SELECT language_id * 10 + CASE proficiency_level
+            WHEN 'beginner' THEN 1 WHEN 'intermediate' THEN 2 WHEN 'advanced' THEN 3 WHEN 'native' THEN 4 ELSE 0
+        END
+        FROM hr_app_employeelanguage WHERE employee_id = e.id ORDER BY language_id
+    )
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0008_link_table_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='certification_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), default=list, editable=False, size=None, verbose_name='Сертификаты (id)'),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='language_levels',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), default=list, editable=False, size=None, verbose_name='Языки с уровнем'),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='skill_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), default=list, editable=False, size=None, verbose_name='Навыки (id)'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['skill_ids'], name='employee_skill_ids_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['certification_ids'], name='employee_certification_ids_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['language_levels'], name='employee_language_levels_idx'),
+        ),
+        migrations.RunSQL(FILL_PROFILE_ARRAYS, migrations.RunSQL.noop),
+    ]
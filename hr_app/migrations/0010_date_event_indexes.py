@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:56
+
+import django.db.models.expressions
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0009_employee_profile_arrays'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.functions.datetime.ExtractMonth('date_of_birth'), '*', models.Value(100)), '+', django.db.models.functions.datetime.ExtractDay('date_of_birth')), name='employee_birthday_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employeecertification',
+            index=models.Index(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.functions.datetime.ExtractMonth('date_obtained'), '*', models.Value(100)), '+', django.db.models.functions.datetime.ExtractDay('date_obtained')), name='certification_anniversary_idx'),
+        ),
+    ]
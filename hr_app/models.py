@@ -1,7 +1,54 @@
 from django.db import models
+from django.utils import timezone
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models.functions import ExtractDay, ExtractMonth, Lower
 from rest_framework import serializers
 from django.core.validators import MinLengthValidator, RegexValidator
 
+
+def month_day(field):
+    # Дата без года в виде ММДД (1 марта — 301): по ней индексируются дни рождения и годовщины.
+    return ExtractMonth(field) * 100 + ExtractDay(field)
+
+
+class EmployeeQuerySet(models.QuerySet):
+    PROFILE_RELATIONS = (
+        'family', 'passport_info', 'educations', 'work_experiences', 'skills', 'certifications', 'languages',
+    )
+
+    def with_profile(self, relations=PROFILE_RELATIONS):
+        queryset = self
+        one_to_one = [name for name in ('family', 'passport_info') if name in relations]
+        if one_to_one:
+            queryset = queryset.select_related(*one_to_one)
+
+        lookups = []
+        if 'educations' in relations:
+            lookups.append(models.Prefetch('educations', queryset=Education.objects.order_by('id')))
+        if 'work_experiences' in relations:
+            lookups.append(models.Prefetch('work_experiences', queryset=WorkExperience.objects.order_by('id')))
+        if 'skills' in relations:
+            lookups.append(models.Prefetch(
+                'skills', queryset=EmployeeSkill.objects.select_related('skill').order_by('id')
+            ))
+        if 'certifications' in relations:
+            lookups.append(models.Prefetch(
+                'certifications', queryset=EmployeeCertification.objects.select_related('certification').order_by('id')
+            ))
+        if 'languages' in relations:
+            lookups.append(models.Prefetch(
+                'languages', queryset=EmployeeLanguage.objects.select_related('language').order_by('id')
+            ))
+        return queryset.prefetch_related(*lookups)
+
+    def touch(self):
+        # Время берётся в Python, а не NOW(): NOW() в PostgreSQL — время начала транзакции
+        # и может оказаться раньше date_updated, уже записанного в этой же транзакции.
+        return self.update(date_updated=timezone.now())
+
+
 class Employee(models.Model):
     first_name = models.CharField(
         max_length=30,
@@ -61,6 +108,33 @@ class Employee(models.Model):
         auto_now=True,
         verbose_name='Дата обновления записи'
     )
+    search_document = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name='Поисковый документ'
+    )
+    # Копии id из связанных таблиц для подбора по требованиям; пересчитываются вместе с поисковым документом.
+    skill_ids = ArrayField(
+        models.IntegerField(),
+        default=list,
+        editable=False,
+        verbose_name='Навыки (id)'
+    )
+    certification_ids = ArrayField(
+        models.IntegerField(),
+        default=list,
+        editable=False,
+        verbose_name='Сертификаты (id)'
+    )
+    # Код языка: id * 10 + уровень владения (1 — начальный … 4 — родной).
+    language_levels = ArrayField(
+        models.IntegerField(),
+        default=list,
+        editable=False,
+        verbose_name='Языки с уровнем'
+    )
+
+    objects = EmployeeQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.last_name} {self.first_name}"
@@ -68,6 +142,17 @@ class Employee(models.Model):
     class Meta:
         verbose_name = 'Сотрудник'
         verbose_name_plural = 'Сотрудники'
+        indexes = [
+            models.Index(fields=['last_name', 'first_name', 'id'], name='employee_name_order_idx'),
+            GinIndex(fields=['search_document'], name='employee_search_document_idx'),
+            GinIndex(fields=['last_name'], opclasses=['gin_trgm_ops'], name='employee_last_name_trgm_idx'),
+            GinIndex(fields=['first_name'], opclasses=['gin_trgm_ops'], name='employee_first_name_trgm_idx'),
+            GinIndex(fields=['patronymic'], opclasses=['gin_trgm_ops'], name='employee_patronymic_trgm_idx'),
+            GinIndex(fields=['skill_ids'], name='employee_skill_ids_idx'),
+            GinIndex(fields=['certification_ids'], name='employee_certification_ids_idx'),
+            GinIndex(fields=['language_levels'], name='employee_language_levels_idx'),
+            models.Index(month_day('date_of_birth'), name='employee_birthday_idx'),
+        ]
 
 class Education(models.Model):
     employee = models.ForeignKey(
@@ -107,6 +192,9 @@ class Education(models.Model):
     class Meta:
         verbose_name = 'Образование'
         verbose_name_plural = 'Образование'
+        indexes = [
+            models.Index(fields=['education_level', 'employee'], name='education_level_employee_idx'),
+        ]
 
 class WorkExperience(models.Model):
     employee = models.ForeignKey(
@@ -207,11 +295,13 @@ class PassportInfo(models.Model):
     class Meta:
         verbose_name = 'Паспортная информация'
         verbose_name_plural = 'Паспортная информация'
+        indexes = [
+            models.Index(fields=['date_expiry', 'employee'], name='passport_expiry_employee_idx'),
+        ]
 
 class Skill(models.Model):
     name = models.CharField(
         max_length=100,
-        unique=True,
         verbose_name='Навык'
     )
 
@@ -221,6 +311,13 @@ class Skill(models.Model):
     class Meta:
         verbose_name = 'Навык'
         verbose_name_plural = 'Навыки'
+        constraints = [
+            models.UniqueConstraint(
+                Lower('name'),
+                name='skill_name_ci_unique',
+                violation_error_message='Навык с таким названием уже существует.'
+            ),
+        ]
 
 class EmployeeSkill(models.Model):
     employee = models.ForeignKey(
@@ -242,11 +339,14 @@ class EmployeeSkill(models.Model):
         unique_together = ('employee', 'skill')
         verbose_name = 'Навык сотрудника'
         verbose_name_plural = 'Навыки сотрудников'
+        # Индекс unique_together начинается с employee; для отбора по навыку нужен обратный порядок.
+        indexes = [
+            models.Index(fields=['skill', 'employee'], name='employee_skill_skill_idx'),
+        ]
 
 class Certification(models.Model):
     name = models.CharField(
         max_length=100,
-        unique=True,
         verbose_name='Сертификат'
     )
 
@@ -256,6 +356,13 @@ class Certification(models.Model):
     class Meta:
         verbose_name = 'Сертификат'
         verbose_name_plural = 'Сертификаты'
+        constraints = [
+            models.UniqueConstraint(
+                Lower('name'),
+                name='certification_name_ci_unique',
+                violation_error_message='Такой сертификат уже существует.'
+            ),
+        ]
 
 class EmployeeCertification(models.Model):
     employee = models.ForeignKey(
@@ -280,11 +387,13 @@ class EmployeeCertification(models.Model):
         unique_together = ('employee', 'certification')
         verbose_name = 'Сертификат сотрудника'
         verbose_name_plural = 'Сертификаты сотрудников'
+        indexes = [
+            models.Index(month_day('date_obtained'), name='certification_anniversary_idx'),
+        ]
 
 class Language(models.Model):
     name = models.CharField(
         max_length=100,
-        unique=True,
         verbose_name='Язык'
     )
 
@@ -294,6 +403,13 @@ class Language(models.Model):
     class Meta:
         verbose_name = 'Язык'
         verbose_name_plural = 'Языки'
+        constraints = [
+            models.UniqueConstraint(
+                Lower('name'),
+                name='language_name_ci_unique',
+                violation_error_message='Такой язык уже существует.'
+            ),
+        ]
 
 class EmployeeLanguage(models.Model):
     employee = models.ForeignKey(
@@ -326,3 +442,176 @@ class EmployeeLanguage(models.Model):
         unique_together = ('employee', 'language')
         verbose_name = 'Язык сотрудника'
         verbose_name_plural = 'Языки сотрудников'
+        indexes = [
+            models.Index(
+                fields=['language', 'proficiency_level', 'employee'], name='employee_language_level_idx'
+            ),
+        ]
+
+
+# Сводные таблицы аналитики. Поддерживаются триггерами базы (миграция 0006) на каждую
+# вставку, изменение и удаление строк, в том числе при bulk_create и COPY; пересчёт с нуля —
+# команда rebuild_analytics.
+
+class HeadcountSummary(models.Model):
+    nationality = models.CharField(
+        max_length=50,
+        verbose_name='Гражданство'
+    )
+    birth_year = models.PositiveIntegerField(
+        verbose_name='Год рождения'
+    )
+    employees = models.IntegerField(
+        default=0,
+        verbose_name='Сотрудников'
+    )
+
+    class Meta:
+        unique_together = ('nationality', 'birth_year')
+        verbose_name = 'Численность по гражданству и году рождения'
+        verbose_name_plural = 'Численность по гражданству и году рождения'
+
+
+class FamilySummary(models.Model):
+    marital_status = models.CharField(
+        max_length=10,
+        unique=True,
+        choices=Family.MARITAL_STATUS_CHOICES,
+        verbose_name='Семейное положение'
+    )
+    employees = models.IntegerField(
+        default=0,
+        verbose_name='Сотрудников'
+    )
+    children = models.IntegerField(
+        default=0,
+        verbose_name='Детей всего'
+    )
+
+    class Meta:
+        verbose_name = 'Сводка по семейному положению'
+        verbose_name_plural = 'Сводка по семейному положению'
+
+
+class EducationSummary(models.Model):
+    education_level = models.CharField(
+        max_length=20,
+        unique=True,
+        choices=Education.EDUCATION_LEVEL_CHOICES,
+        verbose_name='Уровень образования'
+    )
+    records = models.IntegerField(
+        default=0,
+        verbose_name='Записей об образовании'
+    )
+
+    class Meta:
+        verbose_name = 'Сводка по образованию'
+        verbose_name_plural = 'Сводка по образованию'
+
+
+class JobQuerySet(models.QuerySet):
+    def due(self):
+        return self.filter(status=Job.QUEUED, run_after__lte=timezone.now())
+
+
+class Job(models.Model):
+    """
+    Задача фоновой очереди (импорт, экспорт, пересчёт данных). Исполняется командой worker.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (SUCCEEDED, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    ]
+    KIND_CHOICES = [
+        ('import', 'Импорт сотрудников'),
+        ('export', 'Экспорт сотрудников'),
+        ('reindex', 'Пересчёт поисковых данных'),
+        ('rebuild_analytics', 'Пересчёт сводных таблиц'),
+    ]
+    kind = models.CharField(
+        max_length=30,
+        choices=KIND_CHOICES,
+        verbose_name='Тип'
+    )
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Параметры'
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=QUEUED,
+        verbose_name='Статус'
+    )
+    progress_done = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Обработано'
+    )
+    progress_total = models.PositiveIntegerField(
+        null=True, blank=True,
+        verbose_name='Всего'
+    )
+    result = models.JSONField(
+        null=True, blank=True,
+        verbose_name='Результат'
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка'
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    max_attempts = models.PositiveIntegerField(
+        default=3,
+        verbose_name='Максимум попыток'
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Не раньше'
+    )
+    worker = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name='Обработчик'
+    )
+    heartbeat_at = models.DateTimeField(
+        null=True, blank=True,
+        verbose_name='Последний отклик обработчика'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Создана'
+    )
+    started_at = models.DateTimeField(
+        null=True, blank=True,
+        verbose_name='Начата'
+    )
+    finished_at = models.DateTimeField(
+        null=True, blank=True,
+        verbose_name='Завершена'
+    )
+
+    objects = JobQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.get_status_display()})"
+
+    class Meta:
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        indexes = [
+            # Выбор следующей задачи: только ожидающие, по времени запуска.
+            models.Index(
+                fields=['run_after', 'id'], condition=models.Q(status='queued'), name='job_queue_idx'
+            ),
+        ]
@@ -0,0 +1,139 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, Cursor
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Курсорная пагинация по составному ключу: курсор хранит значения всех полей
+    сортировки последней строки, поэтому любая страница выбирается одним
+    индексным диапазоном без OFFSET.
+
+    Представление может переопределить ключ методом get_keyset_ordering(request);
+    последнее поле ключа должно быть уникальным.
+    """
+    ordering = ('last_name', 'first_name', 'id')
+    page_size = settings.EMPLOYEE_PAGE_SIZE
+    max_page_size = settings.EMPLOYEE_MAX_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    paginate_query_param = 'paginate'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page([obj async for obj in queryset])
+
+    def page_queryset(self, queryset, request, view=None):
+        if not self.is_enabled(request):
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        self.reverse = self.cursor is not None and self.cursor.reverse
+        ordering = self._reverse_ordering(self.ordering) if self.reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(self._after_position(ordering, self.cursor.position))
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+        return self.page
+
+    def is_enabled(self, request):
+        return request.query_params.get(self.paginate_query_param, '').lower() not in ('0', 'false', 'no')
+
+    def get_ordering(self, request, queryset, view):
+        if hasattr(view, 'get_keyset_ordering'):
+            return tuple(view.get_keyset_ordering(request))
+        return tuple(self.ordering)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self._position(self.page[-1])))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self._position(self.page[0])))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            tokens = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            position = tokens['p']
+            reverse = bool(tokens.get('r', False))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        return Cursor(offset=0, reverse=reverse, position=position)
+
+    def encode_cursor(self, cursor):
+        tokens = {'p': cursor.position}
+        if cursor.reverse:
+            tokens['r'] = 1
+        encoded = urlsafe_b64encode(json.dumps(tokens, separators=(',', ':')).encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _position(self, instance):
+        position = []
+        for field in self.ordering:
+            field_name = field.lstrip('-')
+            value = instance[field_name] if isinstance(instance, dict) else getattr(instance, field_name)
+            position.append(value)
+        return position
+
+    @staticmethod
+    def _reverse_ordering(ordering):
+        return tuple(field[1:] if field.startswith('-') else '-' + field for field in ordering)
+
+    @staticmethod
+    def _after_position(ordering, position):
+        # (a, b, c) > (x, y, z) раскрывается в
+        # a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z);
+        # дополнительное условие a >= x задаёт планировщику диапазон по индексу.
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            field_name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{field_name}__{lookup}': value})
+            equal &= Q(**{field_name: value})
+
+        first = ordering[0]
+        bound = 'lte' if first.startswith('-') else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{bound}': position[0]}) & condition
+
+
+class JobPagination(CursorPagination):
+    ordering = '-id'
+    page_size = 50
@@ -0,0 +1,198 @@
+import re
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.expressions import ArraySubquery
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db import transaction
+from django.db.models import Case, F, FloatField, OuterRef, Q, Subquery, TextField, Value, When
+from django.db.models.functions import Cast, Concat, Greatest
+from .models import (
+    Employee, Education, WorkExperience, Family, PassportInfo,
+    EmployeeSkill, EmployeeCertification, EmployeeLanguage
+)
+
+SEARCH_CONFIG = 'russian'
+
+# Символы, которые to_tsquery воспринимает как операторы.
+TSQUERY_SPECIAL = re.compile(r"[&|!():*<>'\\]")
+
+
+def _text(*expressions):
+    parts = []
+    for expression in expressions:
+        if parts:
+            parts.append(Value(' '))
+        parts.append(Cast(expression, TextField()))
+    return Concat(*parts, output_field=TextField()) if len(parts) > 1 else parts[0]
+
+
+def _choice_label(field, choices):
+    return Case(*[When(**{field: code}, then=Value(label)) for code, label in choices], output_field=TextField())
+
+
+def _related_text(model, *fields):
+    # Все строки связанной таблицы сотрудника склеиваются в одну строку коррелированным подзапросом.
+    return Subquery(
+        model.objects.filter(employee=OuterRef('pk'))
+        .values('employee')
+        .annotate(text=StringAgg(_text(*fields), ' '))
+        .values('text'),
+        output_field=TextField(),
+    )
+
+
+def _one_to_one_text(model, *fields):
+    return Subquery(
+        model.objects.filter(employee=OuterRef('pk')).values(text=_text(*fields)),
+        output_field=TextField(),
+    )
+
+
+def search_document_expression():
+    return (
+        SearchVector('last_name', 'first_name', 'patronymic', config=SEARCH_CONFIG, weight='A')
+        + SearchVector(
+            'email', 'phone_number',
+            _one_to_one_text(PassportInfo, 'passport_number'),
+            _related_text(EmployeeSkill, 'skill__name'),
+            _related_text(EmployeeCertification, 'certification__name'),
+            _related_text(EmployeeLanguage, 'language__name'),
+            config=SEARCH_CONFIG, weight='B',
+        )
+        + SearchVector(
+            'nationality', 'address', 'gender', _choice_label('gender', Employee.GENDER_CHOICES),
+            Cast('date_of_birth', TextField()),
+            _one_to_one_text(
+                Family, 'marital_status', _choice_label('marital_status', Family.MARITAL_STATUS_CHOICES),
+                'number_of_children',
+            ),
+            _one_to_one_text(PassportInfo, 'issued_by', 'date_issued', 'date_expiry'),
+            _related_text(WorkExperience, 'employer', 'position', 'responsibilities'),
+            _related_text(Education, 'institution', 'specialty'),
+            config=SEARCH_CONFIG, weight='C',
+        )
+    )
+
+
+LANGUAGE_LEVEL_CODES = {
+    code: rank for rank, (code, _) in enumerate(EmployeeLanguage.proficiency_level_choices, start=1)
+}
+
+
+def language_level_code(language_id, rank):
+    return language_id * 10 + rank
+
+
+def profile_arrays_expressions():
+    # Массивы id навыков, сертификатов и кодов «язык + уровень» для подбора по требованиям.
+    def ids(model, field):
+        return ArraySubquery(model.objects.filter(employee=OuterRef('pk')).order_by(field).values(field))
+
+    level = Case(
+        *[When(proficiency_level=code, then=Value(rank)) for code, rank in LANGUAGE_LEVEL_CODES.items()],
+        default=Value(0),
+    )
+    return {
+        'skill_ids': ids(EmployeeSkill, 'skill_id'),
+        'certification_ids': ids(EmployeeCertification, 'certification_id'),
+        'language_levels': ArraySubquery(
+            EmployeeLanguage.objects.filter(employee=OuterRef('pk'))
+            .order_by('language_id')
+            .values(code=F('language_id') * 10 + level)
+        ),
+    }
+
+
+def update_search_documents(employee_ids=None):
+    # Вместе с документом пересчитываются и массивы id для подбора: их меняют те же записи.
+    queryset = Employee.objects.all()
+    if employee_ids is not None:
+        queryset = queryset.filter(pk__in=employee_ids)
+    return queryset.update(search_document=search_document_expression(), **profile_arrays_expressions())
+
+
+class _PendingSearchUpdate:
+    def __init__(self, savepoint):
+        self.savepoint = savepoint
+        self.employee_ids = set()
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        update_search_documents(self.employee_ids)
+
+
+def schedule_search_update(employee_ids):
+    """
+    Откладывает пересчёт документов до фиксации транзакции, чтобы сохранение
+    сотрудника со всеми вложенными записями пересчитывало каждый документ один раз.
+    """
+    employee_ids = set(employee_ids)
+    if not employee_ids:
+        return
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        update_search_documents(employee_ids)
+        return
+
+    # Обработчик привязан к текущей точке сохранения; после её отката он снят с очереди on_commit.
+    savepoint = tuple(connection.savepoint_ids)
+    pending = getattr(connection, 'pending_search_update', None)
+    if (
+        pending is None
+        or pending.done
+        or pending.savepoint != savepoint
+        or not any(func is pending for _, func, _ in connection.run_on_commit)
+    ):
+        pending = _PendingSearchUpdate(savepoint)
+        connection.pending_search_update = pending
+        transaction.on_commit(pending)
+    pending.employee_ids.update(employee_ids)
+
+
+def build_search_query(text):
+    # Каждое слово ищется как префикс, все слова обязательны.
+    terms = [f'{word}:*' for word in TSQUERY_SPECIAL.sub(' ', text).split()]
+    if not terms:
+        return None
+    return SearchQuery(' & '.join(terms), config=SEARCH_CONFIG, search_type='raw')
+
+
+def search_employees(queryset, text):
+    query = build_search_query(text)
+    if query is None:
+        return queryset
+    return (
+        queryset.filter(search_document=query)
+        # ts_rank возвращает real; приведение к double сохраняет точное значение в курсоре пагинации.
+        .annotate(rank=Cast(SearchRank(F('search_document'), query), FloatField()))
+        .order_by('-rank', 'id')
+    )
+
+
+NAME_FIELDS = ('last_name', 'first_name', 'patronymic')
+LOOKUP_MAX_WORDS = 3
+
+
+def lookup_employees(text, limit):
+    # Каждое слово запроса сравнивается с каждым полем ФИО оператором % (GIN-индексы gin_trgm_ops),
+    # оценка — среднее по словам лучшей похожести среди полей.
+    words = text.split()[:LOOKUP_MAX_WORDS]
+    if not words:
+        return Employee.objects.none()
+
+    condition = Q()
+    scores = []
+    for word in words:
+        for field in NAME_FIELDS:
+            condition |= Q(**{f'{field}__trigram_similar': word})
+        scores.append(Greatest(*(TrigramSimilarity(field, word) for field in NAME_FIELDS)))
+
+    similarity = scores[0]
+    for score in scores[1:]:
+        similarity = similarity + score
+    return (
+        Employee.objects.filter(condition)
+        .annotate(similarity=Cast(similarity / len(words), FloatField()))
+        .only('id', *NAME_FIELDS)
+        .order_by('-similarity', 'id')[:limit]
+    )
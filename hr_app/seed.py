@@ -0,0 +1,205 @@
+import datetime
+import random
+import uuid
+from django.db import transaction
+from . import catalogs, facets
+from .importer import copy_rows
+from .models import (
+    Employee, Education, WorkExperience, Family, PassportInfo,
+    EmployeeSkill, EmployeeCertification, EmployeeLanguage,
+    Skill, Certification, Language
+)
+from .search import update_search_documents
+
+SEED_CHUNK_SIZE = 1000
+
+MALE_FIRST_NAMES = ['Александр', 'Дмитрий', 'Максим', 'Сергей', 'Андрей', 'Алексей', 'Иван', 'Михаил', 'Павел', 'Олег']
+FEMALE_FIRST_NAMES = ['Анна', 'Мария', 'Елена', 'Ольга', 'Наталья', 'Татьяна', 'Ирина', 'Светлана', 'Юлия', 'Дарья']
+LAST_NAMES = ['Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Петров', 'Соколов', 'Михайлов', 'Новиков',
+              'Фёдоров', 'Морозов', 'Волков', 'Алексеев', 'Лебедев', 'Семёнов', 'Егоров', 'Павлов', 'Козлов']
+PATRONYMICS = ['Александров', 'Дмитриев', 'Сергеев', 'Андреев', 'Иванов', 'Михайлов', 'Петров', 'Николаев']
+NATIONALITIES = ['Россия'] * 8 + ['Казахстан', 'Беларусь', 'Узбекистан', 'Армения']
+CITIES = ['Москва', 'Санкт-Петербург', 'Казань', 'Новосибирск', 'Екатеринбург', 'Нижний Новгород', 'Самара']
+STREETS = ['Ленина', 'Мира', 'Садовая', 'Советская', 'Гагарина', 'Пушкина', 'Лесная']
+INSTITUTIONS = ['МГУ', 'СПбГУ', 'МФТИ', 'ВШЭ', 'КФУ', 'НГУ', 'УрФУ', 'МГТУ им. Баумана', 'РЭУ им. Плеханова']
+SPECIALTIES = ['Экономика', 'Право', 'Прикладная математика', 'Информатика', 'Менеджмент', 'Журналистика',
+               'Психология', 'Бухгалтерский учёт', 'Машиностроение', 'Лингвистика']
+EMPLOYERS = ['ООО Ромашка', 'АО Вектор', 'ПАО Северсталь', 'ООО Альфа', 'ИП Смирнов', 'АО Газинвест',
+             'ООО Техносфера', 'ООО Логистик', 'АО Медиагрупп', 'ООО СтройМонтаж']
+POSITIONS = ['Аналитик', 'Бухгалтер', 'Менеджер', 'Разработчик', 'Юрист', 'Инженер', 'Маркетолог',
+             'Руководитель отдела', 'Специалист', 'Администратор']
+SKILLS = ['Python', 'SQL', 'Excel', '1С', 'Java', 'JavaScript', 'Docker', 'Linux', 'Git', 'PostgreSQL',
+          'Power BI', 'Tableau', 'AutoCAD', 'Photoshop', 'Figma', 'Jira', 'SAP', 'Английский деловой',
+          'Переговоры', 'Управление проектами', 'Бюджетирование', 'МСФО', 'Налоговый учёт', 'React', 'Go',
+          'Kubernetes', 'C#', 'C++', 'Публичные выступления', 'Наставничество']
+CERTIFICATIONS = ['AWS Solutions Architect', 'PMP', 'CFA Level 1', 'ACCA', 'Scrum Master', 'ITIL Foundation',
+                  'Oracle Certified Professional', 'Cisco CCNA', 'Microsoft Azure Fundamentals', 'Google Analytics',
+                  'ДипИФР', 'Аттестат аудитора', 'Prince2', 'Lean Six Sigma', 'CISSP']
+LANGUAGES = ['Русский', 'Английский', 'Немецкий', 'Французский', 'Испанский', 'Китайский', 'Итальянский',
+             'Татарский', 'Казахский', 'Турецкий']
+
+
+def _add_years(date, years):
+    try:
+        return date.replace(year=date.year + years)
+    except ValueError:
+        # 29 февраля в невисокосный год.
+        return date.replace(year=date.year + years, day=28)
+
+
+def ensure_catalogs():
+    """
+    Заполняет справочники навыков, сертификатов и языков, если их ещё нет,
+    и возвращает списки id каждого справочника.
+    """
+    ids = {}
+    for name, model, names in (
+        ('skills', Skill, SKILLS), ('certifications', Certification, CERTIFICATIONS),
+        ('languages', Language, LANGUAGES),
+    ):
+        model.objects.bulk_create([model(name=value) for value in names], ignore_conflicts=True)
+        # bulk_create не отправляет сигналы, поэтому кэш справочника сбрасывается явно.
+        catalogs.invalidate(name)
+        ids[name] = list(model.objects.order_by('id').values_list('id', flat=True))
+    return ids
+
+
+class EmployeeGenerator:
+    """
+    Генерирует профили с правдоподобным разбросом: 0–3 записи об образовании,
+    1–4 места работы, 3–12 навыков, 0–4 сертификата, 1–3 языка.
+    """
+
+    def __init__(self, catalog_ids, seed=None):
+        self.random = random.Random(seed)
+        self.catalog_ids = catalog_ids
+        # Токен в email не зависит от seed, чтобы повторный запуск с тем же seed не давал дубликатов.
+        self.token = uuid.uuid4().hex[:8]
+        self.passport_numbers = set()
+        self.today = datetime.date.today()
+
+    def _date_between(self, start, end):
+        return start + datetime.timedelta(days=self.random.randint(0, max((end - start).days, 0)))
+
+    def _passport_number(self):
+        while True:
+            number = ''.join(self.random.choices('ABCEHKMOPTXY', k=2)) + f'{self.random.randint(0, 9999999):07d}'
+            if number not in self.passport_numbers:
+                self.passport_numbers.add(number)
+                return number
+
+    def employee(self, index):
+        male = self.random.random() < 0.5
+        suffix = '' if male else 'а'
+        first_name = self.random.choice(MALE_FIRST_NAMES if male else FEMALE_FIRST_NAMES)
+        date_of_birth = self._date_between(datetime.date(1960, 1, 1), datetime.date(2002, 12, 31))
+        return Employee(
+            first_name=first_name,
+            last_name=self.random.choice(LAST_NAMES) + suffix,
+            patronymic=self.random.choice(PATRONYMICS) + ('ич' if male else 'на'),
+            date_of_birth=date_of_birth,
+            gender='M' if male else 'F',
+            nationality=self.random.choice(NATIONALITIES),
+            email=f'seed.{self.token}.{index}@example.com',
+            phone_number=f'+79{self.random.randint(0, 999999999):09d}',
+            address=f'{self.random.choice(CITIES)}, ул. {self.random.choice(STREETS)}, д. {self.random.randint(1, 150)}',
+        )
+
+    def profile(self, employee):
+        rng = self.random
+        adult = _add_years(employee.date_of_birth, 18)
+        rows = {
+            Family: [Family(
+                employee=employee,
+                marital_status=rng.choice(['single', 'married', 'married', 'divorced', 'widowed']),
+                number_of_children=rng.choice([0, 0, 1, 1, 2, 3]),
+            )],
+            PassportInfo: [],
+            Education: [],
+            WorkExperience: [],
+            EmployeeSkill: [],
+            EmployeeCertification: [],
+            EmployeeLanguage: [],
+        }
+        date_issued = self._date_between(adult, self.today)
+        rows[PassportInfo].append(PassportInfo(
+            employee=employee,
+            passport_number=self._passport_number(),
+            issued_by=f'МВД по г. {rng.choice(CITIES)}',
+            date_issued=date_issued,
+            date_expiry=_add_years(date_issued, rng.choice([5, 10])),
+        ))
+        for _ in range(rng.choice([0, 1, 1, 1, 2, 2, 3])):
+            rows[Education].append(Education(
+                employee=employee,
+                education_level=rng.choice(['secondary', 'bachelor', 'bachelor', 'master', 'phd']),
+                institution=rng.choice(INSTITUTIONS),
+                graduation_year=min(adult.year + rng.randint(3, 10), self.today.year),
+                specialty=rng.choice(SPECIALTIES),
+            ))
+        start = adult
+        for position in range(rng.randint(1, 4)):
+            start_date = self._date_between(start, self.today)
+            end_date = None if position == 3 or rng.random() < 0.3 else self._date_between(start_date, self.today)
+            rows[WorkExperience].append(WorkExperience(
+                employee=employee,
+                employer=rng.choice(EMPLOYERS),
+                position=rng.choice(POSITIONS),
+                start_date=start_date,
+                end_date=end_date,
+                responsibilities=f'{rng.choice(POSITIONS)}: ведение направления «{rng.choice(SPECIALTIES)}».',
+            ))
+            if end_date is None:
+                break
+            start = end_date
+
+        skills = self.catalog_ids['skills']
+        certifications = self.catalog_ids['certifications']
+        languages = self.catalog_ids['languages']
+        rows[EmployeeSkill] = [
+            EmployeeSkill(employee=employee, skill_id=skill_id)
+            for skill_id in rng.sample(skills, min(rng.randint(3, 12), len(skills)))
+        ]
+        rows[EmployeeCertification] = [
+            EmployeeCertification(
+                employee=employee, certification_id=certification_id,
+                date_obtained=self._date_between(adult, self.today),
+            )
+            for certification_id in rng.sample(certifications, min(rng.choice([0, 0, 1, 1, 2, 3, 4]), len(certifications)))
+        ]
+        rows[EmployeeLanguage] = [
+            EmployeeLanguage(
+                employee=employee, language_id=language_id,
+                proficiency_level=rng.choice(['beginner', 'intermediate', 'intermediate', 'advanced', 'native']),
+            )
+            for language_id in rng.sample(languages, min(rng.randint(1, 3), len(languages)))
+        ]
+        return rows
+
+
+def seed_employees(count, seed=None, chunk_size=SEED_CHUNK_SIZE):
+    """
+    Массово создаёт count сотрудников со всеми вложенными записями: сотрудники вставляются
+    bulk_create, связанные строки — через COPY, поисковые документы считаются одним UPDATE на пачку.
+    Возвращает id созданных сотрудников.
+    """
+    generator = EmployeeGenerator(ensure_catalogs(), seed=seed)
+    existing = set(PassportInfo.objects.values_list('passport_number', flat=True))
+    generator.passport_numbers.update(existing)
+
+    created = []
+    for start in range(0, count, chunk_size):
+        with transaction.atomic():
+            employees = [generator.employee(index) for index in range(start, min(start + chunk_size, count))]
+            Employee.objects.bulk_create(employees)
+            rows = {}
+            for employee in employees:
+                for model, objs in generator.profile(employee).items():
+                    rows.setdefault(model, []).extend(objs)
+            for model, objs in rows.items():
+                copy_rows(model, objs)
+            ids = [employee.pk for employee in employees]
+            update_search_documents(ids)
+            facets.schedule_invalidation()
+        created += ids
+    return created
@@ -1,42 +1,126 @@
 import datetime
-from django.db import transaction
+from contextlib import contextmanager
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
+from .catalogs import existing_ids, invalidate
 from .models import (
     Employee, Education, WorkExperience, Family, PassportInfo,
     EmployeeSkill, EmployeeCertification, EmployeeLanguage,
-    Skill, Certification, Language
+    Skill, Certification, Language, Job
 )
 
 
-class SkillSerializer(serializers.ModelSerializer):
+class CatalogSerializer(serializers.ModelSerializer):
+    # Уникальность названия без учёта регистра обеспечивает индекс по Lower(name);
+    # его нарушение превращается в обычную ошибку валидации поля name.
+    duplicate_name_message = None
+
+    def _save_unique(self, save, *args):
+        try:
+            with transaction.atomic():
+                return save(*args)
+        except IntegrityError:
+            raise serializers.ValidationError({'name': [self.duplicate_name_message]})
+
+    def create(self, validated_data):
+        return self._save_unique(super().create, validated_data)
+
+    def update(self, instance, validated_data):
+        return self._save_unique(super().update, instance, validated_data)
+
+
+class SkillSerializer(CatalogSerializer):
+    duplicate_name_message = 'Навык с таким названием уже существует.'
+
     class Meta:
         model = Skill
         fields = ['id', 'name']
 
-    def validate_name(self, value):
-        if Skill.objects.filter(name__iexact=value).exists():
-            raise serializers.ValidationError('Навык с таким названием уже существует.')
-        return value
+class CertificationSerializer(CatalogSerializer):
+    duplicate_name_message = 'Такой сертификат уже существует.'
 
-class CertificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Certification
         fields = ['id', 'name']
 
-    def validate_name(self, value):
-        if Certification.objects.filter(name__iexact=value).exists():
-            raise serializers.ValidationError('Такой сертификат уже существует.')
-        return value
+class LanguageSerializer(CatalogSerializer):
+    duplicate_name_message = 'Такой язык уже существует.'
 
-class LanguageSerializer(serializers.ModelSerializer):
     class Meta:
         model = Language
         fields = ['id', 'name']
 
-    def validate_name(self, value):
-        if Language.objects.filter(name__iexact=value).exists():
-            raise serializers.ValidationError('Такой язык уже существует.')
-        return value
+
+class EmployeeLookupSerializer(serializers.ModelSerializer):
+    similarity = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Employee
+        fields = ['id', 'last_name', 'first_name', 'patronymic', 'similarity']
+
+
+class MatchLanguageSerializer(serializers.Serializer):
+    language_id = serializers.IntegerField()
+    proficiency_level = serializers.ChoiceField(
+        choices=EmployeeLanguage.proficiency_level_choices, required=False, allow_null=True
+    )
+
+
+class EmployeeMatchRequestSerializer(serializers.Serializer):
+    skills = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    certifications = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    languages = MatchLanguageSerializer(many=True, required=False, default=list)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+    def validate(self, attrs):
+        if not (attrs['skills'] or attrs['certifications'] or attrs['languages']):
+            raise serializers.ValidationError('Укажите хотя бы один навык, сертификат или язык.')
+        # Повторы не должны влиять на долю покрытия.
+        attrs['skills'] = list(dict.fromkeys(attrs['skills']))
+        attrs['certifications'] = list(dict.fromkeys(attrs['certifications']))
+        languages = {item['language_id']: item.get('proficiency_level') for item in attrs['languages']}
+        attrs['languages'] = list(languages.items())
+        return attrs
+
+
+class EmployeeMatchSerializer(serializers.ModelSerializer):
+    """
+    Результат подбора: покрытие и какие требования выполнены. Контекст requirements —
+    проверенные данные EmployeeMatchRequestSerializer.
+    """
+    score = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Employee
+        fields = ['id', 'last_name', 'first_name', 'patronymic', 'score']
+
+    def _coverage(self, employee):
+        requirements = self.context['requirements']
+        levels = {code // 10: code % 10 for code in employee.language_levels}
+        codes = [code for code, _ in EmployeeLanguage.proficiency_level_choices]
+        matched = {
+            'skills': [pk for pk in requirements['skills'] if pk in employee.skill_ids],
+            'certifications': [pk for pk in requirements['certifications'] if pk in employee.certification_ids],
+            'languages': [
+                {'language_id': language_id, 'proficiency_level': codes[levels[language_id] - 1]}
+                for language_id, _ in requirements['languages'] if levels.get(language_id)
+            ],
+        }
+        missing = {
+            'skills': [pk for pk in requirements['skills'] if pk not in employee.skill_ids],
+            'certifications': [pk for pk in requirements['certifications'] if pk not in employee.certification_ids],
+            # Язык без нужного уровня засчитывается частично и попадает в оба списка.
+            'languages': [
+                language_id for language_id, level in requirements['languages']
+                if levels.get(language_id, 0) < (codes.index(level) + 1 if level else 1)
+            ],
+        }
+        return matched, missing
+
+    def to_representation(self, employee):
+        data = super().to_representation(employee)
+        data['matched'], data['missing'] = self._coverage(employee)
+        return data
 
 
 class FamilySerializer(serializers.ModelSerializer):
@@ -132,174 +216,337 @@ class EmployeeSerializer(serializers.ModelSerializer):
             'skills_info', 'certifications_info', 'languages_info'
         ]
 
+    # Вложенные блоки ответа и связи Employee, из которых они строятся.
+    NESTED_SOURCES = {
+        'family': 'family',
+        'passport_info': 'passport_info',
+        'educations': 'educations',
+        'work_experiences': 'work_experiences',
+        'skills_info': 'skills',
+        'certifications_info': 'certifications',
+        'languages_info': 'languages',
+    }
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in list(self.fields):
+                if name not in fields and not self.fields[name].write_only:
+                    self.fields.pop(name)
+
+    @classmethod
+    def readable_fields(cls):
+        return [
+            name for name in cls.Meta.fields
+            if name not in cls._declared_fields or not cls._declared_fields[name].write_only
+        ]
+
+    @classmethod
+    def select_fields(cls, fields=None, expand=None):
+        if fields is None and expand is None:
+            return None
+
+        readable = cls.readable_fields()
+        unknown = [name for name in fields or () if name not in readable]
+        if unknown:
+            raise serializers.ValidationError({'fields': f"Неизвестные поля: {', '.join(unknown)}."})
+        unknown = [name for name in expand or () if name not in cls.NESTED_SOURCES]
+        if unknown:
+            raise serializers.ValidationError({'expand': f"Неизвестные вложенные блоки: {', '.join(unknown)}."})
+
+        if fields is None:
+            fields = [name for name in readable if name not in cls.NESTED_SOURCES]
+        return set(fields) | set(expand or ())
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None, extra_columns=()):
+        if fields is None:
+            return queryset.with_profile().defer('search_document')
+        relations = [source for name, source in cls.NESTED_SOURCES.items() if name in fields]
+        columns = [name for name in cls.readable_fields() if name in fields and name not in cls.NESTED_SOURCES]
+        # Связи один-к-одному подтягиваются через JOIN, поэтому должны остаться в списке .only().
+        columns += [name for name in ('family', 'passport_info') if name in relations]
+        return queryset.with_profile(relations).only(*columns, *extra_columns)
+
     def validate_date_of_birth(self, value):
         if value > datetime.date.today():
             raise serializers.ValidationError('Дата рождения не может быть в будущем.')
         return value
 
+    REFERENCES = (
+        ('skills', Skill, 'skill_id', 'Skill'),
+        ('certifications', Certification, 'certification_id', 'Certification'),
+        ('languages', Language, 'language_id', 'Language'),
+    )
+
+    @staticmethod
+    def _reference_id(value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    def _resolve_references(self, **items_by_key):
+        """
+        Проверяет id в skills, certifications и languages по кэшу справочников (запрос — только
+        для id, которых нет в снимке) и возвращает пары (исходный элемент, id записи справочника).
+        Обо всех несуществующих id сообщается одной ошибкой валидации.
+        """
+        resolved = {}
+        errors = {}
+        for key, model, id_key, label in self.REFERENCES:
+            items = items_by_key.get(key)
+            if items is None:
+                continue
+            ids = [self._reference_id(item.get(id_key)) for item in items]
+            known = existing_ids(key, ids)
+            missing = [item.get(id_key) for item, pk in zip(items, ids) if pk not in known]
+            if missing:
+                errors[key] = [f"{label} with id {value} does not exist." for value in missing]
+                continue
+            # Повторная ссылка на ту же запись справочника нарушила бы unique_together.
+            unique = {}
+            for item, pk in zip(items, ids):
+                unique[pk] = (item, pk)
+            resolved[key] = list(unique.values())
+        if errors:
+            raise serializers.ValidationError(errors)
+        return resolved
+
+    @contextmanager
+    def _writing(self, references):
+        """
+        transaction.atomic() для записи со ссылками на справочники. Снимок справочника мог
+        пережить удаление записи; внешние ключи проверяются до выхода из блока, и нарушение
+        превращается в ошибку валидации по заново загруженному справочнику, а не в 500.
+        """
+        try:
+            with transaction.atomic():
+                yield
+                if any(references.values()):
+                    transaction.get_connection().check_constraints()
+        except IntegrityError:
+            for key in references:
+                invalidate(key)
+            self._resolve_references(**{key: [item for item, _ in pairs] for key, pairs in references.items()})
+            raise
+
     def create(self, validated_data):
-        print("create")
-        
         family_data = validated_data.pop('family')
         passport_info_data = validated_data.pop('passport_info')
         educations_data = validated_data.pop('educations', [])
         work_experiences_data = validated_data.pop('work_experiences', [])
-        skills_data = validated_data.pop('skills', [])
-        certifications_data = validated_data.pop('certifications', [])
-        languages_data = validated_data.pop('languages', [])
-
-        with transaction.atomic():
-            
+        references = self._resolve_references(
+            skills=validated_data.pop('skills', []),
+            certifications=validated_data.pop('certifications', []),
+            languages=validated_data.pop('languages', []),
+        )
+
+        with self._writing(references):
+            # Вложенные записи пишутся через bulk_create без сигналов; поисковый документ
+            # всё равно пересчитывается при фиксации по сигналу сохранения самого Employee.
             employee = Employee.objects.create(**validated_data)
-
-            
             Family.objects.create(employee=employee, **family_data)
-
-            
             PassportInfo.objects.create(employee=employee, **passport_info_data)
 
-            
-            for education_data in educations_data:
-                Education.objects.create(employee=employee, **education_data)
-
-            
-            for work_experience_data in work_experiences_data:
-                WorkExperience.objects.create(employee=employee, **work_experience_data)
-
-            
-            for skill_data in skills_data:
-                skill_id = skill_data.get('skill_id')
-                try:
-                    skill = Skill.objects.get(id=skill_id)
-                    EmployeeSkill.objects.create(employee=employee, skill=skill)
-                except Skill.DoesNotExist:
-                    raise serializers.ValidationError(f"Skill with id {skill_id} does not exist.")
-
-            
-            for cert_data in certifications_data:
-                certification_id = cert_data.get('certification_id')
-                date_obtained = cert_data.get('date_obtained')
-                try:
-                    certification = Certification.objects.get(id=certification_id)
-                    EmployeeCertification.objects.create(
-                        employee=employee,
-                        certification=certification,
-                        date_obtained=date_obtained
-                    )
-                except Certification.DoesNotExist:
-                    raise serializers.ValidationError(f"Certification with id {certification_id} does not exist.")
-
-            
-            for lang_data in languages_data:
-                language_id = lang_data.get('language_id')
-                proficiency_level = lang_data.get('proficiency_level')
-                try:
-                    language = Language.objects.get(id=language_id)
-                    EmployeeLanguage.objects.create(
-                        employee=employee,
-                        language=language,
-                        proficiency_level=proficiency_level
-                    )
-                except Language.DoesNotExist:
-                    raise serializers.ValidationError(f"Language with id {language_id} does not exist.")
+            Education.objects.bulk_create([
+                Education(employee=employee, **education_data) for education_data in educations_data
+            ])
+            WorkExperience.objects.bulk_create([
+                WorkExperience(employee=employee, **work_experience_data)
+                for work_experience_data in work_experiences_data
+            ])
+            EmployeeSkill.objects.bulk_create([
+                EmployeeSkill(employee=employee, skill_id=skill_id) for _, skill_id in references['skills']
+            ])
+            EmployeeCertification.objects.bulk_create([
+                EmployeeCertification(
+                    employee=employee,
+                    certification_id=certification_id,
+                    date_obtained=cert_data.get('date_obtained')
+                )
+                for cert_data, certification_id in references['certifications']
+            ])
+            EmployeeLanguage.objects.bulk_create([
+                EmployeeLanguage(
+                    employee=employee,
+                    language_id=language_id,
+                    proficiency_level=lang_data.get('proficiency_level')
+                )
+                for lang_data, language_id in references['languages']
+            ])
 
             return employee
 
+    @staticmethod
+    def _save_changes(obj, data):
+        changed = [attr for attr, value in data.items() if getattr(obj, attr) != value]
+        for attr in changed:
+            setattr(obj, attr, data[attr])
+        if changed:
+            obj.save(update_fields=changed)
+
+    @staticmethod
+    def _sync_rows(model, existing, desired, fields, key=None):
+        """
+        Приводит набор строк сотрудника к desired, трогая только изменившиеся строки.
+        Строки с ключом (key) сопоставляются по нему; строки без ключа — сначала по полному
+        совпадению значений, а оставшиеся — попарно по порядку, чтобы правка поля была UPDATE,
+        а не удалением и вставкой.
+        """
+        for obj in desired:
+            for field in fields:
+                setattr(obj, field, model._meta.get_field(field).to_python(getattr(obj, field)))
+
+        def values(obj):
+            return tuple(getattr(obj, field) for field in fields)
+
+        to_create, to_update = [], []
+        if key is not None:
+            current = {getattr(obj, key): obj for obj in existing}
+            for obj in desired:
+                row = current.pop(getattr(obj, key), None)
+                if row is None:
+                    to_create.append(obj)
+                elif values(row) != values(obj):
+                    for field in fields:
+                        setattr(row, field, getattr(obj, field))
+                    to_update.append(row)
+            to_delete = list(current.values())
+        else:
+            unmatched = list(existing)
+            pending = []
+            for obj in desired:
+                row = next((row for row in unmatched if values(row) == values(obj)), None)
+                if row is None:
+                    pending.append(obj)
+                else:
+                    unmatched.remove(row)
+            for row, obj in zip(unmatched, pending):
+                for field in fields:
+                    setattr(row, field, getattr(obj, field))
+                to_update.append(row)
+            to_create = pending[len(unmatched):]
+            to_delete = unmatched[len(pending):]
+
+        if to_delete:
+            model.objects.filter(pk__in=[obj.pk for obj in to_delete]).delete()
+        if to_update:
+            model.objects.bulk_update(to_update, fields)
+        if to_create:
+            model.objects.bulk_create(to_create)
+
     def update(self, instance, validated_data):
-        print("update")
-        
         family_data = validated_data.pop('family', None)
         passport_info_data = validated_data.pop('passport_info', None)
         educations_data = validated_data.pop('educations', None)
         work_experiences_data = validated_data.pop('work_experiences', None)
-        skills_data = validated_data.pop('skills', None)
-        certifications_data = validated_data.pop('certifications', None)
-        languages_data = validated_data.pop('languages', None)
-
-        with transaction.atomic():
-            
+        references = self._resolve_references(
+            skills=validated_data.pop('skills', None),
+            certifications=validated_data.pop('certifications', None),
+            languages=validated_data.pop('languages', None),
+        )
+
+        with self._writing(references):
+            # Employee сохраняется всегда: это обновляет date_updated и по сигналу
+            # пересчитывает поисковый документ, в том числе после bulk-операций ниже.
             for attr, value in validated_data.items():
                 setattr(instance, attr, value)
             instance.save()
 
-            
             if family_data:
-                family_instance = instance.family
-                for attr, value in family_data.items():
-                    setattr(family_instance, attr, value)
-                family_instance.save()
+                self._save_changes(instance.family, family_data)
 
-            
             if passport_info_data:
-                passport_info_instance = instance.passport_info
-                for attr, value in passport_info_data.items():
-                    setattr(passport_info_instance, attr, value)
-                passport_info_instance.save()
+                self._save_changes(instance.passport_info, passport_info_data)
 
-            
             if educations_data is not None:
-                
-                Education.objects.filter(employee=instance).delete()
-                
-                for education_data in educations_data:
-                    Education.objects.create(employee=instance, **education_data)
+                self._sync_rows(
+                    Education,
+                    list(instance.educations.all()),
+                    [Education(employee=instance, **education_data) for education_data in educations_data],
+                    EducationSerializer.Meta.fields,
+                )
 
-            
             if work_experiences_data is not None:
-                
-                WorkExperience.objects.filter(employee=instance).delete()
-                
-                for work_experience_data in work_experiences_data:
-                    WorkExperience.objects.create(employee=instance, **work_experience_data)
-
-            
-            if skills_data is not None:
-                
-                EmployeeSkill.objects.filter(employee=instance).delete()
-                
-                for skill_data in skills_data:
-                    skill_id = skill_data.get('skill_id')
-                    try:
-                        skill = Skill.objects.get(id=skill_id)
-                        EmployeeSkill.objects.create(employee=instance, skill=skill)
-                    except Skill.DoesNotExist:
-                        raise serializers.ValidationError(f"Skill with id {skill_id} does not exist.")
-
-            
-            if certifications_data is not None:
-                
-                EmployeeCertification.objects.filter(employee=instance).delete()
-                
-                for cert_data in certifications_data:
-                    certification_id = cert_data.get('certification_id')
-                    date_obtained = cert_data.get('date_obtained')
-                    try:
-                        certification = Certification.objects.get(id=certification_id)
-                        EmployeeCertification.objects.create(
+                self._sync_rows(
+                    WorkExperience,
+                    list(instance.work_experiences.all()),
+                    [
+                        WorkExperience(employee=instance, **work_experience_data)
+                        for work_experience_data in work_experiences_data
+                    ],
+                    WorkExperienceSerializer.Meta.fields,
+                )
+
+            if 'skills' in references:
+                self._sync_rows(
+                    EmployeeSkill,
+                    list(instance.skills.all()),
+                    [EmployeeSkill(employee=instance, skill_id=skill_id) for _, skill_id in references['skills']],
+                    [],
+                    key='skill_id',
+                )
+
+            if 'certifications' in references:
+                self._sync_rows(
+                    EmployeeCertification,
+                    list(instance.certifications.all()),
+                    [
+                        EmployeeCertification(
                             employee=instance,
-                            certification=certification,
-                            date_obtained=date_obtained
+                            certification_id=certification_id,
+                            date_obtained=cert_data.get('date_obtained')
                         )
-                    except Certification.DoesNotExist:
-                        raise serializers.ValidationError(f"Certification with id {certification_id} does not exist.")
-
-            
-            if languages_data is not None:
-                
-                EmployeeLanguage.objects.filter(employee=instance).delete()
-                
-                for lang_data in languages_data:
-                    language_id = lang_data.get('language_id')
-                    proficiency_level = lang_data.get('proficiency_level')
-                    try:
-                        language = Language.objects.get(id=language_id)
-                        EmployeeLanguage.objects.create(
+                        for cert_data, certification_id in references['certifications']
+                    ],
+                    ['date_obtained'],
+                    key='certification_id',
+                )
+
+            if 'languages' in references:
+                self._sync_rows(
+                    EmployeeLanguage,
+                    list(instance.languages.all()),
+                    [
+                        EmployeeLanguage(
                             employee=instance,
-                            language=language,
-                            proficiency_level=proficiency_level
+                            language_id=language_id,
+                            proficiency_level=lang_data.get('proficiency_level')
                         )
-                    except Language.DoesNotExist:
-                        raise serializers.ValidationError(f"Language with id {language_id} does not exist.")
+                        for lang_data, language_id in references['languages']
+                    ],
+                    ['proficiency_level'],
+                    key='language_id',
+                )
 
             return instance
 
+
+class JobSerializer(serializers.ModelSerializer):
+    # Через POST /jobs/ ставятся только задачи без входных данных; импорт и экспорт —
+    # через /employees/import/ и /employees/export/ с параметром background=1.
+    ENQUEUE_KINDS = ('reindex', 'rebuild_analytics')
+
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'kind', 'status', 'progress_done', 'progress_total', 'progress', 'result', 'error',
+            'attempts', 'max_attempts', 'run_after', 'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = [name for name in fields if name != 'kind']
+
+    def get_progress(self, job):
+        if job.status == Job.SUCCEEDED:
+            return 100.0
+        if not job.progress_total:
+            return None
+        return round(100 * job.progress_done / job.progress_total, 1)
+
+    def validate_kind(self, value):
+        if value not in self.ENQUEUE_KINDS:
+            raise serializers.ValidationError(f'Через этот адрес ставятся задачи: {", ".join(self.ENQUEUE_KINDS)}.')
+        return value
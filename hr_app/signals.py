@@ -0,0 +1,76 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from . import catalogs, facets
+from .models import (
+    Employee, Education, WorkExperience, Family, PassportInfo,
+    EmployeeSkill, EmployeeCertification, EmployeeLanguage,
+    Skill, Certification, Language
+)
+from .search import schedule_search_update
+
+EMPLOYEE_RELATED_MODELS = (
+    Education, WorkExperience, Family, PassportInfo,
+    EmployeeSkill, EmployeeCertification, EmployeeLanguage,
+)
+
+
+@receiver(post_save, sender=Employee)
+def employee_saved(sender, instance, **kwargs):
+    schedule_search_update([instance.pk])
+    facets.schedule_invalidation()
+
+
+@receiver(post_delete, sender=Employee)
+def employee_deleted(sender, instance, **kwargs):
+    facets.schedule_invalidation()
+
+
+def related_changed(sender, instance, **kwargs):
+    # date_updated сотрудника служит валидатором ETag/Last-Modified для всего профиля.
+    Employee.objects.filter(pk=instance.employee_id).touch()
+    schedule_search_update([instance.employee_id])
+    facets.schedule_invalidation()
+
+
+for model in EMPLOYEE_RELATED_MODELS:
+    post_save.connect(related_changed, sender=model, dispatch_uid=f'search_{model.__name__}_saved')
+    post_delete.connect(related_changed, sender=model, dispatch_uid=f'search_{model.__name__}_deleted')
+
+
+@receiver(post_save, sender=Skill)
+def skill_renamed(sender, instance, created, **kwargs):
+    if not created:
+        Employee.objects.filter(skills__skill=instance).touch()
+        schedule_search_update(EmployeeSkill.objects.filter(skill=instance).values_list('employee_id', flat=True))
+
+
+@receiver(post_save, sender=Certification)
+def certification_renamed(sender, instance, created, **kwargs):
+    if not created:
+        Employee.objects.filter(certifications__certification=instance).touch()
+        schedule_search_update(
+            EmployeeCertification.objects.filter(certification=instance).values_list('employee_id', flat=True)
+        )
+
+
+@receiver(post_save, sender=Language)
+def language_renamed(sender, instance, created, **kwargs):
+    if not created:
+        Employee.objects.filter(languages__language=instance).touch()
+        schedule_search_update(
+            EmployeeLanguage.objects.filter(language=instance).values_list('employee_id', flat=True)
+        )
+
+
+def catalog_changed(sender, instance, **kwargs):
+    # Версия меняется сразу, чтобы запись была видна в этой же транзакции,
+    # и ещё раз после фиксации — чтобы другие процессы не закэшировали состояние до коммита.
+    name = next(name for name, model in catalogs.CATALOG_MODELS.items() if model is sender)
+    catalogs.invalidate(name)
+    transaction.on_commit(lambda: catalogs.invalidate(name))
+
+
+for model in catalogs.CATALOG_MODELS.values():
+    post_save.connect(catalog_changed, sender=model, dispatch_uid=f'catalog_{model.__name__}_saved')
+    post_delete.connect(catalog_changed, sender=model, dispatch_uid=f'catalog_{model.__name__}_deleted')
@@ -1,3 +1,1471 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+from .models import (
+    Employee, Education, WorkExperience, Family, PassportInfo,
+    EmployeeSkill, EmployeeCertification, EmployeeLanguage,
+    Skill, Certification, Language, FamilySummary, Job
+)
+from . import catalogs, documents, facets
+from .admin import EstimatedCountPaginator
+from .analytics import compare_summaries
+from .benchmark import SCENARIOS, Benchmark, compare, load_results, save_results
+from .forms import LanguageCreationForm
+from .importer import import_employees, read_records
+from .instrumentation import RequestMetrics, fingerprint
+from . import jobs
+from .pagination import KeysetPagination
+from .search import update_search_documents
+from .seed import seed_employees
+from .serializers import EmployeeSerializer
 
-# Create your tests here.
+
+def create_employee(index, skills=(), certifications=(), languages=()):
+    employee = Employee.objects.create(
+        first_name=f'Иван{index}',
+        last_name=f'Иванов{index}',
+        patronymic='Иванович',
+        date_of_birth=datetime.date(1990, 1, 1),
+        gender='M',
+        nationality='Россия',
+        email=f'employee{index}@example.com',
+        phone_number='+79990000000',
+        address='Москва',
+    )
+    Family.objects.create(employee=employee, marital_status='single', number_of_children=0)
+    PassportInfo.objects.create(
+        employee=employee,
+        passport_number=f'AB{index:07d}',
+        issued_by='МВД',
+        date_issued=datetime.date(2015, 1, 1),
+        date_expiry=datetime.date(2030, 1, 1),
+    )
+    Education.objects.create(
+        employee=employee, education_level='bachelor', institution='МГУ',
+        graduation_year=2012, specialty='Экономика'
+    )
+    WorkExperience.objects.create(
+        employee=employee, employer='ООО Ромашка', position='Аналитик',
+        start_date=datetime.date(2013, 1, 1)
+    )
+    for skill in skills:
+        EmployeeSkill.objects.create(employee=employee, skill=skill)
+    for certification in certifications:
+        EmployeeCertification.objects.create(
+            employee=employee, certification=certification, date_obtained=datetime.date(2020, 1, 1)
+        )
+    for language in languages:
+        EmployeeLanguage.objects.create(employee=employee, language=language, proficiency_level='advanced')
+    return employee
+
+
+class EmployeeQueryCountTests(TestCase):
+    # Выборка (id, date_updated) для кэша документов, затем при промахе — одна выборка сотрудников
+    # с family и passport_info плюс по одной на каждую вложенную коллекцию.
+    EXPECTED_QUERIES = 7
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.skills = [Skill.objects.create(name=f'Навык {i}') for i in range(3)]
+        cls.certifications = [Certification.objects.create(name=f'Сертификат {i}') for i in range(2)]
+        cls.languages = [Language.objects.create(name=f'Язык {i}') for i in range(2)]
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def _create_employees(self, count, start=0):
+        return [
+            create_employee(
+                start + i, skills=self.skills, certifications=self.certifications, languages=self.languages
+            )
+            for i in range(count)
+        ]
+
+    def test_list_query_count_does_not_depend_on_row_count(self):
+        self._create_employees(2)
+        with self.assertNumQueries(self.EXPECTED_QUERIES):
+            response = self.client.get('/employees/')
+        self.assertEqual(response.status_code, 200)
+
+        self._create_employees(8, start=2)
+        with self.assertNumQueries(self.EXPECTED_QUERIES):
+            response = self.client.get('/employees/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_query_count(self):
+        employee = self._create_employees(1)[0]
+        with self.assertNumQueries(self.EXPECTED_QUERIES):
+            response = self.client.get(f'/employees/{employee.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['skills_info']), 3)
+        self.assertEqual(len(response.data['certifications_info']), 2)
+        self.assertEqual(len(response.data['languages_info']), 2)
+        self.assertEqual(response.data['family']['marital_status'], 'single')
+
+
+class EmployeePaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.employees = [create_employee(i) for i in range(7)]
+        Employee.objects.filter(pk__in=[cls.employees[3].pk, cls.employees[5].pk]).update(
+            last_name='Абрамов', first_name='Пётр'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def _expected_order(self):
+        return list(Employee.objects.order_by('last_name', 'first_name', 'id').values_list('id', flat=True))
+
+    def test_pages_follow_name_order(self):
+        ids = []
+        url = '/employees/?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(ids, self._expected_order())
+
+    def test_previous_link_returns_preceding_page(self):
+        first = self.client.get('/employees/?page_size=3').data
+        self.assertIsNone(first['previous'])
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+        self.assertEqual(
+            [item['id'] for item in back['results']],
+            [item['id'] for item in first['results']],
+        )
+
+    def test_page_size_is_capped(self):
+        with mock.patch.object(KeysetPagination, 'max_page_size', 2):
+            response = self.client.get('/employees/?page_size=100000')
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_opt_out_returns_plain_list(self):
+        response = self.client.get('/employees/?paginate=false')
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 7)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/employees/?cursor=garbage')
+        self.assertEqual(response.status_code, 404)
+
+
+class EmployeeSparseFieldsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        skill = Skill.objects.create(name='Python')
+        cls.employees = [create_employee(i, skills=[skill]) for i in range(3)]
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_names_only_listing_is_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/employees/?fields=id,first_name,last_name')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data['results'][0]), {'id', 'first_name', 'last_name'})
+
+    def test_expand_adds_only_requested_blocks(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/employees/{self.employees[0].id}/?expand=family,skills_info')
+        self.assertIn('email', response.data)
+        self.assertEqual(response.data['family']['marital_status'], 'single')
+        self.assertEqual(response.data['skills_info'][0]['skill']['name'], 'Python')
+        self.assertNotIn('educations', response.data)
+        self.assertNotIn('passport_info', response.data)
+
+    def test_fields_and_expand_combine(self):
+        response = self.client.get('/employees/?fields=id,last_name&expand=passport_info')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'last_name', 'passport_info'})
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get('/employees/?fields=id,salary')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/employees/?expand=email')
+        self.assertEqual(response.status_code, 400)
+
+
+class EmployeeSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.python = Skill.objects.create(name='Python')
+        cls.english = Language.objects.create(name='English')
+        cls.analyst = create_employee(1, skills=[cls.python], languages=[cls.english])
+        cls.other = create_employee(2)
+        Employee.objects.filter(pk=cls.other.pk).update(last_name='Петров', first_name='Пётр')
+        update_search_documents()
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def _search(self, text):
+        response = self.client.get('/employees/', {'search': text, 'fields': 'id'})
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.data['results']]
+
+    def test_matches_related_names_without_duplicates(self):
+        self.assertEqual(self._search('python'), [self.analyst.id])
+        self.assertEqual(self._search('English Python'), [self.analyst.id])
+
+    def test_matches_name_prefix_and_passport(self):
+        self.assertEqual(self._search('Петр'), [self.other.id])
+        self.assertEqual(self._search('AB0000002'), [self.other.id])
+
+    def test_name_match_ranks_above_other_columns(self):
+        Employee.objects.filter(pk=self.analyst.pk).update(address='ул. Петровка')
+        update_search_documents([self.analyst.id])
+        self.assertEqual(self._search('Петров'), [self.other.id, self.analyst.id])
+
+    def test_document_follows_related_writes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            EmployeeSkill.objects.create(employee=self.other, skill=self.python)
+        self.assertEqual(set(self._search('python')), {self.analyst.id, self.other.id})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.python.name = 'Django'
+            self.python.save()
+        self.assertEqual(self._search('python'), [])
+        self.assertEqual(set(self._search('django')), {self.analyst.id, self.other.id})
+
+    def test_search_results_are_paginated_by_rank(self):
+        response = self.client.get('/employees/', {'search': 'Россия', 'fields': 'id', 'page_size': 1})
+        first = response.data['results']
+        second = self.client.get(response.data['next']).data['results']
+        self.assertEqual(len(first), 1)
+        self.assertEqual({first[0]['id'], second[0]['id']}, {self.analyst.id, self.other.id})
+
+
+class EmployeeNameLookupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ivanov = create_employee(1)
+        Employee.objects.filter(pk=cls.ivanov.pk).update(last_name='Иванов', first_name='Сергей')
+        cls.petrov = create_employee(2)
+        Employee.objects.filter(pk=cls.petrov.pk).update(last_name='Петров', first_name='Пётр', patronymic=None)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_tolerates_typos(self):
+        response = self.client.get('/employees/lookup/', {'q': 'Ивонов'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['id'], self.ivanov.id)
+        self.assertGreater(response.data[0]['similarity'], 0)
+        self.assertNotIn(self.petrov.id, [item['id'] for item in response.data])
+
+    def test_multiple_words_and_limit(self):
+        response = self.client.get('/employees/lookup/', {'q': 'Петроф Петр', 'limit': 1})
+        self.assertEqual([item['id'] for item in response.data], [self.petrov.id])
+
+    def test_rejects_short_query(self):
+        response = self.client.get('/employees/lookup/', {'q': 'И'})
+        self.assertEqual(response.status_code, 400)
+
+
+def employee_payload(index, skills=(), certifications=(), languages=()):
+    return {
+        'first_name': 'Анна',
+        'last_name': f'Смирнова{index}',
+        'patronymic': 'Сергеевна',
+        'date_of_birth': '1992-05-17',
+        'gender': 'F',
+        'nationality': 'Россия',
+        'email': f'new{index}@example.com',
+        'phone_number': '+79991112233',
+        'address': 'Казань',
+        'family': {'marital_status': 'married', 'number_of_children': 2},
+        'passport_info': {
+            'passport_number': f'CD{index:07d}',
+            'issued_by': 'МВД',
+            'date_issued': '2016-03-01',
+            'date_expiry': '2031-03-01',
+        },
+        'educations': [
+            {'education_level': 'master', 'institution': 'КФУ', 'graduation_year': 2015, 'specialty': 'Право'},
+            {'education_level': 'bachelor', 'institution': 'КФУ', 'graduation_year': 2013, 'specialty': 'Право'},
+        ],
+        'work_experiences': [
+            {'employer': 'ООО Вектор', 'position': 'Юрист', 'start_date': '2015-09-01'},
+        ],
+        'skills': [{'skill_id': skill.id} for skill in skills],
+        'certifications': [
+            {'certification_id': certification.id, 'date_obtained': '2019-06-01'} for certification in certifications
+        ],
+        'languages': [
+            {'language_id': language.id, 'proficiency_level': 'intermediate'} for language in languages
+        ],
+    }
+
+
+class EmployeeCreateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.skills = [Skill.objects.create(name=f'Навык {i}') for i in range(20)]
+        cls.certifications = [Certification.objects.create(name=f'Сертификат {i}') for i in range(5)]
+        cls.languages = [Language.objects.create(name=f'Язык {i}') for i in range(5)]
+
+    def setUp(self):
+        self.client = APIClient()
+        for name in catalogs.CATALOG_MODELS:
+            catalogs.get_catalog(name)
+
+    def _count_create_queries(self, payload):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/employees/', payload, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return len(queries)
+
+    def test_query_count_does_not_depend_on_collection_size(self):
+        small = self._count_create_queries(
+            employee_payload(1, self.skills[:1], self.certifications[:1], self.languages[:1])
+        )
+        large = self._count_create_queries(
+            employee_payload(2, self.skills, self.certifications, self.languages)
+        )
+        self.assertEqual(small, large)
+
+        employee = Employee.objects.get(email='new2@example.com')
+        self.assertEqual(employee.skills.count(), 20)
+        self.assertEqual(employee.certifications.count(), 5)
+        self.assertEqual(employee.languages.count(), 5)
+        self.assertEqual(employee.educations.count(), 2)
+
+    def test_reports_every_missing_reference(self):
+        payload = employee_payload(3, self.skills[:1])
+        payload['skills'].extend([{'skill_id': 999001}, {'skill_id': 999002}])
+        payload['languages'] = [{'language_id': 999003, 'proficiency_level': 'native'}]
+        response = self.client.post('/employees/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.data['skills']), 2)
+        self.assertEqual(len(response.data['languages']), 1)
+        self.assertFalse(Employee.objects.filter(email='new3@example.com').exists())
+
+
+class EmployeeUpdateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.skills = [Skill.objects.create(name=f'Навык {i}') for i in range(4)]
+        cls.certifications = [Certification.objects.create(name=f'Сертификат {i}') for i in range(2)]
+        cls.languages = [Language.objects.create(name=f'Язык {i}') for i in range(2)]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.payload = employee_payload(1, self.skills[:3], self.certifications, self.languages)
+        response = self.client.post('/employees/', self.payload, format='json')
+        self.employee = Employee.objects.get(pk=response.data['id'])
+
+    def _put(self):
+        response = self.client.put(f'/employees/{self.employee.id}/', self.payload, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        return response
+
+    def _row_ids(self, manager):
+        return set(manager.values_list('id', flat=True))
+
+    def test_adding_one_skill_keeps_existing_rows(self):
+        skill_ids = self._row_ids(self.employee.skills)
+        education_ids = self._row_ids(self.employee.educations)
+        self.payload['skills'].append({'skill_id': self.skills[3].id})
+        response = self._put()
+
+        self.assertEqual(len(response.data['skills_info']), 4)
+        self.assertTrue(skill_ids < self._row_ids(self.employee.skills))
+        self.assertEqual(education_ids, self._row_ids(self.employee.educations))
+
+    def test_changed_rows_are_updated_in_place(self):
+        education_ids = self._row_ids(self.employee.educations)
+        language = self.employee.languages.get(language=self.languages[0])
+        self.payload['educations'][1]['specialty'] = 'Экономика'
+        self.payload['languages'][0]['proficiency_level'] = 'native'
+        self.payload['skills'] = self.payload['skills'][1:]
+        self._put()
+
+        self.assertEqual(education_ids, self._row_ids(self.employee.educations))
+        self.assertEqual(
+            sorted(self.employee.educations.values_list('specialty', flat=True)), ['Право', 'Экономика']
+        )
+        language.refresh_from_db()
+        self.assertEqual(language.proficiency_level, 'native')
+        self.assertEqual(self.employee.skills.count(), 2)
+
+    def test_unchanged_payload_writes_only_employee(self):
+        with CaptureQueriesContext(connection) as queries:
+            self._put()
+        writes = [query['sql'] for query in queries if query['sql'].startswith(('INSERT', 'DELETE', 'UPDATE'))]
+        self.assertEqual(len(writes), 1)
+        self.assertIn('"hr_app_employee"', writes[0])
+
+
+class EmployeeImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.skill = Skill.objects.create(name='Python')
+        cls.language = Language.objects.create(name='English')
+        cls.certification = Certification.objects.create(name='PMP')
+
+    def _jsonl(self, payloads):
+        return '\n'.join(json.dumps(payload, ensure_ascii=False) for payload in payloads) + '\n'
+
+    def test_command_imports_jsonl_in_chunks_and_reports_bad_rows(self):
+        good = [
+            employee_payload(i, [self.skill], [self.certification], [self.language]) for i in range(5)
+        ]
+        duplicate = employee_payload(0)
+        invalid = employee_payload(7)
+        invalid['date_of_birth'] = '2999-01-01'
+        missing = employee_payload(8, [self.skill])
+        missing['skills'].append({'skill_id': 999001})
+        content = self._jsonl(good[:3] + [duplicate, invalid] + good[3:] + [missing]) + '{not json}\n'
+
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'employees.jsonl')
+            errors_path = os.path.join(directory, 'errors.jsonl')
+            with open(source, 'w', encoding='utf-8') as file:
+                file.write(content)
+            out = io.StringIO()
+            call_command('import_employees', source, chunk_size=2, errors=errors_path, stdout=out)
+            with open(errors_path, encoding='utf-8') as file:
+                errors = [json.loads(line) for line in file]
+
+        self.assertEqual(Employee.objects.count(), 5)
+        self.assertEqual(EmployeeSkill.objects.count(), 5)
+        self.assertEqual(EmployeeCertification.objects.count(), 5)
+        self.assertEqual([error['row'] for error in errors], [4, 5, 8, 9])
+        self.assertIn('email', errors[0]['errors'])
+        self.assertIn('date_of_birth', errors[1]['errors'])
+        self.assertIn('skills', errors[2]['errors'])
+
+        employee = Employee.objects.get(email='new1@example.com')
+        self.assertEqual(employee.family.number_of_children, 2)
+        self.assertEqual(employee.educations.count(), 2)
+        self.assertIsNotNone(employee.search_document)
+
+    def test_endpoint_accepts_csv(self):
+        header = (
+            'first_name,last_name,date_of_birth,gender,nationality,email,phone_number,address,'
+            'family.marital_status,family.number_of_children,passport_info.passport_number,'
+            'passport_info.issued_by,passport_info.date_issued,passport_info.date_expiry,educations,work_experiences,skills\n'
+        )
+        row = (
+            'Олег,Кузнецов,1985-02-03,M,Россия,oleg@example.com,+79995554433,Самара,married,1,'
+            'EF1234567,МВД,2010-01-01,2030-01-01,"[{""education_level"": ""bachelor"", ""institution"": ""СГУ"", '
+            f'""graduation_year"": 2007, ""specialty"": ""Физика""}}]",,"[{{""skill_id"": {self.skill.id}}}]"\n'
+        )
+        upload = SimpleUploadedFile('employees.csv', (header + row).encode('utf-8'), content_type='text/csv')
+        response = APIClient().post('/employees/import/', {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['created'], 1)
+        employee = Employee.objects.get(email='oleg@example.com')
+        self.assertEqual(employee.passport_info.passport_number, 'EF1234567')
+        self.assertEqual(list(employee.skills.values_list('skill__name', flat=True)), ['Python'])
+
+
+class EmployeeExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        skill = Skill.objects.create(name='Python')
+        cls.employees = [create_employee(i, skills=[skill]) for i in range(5)]
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def _content(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_jsonl_streams_full_documents_in_chunks(self):
+        with mock.patch('hr_app.exporter.EXPORT_CHUNK_SIZE', 2):
+            content = self._content(self.client.get('/employees/export/'))
+        documents = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([document['id'] for document in documents], [employee.id for employee in self.employees])
+        self.assertEqual(documents[0]['skills'], [{'skill_id': self.employees[0].skills.get().skill_id, 'name': 'Python'}])
+        self.assertNotIn('skills_info', documents[0])
+        self.assertEqual(documents[0]['family']['marital_status'], 'single')
+
+    def test_csv_flattens_nested_objects(self):
+        response = self.client.get('/employees/export/', {'file_format': 'csv', 'expand': 'family,educations'})
+        rows = list(csv.DictReader(io.StringIO(self._content(response))))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['family.marital_status'], 'single')
+        self.assertEqual(json.loads(rows[0]['educations'])[0]['institution'], 'МГУ')
+        self.assertNotIn('passport_info.passport_number', rows[0])
+
+    def test_csv_export_imports_back_with_catalog_links(self):
+        employee = create_employee(
+            9, [Skill.objects.get()], [Certification.objects.create(name='PMP')], [Language.objects.create(name='English')]
+        )
+        expected = {
+            'skills': list(employee.skills.values_list('skill_id', flat=True)),
+            'certifications': list(employee.certifications.values_list('certification_id', 'date_obtained')),
+            'languages': list(employee.languages.values_list('language_id', 'proficiency_level')),
+        }
+        content = self._content(self.client.get('/employees/export/', {'file_format': 'csv'}))
+        Employee.objects.all().delete()
+
+        report = import_employees(read_records(io.StringIO(content), 'csv'))
+        self.assertEqual((report.created, report.failed), (6, 0), report.errors)
+        imported = Employee.objects.get(email=employee.email)
+        self.assertEqual(list(imported.skills.values_list('skill_id', flat=True)), expected['skills'])
+        self.assertEqual(
+            list(imported.certifications.values_list('certification_id', 'date_obtained')), expected['certifications']
+        )
+        self.assertEqual(list(imported.languages.values_list('language_id', 'proficiency_level')), expected['languages'])
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get('/employees/export/', {'file_format': 'xlsx'})
+        self.assertEqual(response.status_code, 400)
+
+
+class CatalogUniqueNameTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_duplicate_name_in_other_case_is_rejected(self):
+        for url, message in (
+            ('/skills/', 'Навык с таким названием уже существует.'),
+            ('/certifications/', 'Такой сертификат уже существует.'),
+            ('/languages/', 'Такой язык уже существует.'),
+        ):
+            self.assertEqual(self.client.post(url, {'name': 'Python'}, format='json').status_code, 201)
+            response = self.client.post(url, {'name': 'PYTHON'}, format='json')
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data['name'], [message])
+
+    def test_create_is_a_single_write(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post('/skills/', {'name': 'Go'}, format='json')
+        statements = [query['sql'] for query in queries if not query['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        self.assertEqual(len(statements), 1)
+        self.assertTrue(statements[0].startswith('INSERT'))
+
+    def test_saving_unchanged_name_is_allowed(self):
+        skill = Skill.objects.create(name='Docker')
+        response = self.client.put(f'/skills/{skill.id}/', {'name': 'Docker'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_creation_form_reports_duplicate(self):
+        Language.objects.create(name='English')
+        form = LanguageCreationForm(data={'name': 'english'})
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.non_field_errors(), ['Такой язык уже существует.'])
+
+
+class CatalogCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.skill = Skill.objects.create(name='Python')
+        cls.certification = Certification.objects.create(name='AWS')
+        cls.language = Language.objects.create(name='English')
+
+    def setUp(self):
+        self.client = APIClient()
+        catalogs.clear()
+
+    def test_list_is_served_from_cache(self):
+        self.client.get('/skills/')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/skills/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(response.data, [{'id': self.skill.id, 'name': 'Python'}])
+
+    def test_not_modified_when_etag_matches(self):
+        etag = self.client.get('/languages/')['ETag']
+        response = self.client.get('/languages/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_write_invalidates_cache(self):
+        etag = self.client.get('/skills/')['ETag']
+        self.client.post('/skills/', {'name': 'Go'}, format='json')
+        response = self.client.get('/skills/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual([row['name'] for row in response.data], ['Python', 'Go'])
+
+        Skill.objects.filter(name='Go').delete()
+        self.assertNotIn('Go', [row['name'] for row in self.client.get('/skills/').data])
+
+    def test_employee_references_are_checked_without_queries(self):
+        for name in catalogs.CATALOG_MODELS:
+            catalogs.get_catalog(name)
+        with CaptureQueriesContext(connection) as queries:
+            resolved = EmployeeSerializer()._resolve_references(
+                skills=[{'skill_id': self.skill.id}],
+                certifications=[{'certification_id': self.certification.id, 'date_obtained': '2020-01-01'}],
+                languages=[{'language_id': self.language.id, 'proficiency_level': 'native'}],
+            )
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(resolved['skills'], [({'skill_id': self.skill.id}, self.skill.id)])
+
+    def test_reference_missing_from_stale_snapshot_is_confirmed_in_database(self):
+        catalogs.get_catalog('skills')
+        # bulk_create не посылает сигналов: так выглядит запись, сделанная другим процессом.
+        skill, = Skill.objects.bulk_create([Skill(name='Go')])
+        response = self.client.post('/employees/', employee_payload(1, [skill]), format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertIn(skill.id, catalogs.get_catalog('skills').ids)
+
+        other, = Skill.objects.bulk_create([Skill(name='Rust')])
+        report = import_employees([(1, employee_payload(2, [other]), None)])
+        self.assertEqual((report.created, report.failed), (1, 0))
+
+    def test_reference_deleted_behind_snapshot_is_a_validation_error(self):
+        catalogs.get_catalog('skills')
+        Skill.objects.filter(pk=self.skill.pk)._raw_delete(Skill.objects.db)
+        response = self.client.post('/employees/', employee_payload(1, [self.skill]), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['skills'], [f'Skill with id {self.skill.id} does not exist.'])
+        self.assertFalse(Employee.objects.exists())
+
+
+class EmployeeConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.skill = Skill.objects.create(name='Python')
+        cls.employee = create_employee(1, skills=[cls.skill])
+        create_employee(2)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_detail_not_modified_without_serializer(self):
+        response = self.client.get(f'/employees/{self.employee.id}/')
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/employees/{self.employee.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        last_modified = self.client.get(f'/employees/{self.employee.id}/')['Last-Modified']
+        response = self.client.get(f'/employees/{self.employee.id}/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_related_changes_bump_etag(self):
+        url = f'/employees/{self.employee.id}/'
+        etag = self.client.get(url)['ETag']
+
+        family = self.employee.family
+        family.number_of_children = 2
+        family.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['family']['number_of_children'], 2)
+
+        etag = response['ETag']
+        self.skill.name = 'Python 3'
+        self.skill.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depends_on_requested_fields(self):
+        url = f'/employees/{self.employee.id}/'
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, {'fields': 'id,last_name'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_not_modified_until_page_changes(self):
+        etag = self.client.get('/employees/')['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get('/employees/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        create_employee(3)
+        response = self.client.get('/employees/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_list_row_dropping_out_of_filter_is_not_hidden_by_last_modified(self):
+        other = create_employee(3, skills=[self.skill])
+        params = {'skills': self.skill.id, 'paginate': 'false'}
+        response = self.client.get('/employees/', params)
+        self.assertEqual(len(response.data), 2)
+        self.assertNotIn('Last-Modified', response)
+        self.assertNotIn('Last-Modified', self.client.get('/employees/batch/', {'ids': other.id}))
+
+        # Максимум date_updated оставшихся строк не меняется, а состав списка — меняется.
+        EmployeeSkill.objects.filter(employee=self.employee).delete()
+        since = http_date(time.time() + 3600)
+        response = self.client.get('/employees/', params, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data], [other.id])
+
+
+class EmployeeDocumentCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.skill = Skill.objects.create(name='Python')
+        cls.employees = [create_employee(i, skills=[cls.skill]) for i in range(3)]
+
+    def setUp(self):
+        self.client = APIClient()
+        documents.reset_stats()
+
+    def test_detail_is_served_from_cache(self):
+        url = f'/employees/{self.employees[0].id}/'
+        first = self.client.get(url)
+        with self.assertNumQueries(1):
+            second = self.client.get(url)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(self.client.get('/employees/document-cache/').data['hit_ratio'], 0.5)
+
+    def test_list_loads_only_missing_documents(self):
+        self.client.get(f'/employees/{self.employees[0].id}/')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/employees/')
+        self.assertEqual(len(response.data['results']), 3)
+        profile_query = next(query['sql'] for query in queries if 'hr_app_family' in query['sql'])
+        self.assertNotIn(str(self.employees[0].id), profile_query.split('IN', 1)[1])
+
+        with self.assertNumQueries(1):
+            cached = self.client.get('/employees/')
+        self.assertEqual(cached.data['results'], response.data['results'])
+
+    def test_related_change_is_not_served_stale(self):
+        url = f'/employees/{self.employees[1].id}/'
+        self.client.get(url)
+        EmployeeLanguage.objects.create(
+            employee=self.employees[1], language=Language.objects.create(name='English'), proficiency_level='native'
+        )
+        self.assertEqual(len(self.client.get(url).data['languages_info']), 1)
+
+        self.skill.name = 'Python 3'
+        self.skill.save()
+        self.assertEqual(self.client.get(url).data['skills_info'][0]['skill']['name'], 'Python 3')
+
+    def test_documents_do_not_share_the_catalog_cache(self):
+        version = catalogs.get_version('skills')
+        with override_settings(CACHES={
+            **settings.CACHES,
+            'documents': {**settings.CACHES['documents'], 'LOCATION': 'small', 'OPTIONS': {'MAX_ENTRIES': 2}},
+        }):
+            self.client.get('/employees/')
+        self.assertEqual(catalogs.get_version('skills'), version)
+        key = f'employee:{self.employees[0].pk}:{self.employees[0].date_updated.isoformat()}'
+        self.assertIsNone(caches['default'].get(key))
+
+    def test_unknown_employee_is_not_found(self):
+        self.assertEqual(self.client.get('/employees/999999/').status_code, 404)
+        self.assertEqual(self.client.get('/employees/abc/').status_code, 404)
+
+
+class AsyncReadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.skill = Skill.objects.create(name='Python')
+        cls.employees = [create_employee(i, skills=[cls.skill]) for i in range(3)]
+        update_search_documents()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.async_client = AsyncClient()
+
+    async def test_detail_matches_sync_endpoint(self):
+        employee = self.employees[0]
+        response = await self.async_client.get(f'/async/employees/{employee.id}/')
+        self.assertEqual(response.status_code, 200)
+        expected = await sync_to_async(self.client.get)(f'/employees/{employee.id}/')
+        self.assertEqual(response.json(), json.loads(expected.content))
+
+        not_modified = await self.async_client.get(
+            f'/async/employees/{employee.id}/', headers={'If-None-Match': response['ETag']}
+        )
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual((await self.async_client.get('/async/employees/999999/')).status_code, 404)
+
+    async def test_export_is_streamed_by_async_iterator(self):
+        # Синхронный генератор под ASGI Django собрал бы в список целиком до отправки.
+        with mock.patch('hr_app.exporter.EXPORT_CHUNK_SIZE', 2):
+            response = await self.async_client.get('/employees/export/')
+            self.assertTrue(response.is_async)
+            chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual([json.loads(chunk)['id'] for chunk in chunks], [employee.id for employee in self.employees])
+
+    async def test_list_pages_and_sparse_fields(self):
+        response = await self.async_client.get('/async/employees/', {'page_size': 2, 'fields': 'id,last_name'})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([row['last_name'] for row in data['results']], ['Иванов0', 'Иванов1'])
+        self.assertEqual(set(data['results'][0]), {'id', 'last_name'})
+
+        next_page = await self.async_client.get(data['next'])
+        self.assertEqual([row['last_name'] for row in next_page.json()['results']], ['Иванов2'])
+
+        found = await self.async_client.get('/async/employees/', {'search': 'Иванов1'})
+        self.assertEqual([row['id'] for row in found.json()['results']], [self.employees[1].id])
+
+        invalid = await self.async_client.get('/async/employees/', {'fields': 'salary'})
+        self.assertEqual(invalid.status_code, 400)
+
+    async def test_catalog_list(self):
+        response = await self.async_client.get('/async/skills/')
+        self.assertEqual(response.json(), [{'id': self.skill.id, 'name': 'Python'}])
+        not_modified = await self.async_client.get('/async/skills/', headers={'If-None-Match': response['ETag']})
+        self.assertEqual(not_modified.status_code, 304)
+
+
+class DatabasePoolStatsTests(TestCase):
+    def test_reports_checkout_counters(self):
+        response = APIClient().get('/metrics/db-pool/')
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(response.data['checkouts'], 1)
+        if connection.pool is not None:
+            self.assertLessEqual(response.data['pool']['size'], response.data['pool']['max_size'])
+
+
+class RequestTimingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_employee(1)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_server_timing_header(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/employees/', {'fields': 'id,last_name'})
+        timing = response['Server-Timing']
+        self.assertIn(f'db;desc="{len(queries)} queries"', timing)
+        for name in ('serialize', 'render', 'app', 'total'):
+            self.assertIn(f'{name};dur=', timing)
+
+    async def test_server_timing_on_async_views(self):
+        # Под ASGI запросы к базе выполняются не в потоке цикла событий; счёт должен их видеть.
+        def query_count(response):
+            return int(re.search(r'db;desc="(\d+) queries"', response['Server-Timing']).group(1))
+
+        params = {'fields': 'id,last_name'}
+        response = await AsyncClient().get('/async/employees/', params)
+        self.assertGreater(query_count(response), 0)
+        self.assertIn('total;dur=', response['Server-Timing'])
+        # Синхронное представление под ASGI считается так же, как под WSGI.
+        expected = query_count(await sync_to_async(self.client.get)('/employees/', params))
+        self.assertEqual(query_count(await AsyncClient().get('/employees/', params)), expected)
+
+    @override_settings(SLOW_REQUEST_MS=0)
+    def test_slow_request_is_logged_with_worst_queries(self):
+        with self.assertLogs('hr_app.performance', 'WARNING') as logs:
+            self.client.get('/employees/')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['event'], 'slow_request')
+        self.assertEqual(record['path'], '/employees/')
+        self.assertTrue(record['worst_queries'])
+
+    def test_repeated_queries_are_fingerprinted(self):
+        metrics = RequestMetrics()
+        for pk in range(12):
+            metrics(lambda *args: None, f'SELECT * FROM "hr_app_family" WHERE "employee_id" = {pk}', None, False, {})
+        metrics(lambda *args: None, 'SELECT * FROM "hr_app_skill" WHERE "id" IN (%s, %s)', None, False, {})
+        repeated = metrics.repeated_queries(10)
+        self.assertEqual(len(repeated), 1)
+        self.assertEqual(repeated[0]['count'], 12)
+        self.assertEqual(repeated[0]['fingerprint'], 'SELECT * FROM "hr_app_family" WHERE "employee_id" = ?')
+        self.assertEqual(fingerprint('SELECT 1 WHERE id IN (%s, %s, %s)'), 'SELECT ? WHERE id IN (...)')
+
+
+class SeedAndBenchmarkTests(TestCase):
+    def test_seed_creates_profiles_with_fan_out(self):
+        ids = seed_employees(30, seed=1, chunk_size=8)
+        self.assertEqual(len(ids), 30)
+        self.assertEqual(Family.objects.filter(employee_id__in=ids).count(), 30)
+        self.assertEqual(PassportInfo.objects.filter(employee_id__in=ids).count(), 30)
+        skill_counts = [
+            employee.skills.count() for employee in Employee.objects.filter(pk__in=ids).prefetch_related('skills')
+        ]
+        self.assertTrue(all(3 <= count <= 12 for count in skill_counts))
+        self.assertGreaterEqual(WorkExperience.objects.filter(employee_id__in=ids).count(), 30)
+        self.assertFalse(Employee.objects.filter(pk__in=ids, search_document__isnull=True).exists())
+
+        # Повторный запуск с тем же seed не конфликтует по email и номерам паспортов.
+        self.assertEqual(len(seed_employees(5, seed=1)), 5)
+
+    def test_benchmark_reports_and_compares(self):
+        seed_employees(10, seed=2)
+        results = Benchmark(iterations=3, warmup=1, seed=2).run()
+        self.assertEqual(set(results['results']), set(SCENARIOS))
+        for result in results['results'].values():
+            self.assertEqual(result['calls'], 3)
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+            self.assertGreater(result['queries_per_call'], 0)
+        self.assertEqual(Employee.objects.count(), 10)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'results' / 'run.json'
+            save_results(results, path)
+            rows = compare(results, load_results(path))
+        self.assertEqual(len(rows), len(SCENARIOS) * 3)
+        self.assertTrue(all(change == 0 for *_, change in rows))
+
+    def test_benchmark_times_deferred_search_updates(self):
+        seed_employees(5, seed=3)
+        with mock.patch('hr_app.search.update_search_documents', wraps=update_search_documents) as update:
+            Benchmark(iterations=2, warmup=1, seed=3).run(scenarios=('create', 'update'))
+        # Хотя бы один пересчёт на каждый вызов (прогрев и замеры) каждого сценария записи.
+        self.assertGreaterEqual(update.call_count, 6)
+
+
+@override_settings(EMPLOYEE_BATCH_MAX_IDS=5)
+class EmployeeBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.skill = Skill.objects.create(name='Python')
+        cls.language = Language.objects.create(name='Английский')
+        cls.employees = [create_employee(i, skills=[cls.skill], languages=[cls.language]) for i in range(4)]
+
+    def setUp(self):
+        self.client = APIClient()
+        catalogs.clear()
+        documents.reset_stats()
+
+    def test_results_in_request_order_with_not_found_markers(self):
+        first, second, third, _ = self.employees
+        ids = f'{third.id},999999,{first.id},{second.id}'
+        # Версии, затем сотрудники с family и passport_info и по запросу на каждую коллекцию.
+        with self.assertNumQueries(EmployeeQueryCountTests.EXPECTED_QUERIES):
+            response = self.client.get('/employees/batch/', {'ids': ids})
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual([result['id'] for result in results], [third.id, 999999, first.id, second.id])
+        self.assertEqual(results[1], {'id': 999999, 'not_found': True})
+        self.assertEqual(results[0]['skills_info'][0]['skill']['name'], 'Python')
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/employees/batch/', {'ids': ids}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_sparse_fields(self):
+        first, second = self.employees[:2]
+        response = self.client.get('/employees/batch/', {'ids': f'{second.id},{first.id}', 'fields': 'id,last_name'})
+        self.assertEqual(response.data['results'], [
+            {'id': second.id, 'last_name': second.last_name}, {'id': first.id, 'last_name': first.last_name},
+        ])
+
+    def test_invalid_ids(self):
+        for ids in ('', '1,abc', ','.join(str(i) for i in range(1, 7))):
+            response = self.client.get('/employees/batch/', {'ids': ids})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('ids', response.data)
+
+
+class EmployeeFacetsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.python = Skill.objects.create(name='Python')
+        cls.sql = Skill.objects.create(name='SQL')
+        cls.english = Language.objects.create(name='Английский')
+        cls.first = create_employee(1, skills=[cls.python, cls.sql], languages=[cls.english])
+        cls.second = create_employee(2, skills=[cls.python])
+        Education.objects.create(
+            employee=cls.first, education_level='bachelor', institution='ВШЭ', graduation_year=2014, specialty='Право'
+        )
+        Family.objects.filter(employee=cls.second).update(marital_status='married')
+        update_search_documents()
+
+    def setUp(self):
+        self.client = APIClient()
+        catalogs.clear()
+        facets.invalidate()
+
+    def test_counts(self):
+        # Количество сотрудников, по одному GROUP BY на навыки, языки, образование, семью и гражданство
+        # и загрузка двух справочников для названий.
+        with self.assertNumQueries(6 + 2):
+            response = self.client.get('/employees/facets/')
+        data = response.data
+        self.assertEqual(data['total'], 2)
+        self.assertEqual(data['skills'], [
+            {'id': self.python.id, 'name': 'Python', 'count': 2}, {'id': self.sql.id, 'name': 'SQL', 'count': 1},
+        ])
+        self.assertEqual(data['languages'], [
+            {'id': self.english.id, 'name': 'Английский', 'proficiency_level': 'advanced', 'count': 1},
+        ])
+        # Две записи бакалавра у первого сотрудника считаются один раз.
+        self.assertEqual(data['education_level'], [{'value': 'bachelor', 'label': 'Бакалавр', 'count': 2}])
+        self.assertEqual(
+            {row['value']: row['count'] for row in data['marital_status']}, {'single': 1, 'married': 1}
+        )
+        self.assertEqual(data['nationality'], [{'value': 'Россия', 'count': 2}])
+
+        with self.assertNumQueries(0):
+            self.client.get('/employees/facets/')
+
+    def test_filtered_by_search(self):
+        response = self.client.get('/employees/facets/', {'search': 'SQL'})
+        self.assertEqual(response.data['total'], 1)
+        self.assertEqual([row['name'] for row in response.data['skills']], ['Python', 'SQL'])
+        self.assertEqual(self.client.get('/employees/facets/').data['total'], 2)
+
+    def test_invalidated_on_write(self):
+        self.assertEqual(self.client.get('/employees/facets/').data['skills'][0]['count'], 2)
+        EmployeeSkill.objects.filter(employee=self.second, skill=self.python).delete()
+        response = self.client.get('/employees/facets/')
+        self.assertEqual({row['name']: row['count'] for row in response.data['skills']}, {'Python': 1, 'SQL': 1})
+
+        create_employee(3)
+        self.assertEqual(self.client.get('/employees/facets/').data['total'], 3)
+
+    @override_settings(FACETS_VERSION_TIMEOUT=30)
+    def test_write_in_another_process_is_seen_after_version_timeout(self):
+        self.assertEqual(self.client.get('/employees/facets/').data['total'], 2)
+        # bulk_create без сигналов: так выглядит запись, сброс версии которой остался в другом процессе.
+        EmployeeSkill.objects.bulk_create([EmployeeSkill(employee=self.second, skill=self.sql)])
+        self.assertEqual(self.client.get('/employees/facets/').data['skills'][1]['count'], 1)
+
+        with mock.patch('time.time', return_value=time.time() + 31):
+            response = self.client.get('/employees/facets/')
+        self.assertEqual({row['name']: row['count'] for row in response.data['skills']}, {'Python': 2, 'SQL': 2})
+
+
+class WorkforceAnalyticsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        for name in catalogs.CATALOG_MODELS:
+            catalogs.get_catalog(name)
+
+    def _report(self):
+        response = self.client.get('/analytics/workforce/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_summaries_follow_api_bulk_and_import_writes(self):
+        response = self.client.post('/employees/', employee_payload(1), format='json')
+        employee_id = response.data['id']
+        self.assertEqual(compare_summaries(), [])
+        data = self._report()
+        self.assertEqual(sum(row['employees'] for row in data['headcount']), 1)
+        self.assertEqual(data['education_levels'], [
+            {'education_level': 'bachelor', 'label': 'Бакалавр', 'records': 1},
+            {'education_level': 'master', 'label': 'Магистр', 'records': 1},
+        ])
+
+        payload = employee_payload(1)
+        payload.update(nationality='Беларусь', family={'marital_status': 'married', 'number_of_children': 5})
+        payload['educations'] = payload['educations'][:1]
+        self.client.put(f'/employees/{employee_id}/', payload, format='json')
+        import_employees((row, employee_payload(row), None) for row in (2, 3))
+        self.assertEqual(compare_summaries(), [])
+
+        data = self._report()
+        self.assertEqual(
+            {row['nationality']: row['employees'] for row in data['headcount']}, {'Беларусь': 1, 'Россия': 2}
+        )
+        married = next(row for row in data['children_by_marital_status'] if row['marital_status'] == 'married')
+        # 5 детей у изменённого сотрудника и по 2 у двух импортированных.
+        self.assertEqual((married['employees'], married['average_children']), (3, 3.0))
+
+        Employee.objects.filter(pk=employee_id).delete()
+        self.assertEqual(compare_summaries(), [])
+        self.assertEqual({row['nationality'] for row in self._report()['headcount']}, {'Россия'})
+
+    def test_report_reads_only_summaries(self):
+        seed_employees(20, seed=3)
+        with self.assertNumQueries(3):
+            data = self._report()
+        self.assertEqual(sum(row['employees'] for row in data['headcount']), 20)
+
+    def test_rebuild_command(self):
+        seed_employees(5, seed=4)
+        FamilySummary.objects.update(employees=0)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_analytics', check=True, stdout=io.StringIO())
+        out = io.StringIO()
+        call_command('rebuild_analytics', stdout=out)
+        self.assertIn('расхождений было', out.getvalue())
+        self.assertEqual(compare_summaries(), [])
+
+
+class EmployeeFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.python = Skill.objects.create(name='Python')
+        cls.sql = Skill.objects.create(name='SQL')
+        cls.english = Language.objects.create(name='Английский')
+        cls.german = Language.objects.create(name='Немецкий')
+        cls.first = create_employee(1, skills=[cls.python, cls.sql], languages=[cls.english, cls.german])
+        cls.second = create_employee(2, skills=[cls.python])
+        cls.third = create_employee(3, skills=[cls.sql])
+        EmployeeLanguage.objects.create(employee=cls.second, language=cls.english, proficiency_level='native')
+        EmployeeLanguage.objects.create(employee=cls.third, language=cls.english, proficiency_level='intermediate')
+        Education.objects.create(
+            employee=cls.first, education_level='master', institution='МГУ', graduation_year=2014, specialty='Право'
+        )
+        Education.objects.create(
+            employee=cls.second, education_level='phd', institution='МГУ', graduation_year=2018, specialty='Право'
+        )
+        PassportInfo.objects.filter(employee=cls.third).update(date_expiry=datetime.date(2025, 6, 1))
+        update_search_documents()
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def _ids(self, params):
+        response = self.client.get('/employees/', {**params, 'fields': 'id'})
+        self.assertEqual(response.status_code, 200, response.data)
+        return sorted(row['id'] for row in response.data['results'])
+
+    def test_filters(self):
+        self.assertEqual(self._ids({'skills': f'{self.python.id},{self.sql.id}'}), [self.first.id])
+        self.assertEqual(self._ids({'skills': str(self.python.id)}), [self.first.id, self.second.id])
+        self.assertEqual(
+            self._ids({'languages': f'{self.english.id}:advanced'}), [self.first.id, self.second.id]
+        )
+        self.assertEqual(self._ids({'languages': f'{self.english.id},{self.german.id}'}), [self.first.id])
+        self.assertEqual(self._ids({'education_level': 'master'}), [self.first.id, self.second.id])
+        self.assertEqual(self._ids({'education_level': 'phd'}), [self.second.id])
+        self.assertEqual(self._ids({'passport_expiry_before': '2026-01-01'}), [self.third.id])
+        self.assertEqual(
+            self._ids({'skills': str(self.python.id), 'education_level': 'phd', 'search': 'Иванов2'}),
+            [self.second.id],
+        )
+
+    def test_no_row_duplication(self):
+        # У первого сотрудника две записи бакалавра и одна магистра: EXISTS не размножает строки.
+        with CaptureQueriesContext(connection) as queries:
+            ids = self._ids({'education_level': 'bachelor'})
+        self.assertEqual(ids, [self.first.id, self.second.id, self.third.id])
+        self.assertIn('EXISTS', queries[0]['sql'])
+        self.assertNotIn('JOIN', queries[0]['sql'])
+
+    def test_invalid_values(self):
+        for params in (
+            {'skills': 'abc'}, {'languages': f'{self.english.id}:fluent'}, {'education_level': 'college'},
+            {'passport_expiry_before': '01.01.2026'},
+        ):
+            response = self.client.get('/employees/', params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(next(iter(params)), response.data)
+
+    def test_async_list_and_facets_use_filters(self):
+        response = self.client.get('/employees/facets/', {'skills': str(self.sql.id)})
+        self.assertEqual(response.data['total'], 2)
+        response = self.client.get('/async/employees/', {'education_level': 'phd', 'fields': 'id'})
+        self.assertEqual([row['id'] for row in response.json()['results']], [self.second.id])
+
+
+class EmployeeMatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.python, cls.sql, cls.excel = [Skill.objects.create(name=name) for name in ('Python', 'SQL', 'Excel')]
+        cls.pmp = Certification.objects.create(name='PMP')
+        cls.english = Language.objects.create(name='Английский')
+        cls.full = create_employee(1, skills=[cls.python, cls.sql], certifications=[cls.pmp])
+        cls.partial = create_employee(2, skills=[cls.python])
+        cls.other = create_employee(3, skills=[cls.excel])
+        EmployeeLanguage.objects.create(employee=cls.full, language=cls.english, proficiency_level='native')
+        EmployeeLanguage.objects.create(employee=cls.partial, language=cls.english, proficiency_level='intermediate')
+        update_search_documents()
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def _match(self, requirements, params=''):
+        response = self.client.post(f'/employees/match/{params}', requirements, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_arrays_follow_related_rows(self):
+        self.full.refresh_from_db()
+        self.assertEqual(sorted(self.full.skill_ids), sorted([self.python.id, self.sql.id]))
+        self.assertEqual(self.full.certification_ids, [self.pmp.id])
+        self.assertEqual(self.full.language_levels, [self.english.id * 10 + 4])
+
+        # Через API вложенные записи пишутся bulk-операциями; массивы пересчитываются при фиксации.
+        with self.captureOnCommitCallbacks(execute=True):
+            EmployeeSkill.objects.create(employee=self.other, skill=self.sql)
+        self.other.refresh_from_db()
+        self.assertEqual(sorted(self.other.skill_ids), sorted([self.excel.id, self.sql.id]))
+
+    def test_ranked_by_weighted_coverage(self):
+        requirements = {
+            'skills': [self.python.id, self.sql.id],
+            'certifications': [self.pmp.id],
+            'languages': [{'language_id': self.english.id, 'proficiency_level': 'advanced'}],
+        }
+        with self.assertNumQueries(1):
+            results = self._match(requirements)
+        self.assertEqual([row['id'] for row in results], [self.full.id, self.partial.id])
+        self.assertEqual(results[0]['score'], 1.0)
+        # Python и английский на среднем уровне из требуемого продвинутого: (1 + 2/3) / 4.
+        self.assertAlmostEqual(results[1]['score'], (1 + 2 / 3) / 4)
+        self.assertEqual(results[1]['matched']['languages'], [
+            {'language_id': self.english.id, 'proficiency_level': 'intermediate'},
+        ])
+        self.assertEqual(results[1]['missing'], {
+            'skills': [self.sql.id], 'certifications': [self.pmp.id], 'languages': [self.english.id],
+        })
+
+    def test_language_without_level_weighted_by_proficiency(self):
+        results = self._match({'languages': [{'language_id': self.english.id}]})
+        self.assertEqual([(row['id'], row['score']) for row in results], [(self.full.id, 1.0), (self.partial.id, 0.5)])
+
+    def test_query_filters_and_validation(self):
+        results = self._match({'skills': [self.python.id]}, f'?skills={self.sql.id}')
+        self.assertEqual([row['id'] for row in results], [self.full.id])
+        response = self.client.post('/employees/match/', {'skills': []}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class UpcomingEventsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pmp = Certification.objects.create(name='PMP')
+        cls.december = create_employee(1, certifications=[cls.pmp])
+        cls.january = create_employee(2)
+        cls.leap = create_employee(3)
+        Employee.objects.filter(pk=cls.december.pk).update(date_of_birth=datetime.date(1990, 12, 30))
+        Employee.objects.filter(pk=cls.january.pk).update(date_of_birth=datetime.date(1985, 1, 3))
+        Employee.objects.filter(pk=cls.leap.pk).update(date_of_birth=datetime.date(1992, 2, 29))
+        EmployeeCertification.objects.filter(employee=cls.december).update(date_obtained=datetime.date(2020, 1, 2))
+        PassportInfo.objects.filter(employee=cls.january).update(date_expiry=datetime.date(2027, 1, 5))
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def _events(self, params):
+        response = self.client.get('/events/upcoming/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [(event['type'], event['date'], event['employee_id']) for event in response.data]
+
+    def test_window_wraps_year(self):
+        with self.assertNumQueries(3):
+            events = self._events({'start': '2026-12-28', 'days': 10})
+        self.assertEqual(events, [
+            ('birthday', datetime.date(2026, 12, 30), self.december.id),
+            ('certification_anniversary', datetime.date(2027, 1, 2), self.december.id),
+            ('birthday', datetime.date(2027, 1, 3), self.january.id),
+            ('passport_expiry', datetime.date(2027, 1, 5), self.january.id),
+        ])
+        response = self.client.get('/events/upcoming/', {'start': '2026-12-28', 'days': 10, 'types': 'birthday'})
+        self.assertEqual([event['age'] for event in response.data], [36, 42])
+
+    def test_leap_day_birthday_in_common_year(self):
+        self.assertEqual(self._events({'start': '2027-02-28', 'days': 0}), [
+            ('birthday', datetime.date(2027, 2, 28), self.leap.id),
+        ])
+        self.assertEqual(self._events({'start': '2028-02-28', 'days': 0}), [])
+        self.assertEqual(self._events({'start': '2028-02-29', 'days': 0})[0][1], datetime.date(2028, 2, 29))
+
+    def test_anniversary_needs_full_year(self):
+        self.assertEqual(self._events({'start': '2019-12-30', 'days': 10, 'types': 'certification_anniversary'}), [])
+
+    def test_validation_and_command(self):
+        for params in ({'days': 400}, {'start': '30.12.2026'}, {'types': 'holiday'}):
+            self.assertEqual(self.client.get('/events/upcoming/', params).status_code, 400)
+        out = io.StringIO()
+        call_command('upcoming_events', start=datetime.date(2026, 12, 28), days=10, stdout=out)
+        self.assertIn('Событий: 4.', out.getvalue())
+
+
+class JobQueueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.skill = Skill.objects.create(name='Python')
+
+    def setUp(self):
+        self.client = APIClient()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = Path(directory.name)
+        settings_override = override_settings(JOB_STORAGE_DIR=directory.name, JOB_RETRY_DELAY=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # Внутри транзакции теста close_old_connections закрыл бы её соединение.
+        patcher = mock.patch('hr_app.jobs.close_old_connections')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_background_import(self):
+        content = '\n'.join(json.dumps(employee_payload(i, [self.skill]), ensure_ascii=False) for i in range(3))
+        upload = SimpleUploadedFile('employees.jsonl', content.encode('utf-8'))
+        response = self.client.post('/employees/import/?background=1', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 202, response.data)
+        self.assertEqual(response.data['status'], Job.QUEUED)
+        self.assertTrue(response['Location'].endswith(f'/jobs/{response.data["id"]}/'))
+        self.assertEqual(Employee.objects.count(), 0)
+
+        self.assertEqual(jobs.work(burst=True), 1)
+        job = self.client.get(f'/jobs/{response.data["id"]}/').data
+        self.assertEqual(job['status'], Job.SUCCEEDED)
+        self.assertEqual((job['result']['created'], job['progress']), (3, 100))
+        self.assertEqual(Employee.objects.filter(skill_ids__contains=[self.skill.id]).count(), 3)
+        self.assertEqual(list(self.storage.iterdir()), [])
+
+    def test_background_export_and_download(self):
+        employees = [create_employee(i) for i in range(3)]
+        update_search_documents()
+        job_id = self.client.get('/employees/export/', {'background': 1, 'search': 'Иванов1'}).data['id']
+        self.assertEqual(self.client.get(f'/jobs/{job_id}/download/').status_code, 409)
+
+        jobs.work(burst=True)
+        self.assertEqual(Job.objects.get(pk=job_id).result['rows'], 1)
+        response = self.client.get(f'/jobs/{job_id}/download/')
+        self.assertEqual(response.status_code, 200)
+        documents = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([document['id'] for document in documents], [employees[1].id])
+
+    def test_enqueue_endpoint_accepts_maintenance_kinds_only(self):
+        create_employee(1)
+        response = self.client.post('/jobs/', {'kind': 'reindex'}, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(self.client.post('/jobs/', {'kind': 'import'}, format='json').status_code, 400)
+
+        jobs.work(burst=True)
+        self.assertEqual(Job.objects.get(pk=response.data['id']).result, {'employees': 1})
+        self.assertEqual(self.client.get('/jobs/').data['results'][0]['status'], Job.SUCCEEDED)
+
+    def test_failed_job_is_retried_then_marked_failed(self):
+        job = jobs.enqueue('reindex', max_attempts=2)
+        with mock.patch.dict(jobs.JOB_HANDLERS, {'reindex': mock.Mock(side_effect=RuntimeError('сбой'))}), \
+                self.assertLogs('hr_app.jobs', 'ERROR'):
+            self.assertEqual(jobs.work(burst=True), 2)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+        self.assertIn('сбой', job.error)
+
+    def test_database_error_does_not_stop_the_worker(self):
+        job = jobs.enqueue('rebuild_analytics')
+        claim = jobs.claim
+        calls = []
+
+        def flaky_claim(worker):
+            calls.append(worker)
+            if len(calls) == 1:
+                raise OperationalError('server closed the connection unexpectedly')
+            return claim(worker)
+
+        with mock.patch('hr_app.jobs.claim', flaky_claim), self.assertLogs('hr_app.jobs', 'ERROR'):
+            self.assertEqual(jobs.work(burst=True, poll_interval=0), 1)
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.SUCCEEDED)
+
+    def test_stale_running_job_is_requeued(self):
+        job = jobs.enqueue('rebuild_analytics')
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.RUNNING, attempts=1, heartbeat_at=datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        )
+        self.assertEqual(jobs.work(burst=True), 0)
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.QUEUED)
+        self.assertEqual(jobs.work(burst=True), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.result), (Job.SUCCEEDED, 2, {'differences': 0}))
+
+
+class AdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.skill = Skill.objects.create(name='Python')
+        cls.language = Language.objects.create(name='English')
+        cls.certification = Certification.objects.create(name='PMP')
+        cls.employees = [
+            create_employee(i, [cls.skill], [cls.certification], [cls.language]) for i in range(3)
+        ]
+        update_search_documents()
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def _queries(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelists_use_constant_queries(self):
+        urls = [
+            f'/admin/hr_app/{model._meta.model_name}/'
+            for model in (Employee, Education, WorkExperience, Family, PassportInfo,
+                          EmployeeSkill, EmployeeCertification, EmployeeLanguage)
+        ]
+        before = [self._queries(url) for url in urls]
+        for i in range(3, 8):
+            create_employee(i, [self.skill], [self.certification], [self.language])
+        self.assertEqual([self._queries(url) for url in urls], before)
+
+    def test_search_uses_search_document(self):
+        response = self.client.get('/admin/hr_app/employee/', {'q': 'иванов1'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.employees[1]])
+        response = self.client.get('/admin/hr_app/employeeskill/', {'q': 'Иванов2 python'})
+        self.assertEqual([row.employee_id for row in response.context['cl'].result_list], [self.employees[2].id])
+        response = self.client.get(
+            '/admin/autocomplete/',
+            {'term': 'Иванов0', 'app_label': 'hr_app', 'model_name': 'education', 'field_name': 'employee'},
+        )
+        self.assertEqual([item['id'] for item in response.json()['results']], [str(self.employees[0].id)])
+
+    def test_employee_change_form_uses_constant_queries(self):
+        employee = self.employees[0]
+        url = f'/admin/hr_app/employee/{employee.id}/change/'
+
+        def grow(count):
+            skills = Skill.objects.bulk_create([Skill(name=f'Навык {employee.skills.count() + i}') for i in range(count)])
+            EmployeeSkill.objects.bulk_create([EmployeeSkill(employee=employee, skill=skill) for skill in skills])
+            catalogs.clear()
+            self._queries(url)
+
+        grow(2)
+        before = self._queries(url)
+        grow(9)
+        self.assertEqual(employee.skills.count(), 12)
+        self.assertEqual(self._queries(url), before)
+
+    def test_employee_change_form_has_inlines(self):
+        response = self.client.get(f'/admin/hr_app/employee/{self.employees[0].id}/change/')
+        self.assertEqual(response.status_code, 200)
+        prefixes = {formset.formset.prefix for formset in response.context['inline_admin_formsets']}
+        self.assertEqual(prefixes, {
+            'family', 'passport_info', 'educations', 'work_experiences',
+            'skills', 'certifications', 'languages',
+        })
+
+    def test_paginator_uses_planner_estimate_for_unfiltered_lists(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Employee._meta.db_table}')
+        with mock.patch('hr_app.admin.ESTIMATED_COUNT_MIN_ROWS', 1), CaptureQueriesContext(connection) as queries:
+            self.assertEqual(EstimatedCountPaginator(Employee.objects.order_by('id'), 10).count, 3)
+        self.assertNotIn('COUNT(', queries[0]['sql'].upper())
+        self.assertEqual(EstimatedCountPaginator(Employee.objects.filter(pk=self.employees[0].pk).order_by('id'), 10).count, 1)
+
+
+class JobHeartbeatTests(TransactionTestCase):
+    # Отметки пишутся из отдельного потока со своим соединением и видят только зафиксированные строки.
+    @override_settings(JOB_LEASE_SECONDS=0.06)
+    def test_long_step_keeps_the_job_leased(self):
+        jobs.enqueue('reindex')
+        job = jobs.claim('test')
+        statuses = []
+
+        def slow_step(job, progress):
+            # Шаг без вызовов progress дольше аренды: задача не должна вернуться в очередь.
+            time.sleep(0.2)
+            jobs.requeue_stale()
+            statuses.append(Job.objects.get(pk=job.pk).status)
+            return {}
+
+        with mock.patch.dict(jobs.JOB_HANDLERS, {'reindex': slow_step}):
+            self.assertTrue(jobs.run_job(job))
+        self.assertEqual(statuses, [Job.RUNNING])
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.SUCCEEDED)
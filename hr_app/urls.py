@@ -1,13 +1,31 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import EmployeeViewSet, SkillViewSet, CertificationViewSet, LanguageViewSet
+from .async_views import AsyncCatalogView, AsyncEmployeeView
+from .views import (
+    EmployeeViewSet, SkillViewSet, CertificationViewSet, LanguageViewSet, JobViewSet,
+    database_pool_stats, upcoming_date_events, workforce_analytics,
+)
 
 router = DefaultRouter()
 router.register(r'employees', EmployeeViewSet, basename='employee')
 router.register(r'skills', SkillViewSet, basename='skill')
 router.register(r'certifications', CertificationViewSet, basename='certification')
 router.register(r'languages', LanguageViewSet, basename='language')
+router.register(r'jobs', JobViewSet, basename='job')
+
+# Асинхронные варианты чтения для запуска под ASGI (см. base/asgi.py).
+async_urlpatterns = [
+    path('employees/', AsyncEmployeeView.as_view(), name='async-employee-list'),
+    path('employees/<int:pk>/', AsyncEmployeeView.as_view(), name='async-employee-detail'),
+    path('skills/', AsyncCatalogView.as_view(catalog='skills'), name='async-skill-list'),
+    path('certifications/', AsyncCatalogView.as_view(catalog='certifications'), name='async-certification-list'),
+    path('languages/', AsyncCatalogView.as_view(catalog='languages'), name='async-language-list'),
+]
 
 urlpatterns = [
+    path('async/', include(async_urlpatterns)),
+    path('events/upcoming/', upcoming_date_events, name='upcoming-date-events'),
+    path('analytics/workforce/', workforce_analytics, name='workforce-analytics'),
+    path('metrics/db-pool/', database_pool_stats, name='database-pool-stats'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,67 +1,441 @@
-from rest_framework import viewsets, status, filters
+import datetime
+import hashlib
+import io
+import uuid
+from urllib.parse import urlencode
+from rest_framework import mixins, viewsets, status
 from rest_framework.response import Response
-from rest_framework.decorators import action
-from django.shortcuts import get_object_or_404
+from rest_framework.decorators import action, api_view
+from rest_framework.generics import get_object_or_404
+from rest_framework.parsers import MultiPartParser
+from rest_framework.request import Request
+from rest_framework.reverse import reverse
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse, QueryDict, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags
 from django.db import transaction
-from .models import Employee, Skill, Certification, Language
-from .serializers import (EmployeeSerializer, SkillSerializer, CertificationSerializer, LanguageSerializer)
+from .models import Employee, Skill, Certification, Language, Job
+from .analytics import workforce_report
+from .catalogs import get_catalog
+from .db.base import pool_stats
+from .documents import get_documents, set_documents, stats as document_stats
+from .events import EVENT_TYPES, MAX_WINDOW_DAYS, upcoming_events
+from .facets import get_facets
+from .exporter import EXPORT_FORMATS, astream, stream_export
+from .filters import EmployeeFilter, EmployeeSearchFilter
+from .importer import IMPORT_FORMATS, detect_format, import_employees, read_records
+from .instrumentation import measure
+from .jobs import enqueue, storage_path
+from .matching import match_employees
+from .pagination import JobPagination, KeysetPagination
+from .search import lookup_employees
+from .serializers import (
+    EmployeeSerializer, EmployeeLookupSerializer, EmployeeMatchRequestSerializer, EmployeeMatchSerializer,
+    JobSerializer, SkillSerializer, CertificationSerializer, LanguageSerializer
+)
 
-class EmployeeViewSet(viewsets.ModelViewSet):
-    queryset = Employee.objects.all()
-    serializer_class = EmployeeSerializer
 
-    def create(self, request, *args, **kwargs):
-        employee_data = request.data
-        employee_serializer = self.get_serializer(data=employee_data)
-        employee_serializer.is_valid(raise_exception=True)
-        employee = employee_serializer.save()
-        return Response(employee_serializer.data, status=status.HTTP_201_CREATED)
+class CatalogViewSet(viewsets.ModelViewSet):
+    # Список отдаётся из кэша справочника; ETag равен его версии.
+    catalog = None
 
-    def update(self, request, *args, **kwargs):
-        partial = kwargs.pop('partial', False)
-        instance = self.get_object()
-        employee_data = request.data
-        employee_serializer = self.get_serializer(instance, data=employee_data, partial=partial)
-        employee_serializer.is_valid(raise_exception=True)
-        employee = employee_serializer.save()
-        return Response(employee_serializer.data)
+    def list(self, request, *args, **kwargs):
+        snapshot = get_catalog(self.catalog)
+        headers = {'ETag': snapshot.etag, 'Cache-Control': 'no-cache'}
+        if snapshot.etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(snapshot.rows, headers=headers)
 
 
-class SkillViewSet(viewsets.ModelViewSet):
+class SkillViewSet(CatalogViewSet):
     queryset = Skill.objects.all()
     serializer_class = SkillSerializer
+    catalog = 'skills'
 
 
-class CertificationViewSet(viewsets.ModelViewSet):
+class CertificationViewSet(CatalogViewSet):
     queryset = Certification.objects.all()
     serializer_class = CertificationSerializer
+    catalog = 'certifications'
 
 
-class LanguageViewSet(viewsets.ModelViewSet):
+class LanguageViewSet(CatalogViewSet):
     queryset = Language.objects.all()
     serializer_class = LanguageSerializer
+    catalog = 'languages'
+
+class EmployeeReadMixin:
+    """
+    Общая часть синхронного EmployeeViewSet и асинхронных представлений чтения:
+    ключ сортировки, выбор полей, запросы и валидаторы для условных запросов.
+    Класс должен определить get_representation() -> (поля, формат ответа).
+    """
+    pagination_class = KeysetPagination
+    filter_backends = [EmployeeFilter, EmployeeSearchFilter]
+
+    def get_keyset_ordering(self, request):
+        if EmployeeSearchFilter().is_active(request):
+            return ('-rank', 'id')
+        return KeysetPagination.ordering
+
+    def select_requested_fields(self, request):
+        params = request.query_params
+        return EmployeeSerializer.select_fields(
+            self._split_param(params.get('fields')),
+            self._split_param(params.get('expand')),
+        )
+
+    @staticmethod
+    def _split_param(value):
+        if value is None:
+            return None
+        return [name.strip() for name in value.split(',') if name.strip()]
+
+    def get_ordering_columns(self):
+        return [field.lstrip('-') for field in self.pagination_class.ordering]
+
+    def get_profile_queryset(self, fields):
+        # date_updated нужен для ETag/Last-Modified даже при выборочных полях.
+        return EmployeeSerializer.setup_eager_loading(
+            Employee.objects.all(), fields, extra_columns=[*self.get_ordering_columns(), 'date_updated'],
+        )
+
+    def get_version_queryset(self):
+        return Employee.objects.only('id', 'date_updated', *self.get_ordering_columns())
+
+    def get_validators(self, employees, state='', collection=True):
+        """
+        ETag по (id, date_updated) отдаваемых сотрудников; в него входят также вариант
+        представления (набор полей, формат ответа) и состояние страницы. Last-Modified —
+        только для одного сотрудника: у списка максимум date_updated не растёт, когда строки
+        из него выбывают (удалены или больше не подходят под фильтр), поэтому списки и
+        пакеты проверяются только по ETag.
+        """
+        fields, response_format = self.get_representation()
+        digest = hashlib.md5(response_format.encode())
+        digest.update(','.join(sorted(fields)).encode() if fields is not None else b'*')
+        digest.update(state.encode())
+        for employee in employees:
+            digest.update(f'|{employee.pk}:{employee.date_updated.isoformat()}'.encode())
+
+        headers = {'ETag': f'"{digest.hexdigest()}"', 'Cache-Control': 'no-cache'}
+        last_modified = None if collection else max((employee.date_updated for employee in employees), default=None)
+        if last_modified is not None:
+            last_modified = int(last_modified.timestamp())
+            headers['Last-Modified'] = http_date(last_modified)
+        return headers, last_modified
+
+    @staticmethod
+    def is_conditional(request):
+        return 'HTTP_IF_NONE_MATCH' in request.META or 'HTTP_IF_MODIFIED_SINCE' in request.META
+
+    @staticmethod
+    def check_not_modified(request, headers, last_modified):
+        response = get_conditional_response(
+            request, etag=headers['ETag'], last_modified=last_modified, response=HttpResponse(headers=headers)
+        )
+        return response if response.status_code != status.HTTP_200_OK else None
 
-class EmployeeViewSet(viewsets.ModelViewSet):
+    @staticmethod
+    def get_page_state(paginator):
+        return f'{paginator.has_previous}:{paginator.has_next}'
+
+
+class EmployeeViewSet(EmployeeReadMixin, viewsets.ModelViewSet):
     queryset = Employee.objects.all()
     serializer_class = EmployeeSerializer
-    filter_backends = [filters.SearchFilter]
-    search_fields = [
-        'first_name',
-        'last_name',
-        'patronymic',
-        'date_of_birth',
-        'gender',
-        'nationality',
-        'email',
-        'phone_number',
-        'address',
-        'family__marital_status',
-        'family__number_of_children',
-        'passport_info__passport_number',
-        'passport_info__issued_by',
-        'passport_info__date_issued',
-        'passport_info__date_expiry',
-        'skills__skill__name',
-        'certifications__certification__name',
-        'languages__language__name',
-    ]
\ No newline at end of file
+    name_lookup_limit = 10
+    max_name_lookup_limit = 50
+
+    def get_requested_fields(self):
+        if self.action not in ('list', 'retrieve', 'batch', 'export'):
+            return None
+        if not hasattr(self, '_requested_fields'):
+            self._requested_fields = self.select_requested_fields(self.request)
+        return self._requested_fields
+
+    def get_representation(self):
+        return self.get_requested_fields(), self.request.accepted_renderer.format
+
+    def get_queryset(self):
+        return self.get_profile_queryset(self.get_requested_fields())
+
+    def paginate_employees(self, queryset, paginator):
+        page = paginator.paginate_queryset(queryset, self.request, view=self)
+        if page is None:
+            return list(queryset.order_by(*paginator.get_ordering(self.request, queryset, self))), ''
+        return page, self.get_page_state(paginator)
+
+    def render_employees(self, employees):
+        """
+        Полные документы берутся из кэша по (id, date_updated); промахи загружаются
+        одним спланированным запросом и сериализуются.
+        """
+        documents = get_documents(employees)
+        missing = [employee.pk for employee in employees if employee.pk not in documents]
+        if missing:
+            loaded = list(self.get_queryset().filter(pk__in=missing))
+            with measure('serialize'):
+                rendered = [dict(document) for document in self.get_serializer(loaded, many=True).data]
+            set_documents(zip(loaded, rendered))
+            documents.update((employee.pk, document) for employee, document in zip(loaded, rendered))
+        return [documents[employee.pk] for employee in employees if employee.pk in documents]
+
+    def list(self, request, *args, **kwargs):
+        # Полные документы отдаются через кэш, поэтому сначала выбираются только (id, date_updated)
+        # страницы; выборочные поля кэшем не пользуются, и для них так делается лишь при условном запросе.
+        cached = self.get_requested_fields() is None
+        if cached or self.is_conditional(request):
+            queryset = self.filter_queryset(self.get_version_queryset())
+            employees, state = self.paginate_employees(queryset, self.paginator)
+            headers, last_modified = self.get_validators(employees, state)
+            not_modified = self.check_not_modified(request, headers, last_modified)
+            if not_modified is not None:
+                return not_modified
+        if cached:
+            data = self.render_employees(employees)
+        else:
+            employees, state = self.paginate_employees(self.filter_queryset(self.get_queryset()), self.paginator)
+            headers, _ = self.get_validators(employees, state)
+            with measure('serialize'):
+                data = self.get_serializer(employees, many=True).data
+
+        if not self.paginator.is_enabled(request):
+            return Response(data, headers=headers)
+        response = self.get_paginated_response(data)
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        cached = self.get_requested_fields() is None
+        if cached or self.is_conditional(request):
+            lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+            employee = get_object_or_404(self.get_version_queryset(), pk=lookup)
+            headers, last_modified = self.get_validators([employee], collection=False)
+            not_modified = self.check_not_modified(request, headers, last_modified)
+            if not_modified is not None:
+                return not_modified
+        if cached:
+            documents = self.render_employees([employee])
+            if not documents:
+                raise Http404
+            return Response(documents[0], headers=headers)
+
+        employee = self.get_object()
+        headers, _ = self.get_validators([employee], collection=False)
+        with measure('serialize'):
+            data = self.get_serializer(employee).data
+        return Response(data, headers=headers)
+
+    @action(detail=False, methods=['get'])
+    def batch(self, request):
+        """
+        Несколько профилей за один запрос: ?ids=1,2,3. Профили загружаются одним набором
+        запросов и возвращаются в порядке ids; на месте отсутствующего — маркер not_found.
+        """
+        try:
+            ids = [int(value) for value in self._split_param(request.query_params.get('ids', ''))]
+        except ValueError:
+            return Response({'ids': 'Ожидается список целых чисел через запятую.'}, status=status.HTTP_400_BAD_REQUEST)
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return Response({'ids': 'Укажите хотя бы один id.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > settings.EMPLOYEE_BATCH_MAX_IDS:
+            return Response(
+                {'ids': f'Не более {settings.EMPLOYEE_BATCH_MAX_IDS} id за запрос.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if self.get_requested_fields() is None:
+            employees = list(self.get_version_queryset().filter(pk__in=ids))
+            headers, last_modified = self.get_validators(employees, ','.join(map(str, ids)))
+            not_modified = self.check_not_modified(request, headers, last_modified)
+            if not_modified is not None:
+                return not_modified
+            documents = {document['id']: document for document in self.render_employees(employees)}
+        else:
+            employees = list(self.get_queryset().filter(pk__in=ids))
+            headers, _ = self.get_validators(employees, ','.join(map(str, ids)))
+            with measure('serialize'):
+                documents = {
+                    employee.pk: document
+                    for employee, document in zip(employees, self.get_serializer(employees, many=True).data)
+                }
+        results = [documents.get(pk, {'id': pk, 'not_found': True}) for pk in ids]
+        return Response({'results': results}, headers=headers)
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        # Счётчики по сотрудникам, отобранным теми же параметрами, что и список.
+        employees = self.filter_queryset(Employee.objects.all())
+        params = [(name, value) for name, values in request.query_params.lists() for value in values]
+        return Response(get_facets(employees, params))
+
+    @action(detail=False, methods=['get'], url_path='document-cache')
+    def document_cache(self, request):
+        # Статистика кэша документов сотрудников в текущем процессе.
+        return Response(document_stats())
+
+    @action(detail=False, methods=['get'])
+    def lookup(self, request):
+        text = request.query_params.get('q', '').strip()
+        if len(text) < 2:
+            return Response({'q': 'Введите не менее двух символов.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get('limit', self.name_lookup_limit)), self.max_name_lookup_limit)
+        except ValueError:
+            return Response({'limit': 'Ожидается целое число.'}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = EmployeeLookupSerializer(lookup_employees(text, max(limit, 1)), many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['post'])
+    def match(self, request):
+        """
+        Подбор по требованиям из тела запроса: навыки, сертификаты и языки с минимальным уровнем.
+        Параметры строки запроса (search, education_level и т. п.) дополнительно сужают выбор.
+        """
+        requirements = EmployeeMatchRequestSerializer(data=request.data)
+        requirements.is_valid(raise_exception=True)
+        data = requirements.validated_data
+        employees = match_employees(
+            self.filter_queryset(Employee.objects.all()),
+            data['skills'], data['certifications'], data['languages'], data['limit'],
+        )
+        serializer = EmployeeMatchSerializer(employees, many=True, context={'requirements': data})
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_file(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': 'Файл не передан.'}, status=status.HTTP_400_BAD_REQUEST)
+        file_format = request.data.get('format') or detect_format(upload.name)
+        if file_format not in IMPORT_FORMATS:
+            return Response({'format': 'Поддерживаются форматы csv и jsonl.'}, status=status.HTTP_400_BAD_REQUEST)
+        if self.is_background(request):
+            path = storage_path(f'import-{uuid.uuid4().hex}.{file_format}')
+            with open(path, 'wb') as file:
+                for chunk in upload.chunks():
+                    file.write(chunk)
+            return self.job_accepted(enqueue('import', {'path': str(path), 'format': file_format}))
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        report = import_employees(read_records(stream, file_format))
+        return Response(report.as_dict(), status=status.HTTP_201_CREATED if report.created else status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        # Параметр format занят согласованием рендереров DRF.
+        export_format = request.query_params.get('file_format', 'jsonl')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'file_format': 'Поддерживаются форматы csv и jsonl.'}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if self.is_background(request):
+            params = dict(request.query_params.lists())
+            return self.job_accepted(enqueue('export', {'file_format': export_format, 'params': params}))
+        lines = stream_export(self.get_export_queryset(), self.get_serializer(), export_format)
+        if isinstance(request._request, ASGIRequest):
+            lines = astream(lines)
+        response = StreamingHttpResponse(lines, content_type=EXPORT_FORMATS[export_format])
+        response['Content-Disposition'] = f'attachment; filename="employees.{export_format}"'
+        return response
+
+    def get_export_queryset(self):
+        return self.filter_queryset(self.get_queryset()).order_by('id')
+
+    @classmethod
+    def export_source(cls, params):
+        """
+        Запрос и сериализатор выгрузки по сохранённым параметрам строки запроса — для фоновой задачи.
+        """
+        http_request = HttpRequest()
+        http_request.GET = QueryDict(urlencode(params, doseq=True))
+        view = cls(request=Request(http_request), action='export', format_kwarg=None, args=(), kwargs={})
+        return view.get_export_queryset(), view.get_serializer()
+
+    @staticmethod
+    def is_background(request):
+        return request.query_params.get('background') in ('1', 'true')
+
+    def job_accepted(self, job):
+        location = reverse('job-detail', args=[job.pk], request=self.request)
+        return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED, headers={'Location': location})
+
+    def perform_create(self, serializer):
+        employee = serializer.save()
+        # Ответ строится по заново загруженному профилю, чтобы вложенные блоки не читались построчно.
+        serializer.instance = self.get_queryset().get(pk=employee.pk)
+
+    def perform_update(self, serializer):
+        employee = serializer.save()
+        serializer.instance = self.get_queryset().get(pk=employee.pk)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+
+class JobViewSet(
+    mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet
+):
+    """
+    Статус фоновых задач; POST ставит в очередь пересчёт поисковых данных или сводных таблиц.
+    """
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    pagination_class = JobPagination
+
+    def perform_create(self, serializer):
+        serializer.save(max_attempts=settings.JOB_MAX_ATTEMPTS)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if job.kind != 'export' or job.status != Job.SUCCEEDED:
+            return Response({'detail': 'Файл выгрузки ещё не готов.'}, status=status.HTTP_409_CONFLICT)
+        export_format = job.result['file_format']
+        return FileResponse(
+            open(storage_path(job.result['file']), 'rb'), as_attachment=True,
+            filename=f'employees.{export_format}', content_type=EXPORT_FORMATS[export_format],
+        )
+
+
+@api_view(['GET'])
+def upcoming_date_events(request):
+    """
+    Ближайшие события: ?days=30 (до 365), ?start=ГГГГ-ММ-ДД (по умолчанию сегодня),
+    ?types=passport_expiry,birthday,certification_anniversary (по умолчанию все).
+    """
+    params = request.query_params
+    errors = {}
+    try:
+        days = int(params.get('days', 30))
+        if not 0 <= days <= MAX_WINDOW_DAYS:
+            raise ValueError
+    except ValueError:
+        errors['days'] = f'Ожидается целое число от 0 до {MAX_WINDOW_DAYS}.'
+    try:
+        start = datetime.date.fromisoformat(params['start']) if params.get('start') else datetime.date.today()
+    except ValueError:
+        errors['start'] = 'Ожидается дата в формате ГГГГ-ММ-ДД.'
+    types = [name.strip() for name in params.get('types', ','.join(EVENT_TYPES)).split(',') if name.strip()]
+    if not types or set(types) - set(EVENT_TYPES):
+        errors['types'] = f'Допустимые типы: {", ".join(EVENT_TYPES)}.'
+    if errors:
+        return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+    return Response(upcoming_events(start, days, types))
+
+
+@api_view(['GET'])
+def workforce_analytics(request):
+    # Читаются только сводные таблицы, поддерживаемые триггерами базы.
+    return Response(workforce_report())
+
+
+@api_view(['GET'])
+def database_pool_stats(request):
+    # Пул и счётчики выдачи соединений относятся к текущему процессу.
+    return Response(pool_stats())